@@ -1,26 +1,53 @@
 from fastapi import APIRouter, HTTPException, Request, Depends
-from typing import Optional
-from datetime import datetime, timedelta
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional, Tuple
+from datetime import date, datetime, timedelta
+import json
 import os
 import re
+import time
 
 from sqlalchemy import func, text
 from sqlalchemy.orm import Session
+from pydantic import ValidationError
 from decimal import Decimal
 
-from ..schemas.budget import BudgetRequest, BudgetResponse, CostBreakdown as CostBreakdownSchema
+from ..schemas.budget import (
+    BudgetRequest, BudgetScenario, BudgetResponse, CostBreakdown as CostBreakdownSchema,
+    BudgetBatchRequest, BudgetBatchResponse, BudgetSweepRequest, BudgetSweepResponse,
+    TravelWindow as TravelWindowSchema, ItineraryRequest, ItineraryResponse, ItineraryLegResult,
+    TripOptimizeRequest, TripOptimizeResponse, TripCandidate as TripCandidateSchema,
+    UncertaintyBands as UncertaintyBandsSchema, CategoryBand as CategoryBandSchema,
+    Climate as ClimateSchema, RateTrend as RateTrendSchema
+)
 from ..schemas.chat import ChatRequest, ChatResponse
 from ..schemas.newsletter import NewsletterRequest, NewsletterResponse
 from ..schemas.analytics import (
-    BudgetCalculationCreate, PageViewCreate, UserEventCreate,
+    BudgetCalculationCreate, PageViewCreate, UserEventCreate, AnalyticsBatchResponse, AnalyticsBatchError,
     AnalyticsSummary, CityCount, StyleCount, BudgetCalculationResponse
 )
 from ..domain.cost_calculator import CostCalculator
+from ..domain.budget_grid import get_budget_grid
+from ..domain.batch_calculator import BatchCostCalculator
+from ..domain.travel_windows import sweep_budget
+from ..domain.itinerary import ItineraryCalculator, ItineraryLeg
+from ..domain.trip_optimizer import month_window
+from ..domain.monte_carlo import simulate_budget
+from ..domain.currency import BASE_CURRENCY
 from ..domain.seasonality import get_season
 from ..domain.travel_tips import get_travel_tips, get_city_recommendations
+from ..domain.answer_index import get_answer_index
+from ..domain.topic_filter import get_topic_filter, REFUSALS
 from ..services.exchange_rate import ExchangeRateService
 from ..services.chat import ChatService
+from ..services.chat_scheduler import ChatBusyError
 from ..services.google_maps import GoogleMapsService
+from ..services.trip_optimizer import TripOptimizerService, OptimizerBusyError, OptimizerTimeoutError
+from ..services.http_client import http_clients
+from ..services.chat_history import ChatHistoryStore
+from ..services.analytics_buffer import AnalyticsBuffer
+from ..services.analytics_rollup import AnalyticsRollup
 from ..middleware.security import validate_city, validate_session_id, sanitize_string, normalize_city
 from ..db.database import get_db
 from ..db.models import BudgetCalculation, PageView, UserEvent, NewsletterSubscriber, ChatSession
@@ -29,7 +56,11 @@ router = APIRouter()
 
 exchange_service = ExchangeRateService()
 chat_service = ChatService()
+chat_history = ChatHistoryStore()
+analytics_buffer = AnalyticsBuffer()
+analytics_rollup = AnalyticsRollup()
 maps_service = GoogleMapsService()
+optimizer_service = TripOptimizerService()
 
 VALID_CITIES = ["Tokyo", "Osaka", "Kyoto", "Hokkaido", "Fukuoka", "Okinawa", "Nagoya", "Hiroshima", "Nara", "Yokohama"]
 VALID_TRAVEL_STYLES = ["budget", "mid", "luxury"]
@@ -71,33 +102,97 @@ async def readiness_check(db: Session = Depends(get_db)):
         )
 
 
+@router.get("/health/http")
+async def http_pool_stats():
+    return http_clients.get_stats()
+
+
+@router.get("/health/chat-cache")
+async def chat_cache_stats():
+    return chat_service.cache.get_stats()
+
+
+@router.get("/health/chat-scheduler")
+async def chat_scheduler_stats():
+    return chat_service.scheduler.get_stats()
+
+
+@router.get("/health/chat-upstream")
+async def chat_upstream_stats():
+    return chat_service.get_upstream_stats()
+
+
+@router.get("/health/chat-filter")
+async def chat_filter_stats():
+    return get_topic_filter().get_stats()
+
+
+@router.get("/health/chat-history")
+async def chat_history_stats():
+    return chat_history.get_stats()
+
+
+@router.get("/health/analytics")
+async def analytics_buffer_stats():
+    return analytics_buffer.get_stats()
+
+
+@router.get("/health/analytics-rollup")
+async def analytics_rollup_stats():
+    return analytics_rollup.get_stats()
+
+
 @router.get("/exchange-rate")
 async def get_exchange_rate():
     result = await exchange_service.get_exchange_rate()
     return result
 
 
-@router.post("/budget", response_model=BudgetResponse)
-async def calculate_budget(request: BudgetRequest):
+@router.get("/exchange-rate/history", response_model=RateTrendSchema)
+async def get_exchange_rate_history(currency: str = "JPY", as_of: Optional[date] = None, days: int = 30):
+    if not (1 <= days <= 365):
+        raise HTTPException(status_code=400, detail="Days must be between 1 and 365")
+    try:
+        trend = exchange_service.history.trend(currency, as_of or datetime.utcnow().date(), days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if trend is None:
+        raise HTTPException(status_code=404, detail="No exchange rate history recorded")
+    return RateTrendSchema(**vars(trend))
+
+
+def _budget_request_error(request: BudgetScenario) -> Optional[str]:
     if not validate_city(request.city):
-        raise HTTPException(status_code=400, detail="Invalid city")
+        return "Invalid city"
     if request.travel_style not in VALID_TRAVEL_STYLES:
-        raise HTTPException(status_code=400, detail="Invalid travel style")
+        return "Invalid travel style"
     if not (1 <= request.num_days <= 90):
-        raise HTTPException(status_code=400, detail="Days must be between 1 and 90")
+        return "Days must be between 1 and 90"
     if not (1 <= request.num_travelers <= 20):
-        raise HTTPException(status_code=400, detail="Travelers must be between 1 and 20")
+        return "Travelers must be between 1 and 20"
     if not (1 <= request.month <= 12):
-        raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
-    
-    normalized_city = normalize_city(request.city)
-    
-    rate_data = await exchange_service.get_exchange_rate()
-    exchange_rate = rate_data["rate"]
-    
-    calculator = CostCalculator(exchange_rate=exchange_rate)
-    breakdown = calculator.calculate_budget(
-        city=normalized_city,
+        return "Month must be between 1 and 12"
+    if (request.departure_date is None) != (request.return_date is None):
+        return "Both departure_date and return_date are required"
+    if request.departure_date and not (1 <= (request.return_date - request.departure_date).days <= 90):
+        return "Trip must be between 1 and 90 nights"
+    return None
+
+
+def _calculate_breakdown(request: BudgetScenario, city: str, grid):
+    if request.departure_date and request.return_date:
+        calculator = CostCalculator(exchange_rate=grid.exchange_rate, pricing_table=grid.pricing_table)
+        return calculator.calculate_budget_for_dates(
+            city=city,
+            departure_date=request.departure_date,
+            return_date=request.return_date,
+            num_travelers=request.num_travelers,
+            travel_style=request.travel_style,
+            include_flights=request.include_flights,
+            shopping_budget=request.shopping_budget
+        )
+    return grid.lookup(
+        city=city,
         num_days=request.num_days,
         num_travelers=request.num_travelers,
         travel_style=request.travel_style,
@@ -105,9 +200,77 @@ async def calculate_budget(request: BudgetRequest):
         include_flights=request.include_flights,
         shopping_budget=request.shopping_budget
     )
+
+
+def _trip_month(request: BudgetScenario) -> int:
+    return request.departure_date.month if request.departure_date else request.month
+
+
+@router.post("/budget", response_model=BudgetResponse)
+async def calculate_budget(request: BudgetRequest):
+    error = _budget_request_error(request)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    
+    normalized_city = normalize_city(request.city)
+    
+    rate_data = await exchange_service.get_exchange_rate()
+    exchange_rate = rate_data["rate"]
+    
+    rate_matrix = exchange_service.get_cached_matrix()
+    currency = request.currency.upper()
+    if not rate_matrix.supports(currency):
+        raise HTTPException(status_code=400, detail="Unsupported currency")
+    
+    grid = get_budget_grid(exchange_rate)
+    breakdown = _calculate_breakdown(request, normalized_city, grid)
+    month = _trip_month(request)
     
-    season, season_label = get_season(request.month)
-    total_jpy = calculator.convert_to_jpy(breakdown.total)
+    season, season_label = grid.season(month)
+    total_jpy = grid.convert_to_jpy(breakdown.total)
+    
+    rate_trend = None
+    if request.as_of:
+        # The SGD breakdown does not depend on the rate; only the yen conversion is priced as of the date.
+        history = exchange_service.history
+        try:
+            calculator = CostCalculator.as_of(request.as_of, history=history)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        exchange_rate = calculator.exchange_rate
+        total_jpy = calculator.convert_to_jpy(breakdown.total)
+        trend = history.trend("JPY", request.as_of)
+        low, mean, high = calculator.jpy_trend_band(breakdown.total, trend)
+        rate_trend = RateTrendSchema(
+            **vars(trend), total_jpy_low=low, total_jpy_mean=mean, total_jpy_high=high
+        )
+        # Line items are converted at the same historical rates as the headline total.
+        rate_matrix = exchange_service.matrix_as_of(request.as_of)
+        if not rate_matrix.supports(currency):
+            raise HTTPException(status_code=400, detail=f"No {currency} rate recorded on or before {request.as_of.isoformat()}")
+    
+    converted_breakdown = None
+    if currency != BASE_CURRENCY:
+        converted_breakdown = CostBreakdownSchema(**vars(rate_matrix.convert_breakdown(breakdown, currency)))
+    
+    uncertainty = None
+    if request.include_uncertainty:
+        # Bounded by max_time_ms, but still CPU work; keep it off the event loop.
+        bands = await run_in_threadpool(
+            simulate_budget,
+            breakdown,
+            city=normalized_city,
+            travel_style=request.travel_style,
+            month=month,
+            draws=request.uncertainty_draws,
+            seed=request.uncertainty_seed
+        )
+        uncertainty = UncertaintyBandsSchema(
+            bands={name: CategoryBandSchema(**vars(band)) for name, band in bands.bands.items()},
+            draws=bands.draws,
+            seed=bands.seed,
+            compute_time_ms=bands.compute_time_ms
+        )
     
     return BudgetResponse(
         breakdown=CostBreakdownSchema(
@@ -123,10 +286,191 @@ async def calculate_budget(request: BudgetRequest):
         exchange_rate=exchange_rate,
         total_jpy=total_jpy,
         season=season,
+        season_label=season_label,
+        currency=currency,
+        currency_rate=rate_matrix.rate(BASE_CURRENCY, currency),
+        converted_breakdown=converted_breakdown,
+        rate_trend=rate_trend,
+        uncertainty=uncertainty
+    )
+
+
+@router.post("/budget/batch", response_model=BudgetBatchResponse)
+async def calculate_budget_batch(request: BudgetBatchRequest):
+    scenarios = request.scenarios
+    for idx, scenario in enumerate(scenarios):
+        error = _budget_request_error(scenario)
+        if error:
+            raise HTTPException(status_code=400, detail=f"Scenario {idx}: {error}")
+    
+    rate_data = await exchange_service.get_exchange_rate()
+    exchange_rate = rate_data["rate"]
+    
+    calculator = BatchCostCalculator(exchange_rate=exchange_rate)
+    batch = calculator.calculate_budgets(
+        cities=[normalize_city(s.city) for s in scenarios],
+        num_days=[s.num_days for s in scenarios],
+        num_travelers=[s.num_travelers for s in scenarios],
+        travel_styles=[s.travel_style for s in scenarios],
+        months=[s.month for s in scenarios],
+        include_flights=[s.include_flights for s in scenarios],
+        shopping_budgets=[s.shopping_budget for s in scenarios]
+    )
+    breakdowns = batch.breakdowns()
+    
+    dated = [idx for idx, s in enumerate(scenarios) if s.departure_date]
+    if dated:
+        grid = get_budget_grid(exchange_rate)
+        for idx in dated:
+            breakdowns[idx] = _calculate_breakdown(scenarios[idx], normalize_city(scenarios[idx].city), grid)
+    
+    totals_jpy = calculator.convert_to_jpy([b.total for b in breakdowns]).tolist()
+    
+    results = []
+    for scenario, breakdown, total_jpy in zip(scenarios, breakdowns, totals_jpy):
+        season, season_label = get_season(_trip_month(scenario))
+        results.append(BudgetResponse(
+            breakdown=CostBreakdownSchema(**vars(breakdown)),
+            exchange_rate=exchange_rate,
+            total_jpy=total_jpy,
+            season=season,
+            season_label=season_label
+        ))
+    
+    return BudgetBatchResponse(
+        results=results,
+        exchange_rate=exchange_rate,
+        count=len(results)
+    )
+
+
+@router.post("/budget/sweep", response_model=BudgetSweepResponse)
+async def sweep_budget_windows(request: BudgetSweepRequest):
+    if not validate_city(request.city):
+        raise HTTPException(status_code=400, detail="Invalid city")
+    if request.travel_style not in VALID_TRAVEL_STYLES:
+        raise HTTPException(status_code=400, detail="Invalid travel style")
+    if request.min_days > request.max_days:
+        raise HTTPException(status_code=400, detail="min_days must not exceed max_days")
+    
+    normalized_city = normalize_city(request.city)
+    
+    started = time.perf_counter()
+    sweep = sweep_budget(
+        city=normalized_city,
+        travel_style=request.travel_style,
+        num_travelers=request.num_travelers,
+        min_days=request.min_days,
+        max_days=request.max_days,
+        include_flights=request.include_flights,
+        shopping_budget=request.shopping_budget,
+        target_total=request.target_total,
+        limit=request.limit
+    )
+    compute_time_ms = (time.perf_counter() - started) * 1000
+    
+    return BudgetSweepResponse(
+        city=normalized_city,
+        travel_style=request.travel_style,
+        num_travelers=request.num_travelers,
+        months=sweep.months,
+        days=sweep.days,
+        totals=sweep.totals,
+        cheapest_windows=[TravelWindowSchema(**vars(w)) for w in sweep.cheapest_windows],
+        climate=[ClimateSchema(**vars(c)) for c in sweep.climate],
+        compute_time_ms=round(compute_time_ms, 3)
+    )
+
+
+@router.post("/budget/itinerary", response_model=ItineraryResponse)
+async def calculate_itinerary(request: ItineraryRequest):
+    for idx, leg in enumerate(request.legs):
+        if not validate_city(leg.city):
+            raise HTTPException(status_code=400, detail=f"Leg {idx}: Invalid city")
+    if request.travel_style not in VALID_TRAVEL_STYLES:
+        raise HTTPException(status_code=400, detail="Invalid travel style")
+    if sum(leg.nights for leg in request.legs) > 90:
+        raise HTTPException(status_code=400, detail="Itinerary must not exceed 90 nights")
+    
+    rate_data = await exchange_service.get_exchange_rate()
+    exchange_rate = rate_data["rate"]
+    grid = get_budget_grid(exchange_rate)
+    
+    calculator = ItineraryCalculator(
+        num_travelers=request.num_travelers,
+        travel_style=request.travel_style,
+        month=request.month,
+        include_flights=request.include_flights,
+        shopping_budget=request.shopping_budget,
+        grid=grid
+    )
+    for leg in request.legs:
+        calculator.add_leg(ItineraryLeg(city=normalize_city(leg.city), nights=leg.nights, month=leg.month))
+    result = calculator.calculate()
+    
+    season, season_label = grid.season(request.month)
+    
+    return ItineraryResponse(
+        legs=[
+            ItineraryLegResult(
+                city=leg_cost.leg.city,
+                nights=leg_cost.leg.nights,
+                month=leg_cost.month,
+                breakdown=CostBreakdownSchema(**vars(leg_cost.breakdown)),
+                transfer_cost=leg_cost.transfer_cost,
+                climate=ClimateSchema(**vars(leg_cost.climate))
+            )
+            for leg_cost in result.legs
+        ],
+        breakdown=CostBreakdownSchema(**vars(result.breakdown)),
+        intercity_transport=result.intercity_transport,
+        total_nights=result.total_nights,
+        exchange_rate=exchange_rate,
+        total_jpy=grid.convert_to_jpy(result.breakdown.total),
+        season=season,
         season_label=season_label
     )
 
 
+@router.post("/budget/optimize", response_model=TripOptimizeResponse)
+async def optimize_trip_budget(request: TripOptimizeRequest):
+    cities = request.cities or VALID_CITIES
+    for city in cities:
+        if not validate_city(city):
+            raise HTTPException(status_code=400, detail="Invalid city")
+    for style in request.travel_styles:
+        if style not in VALID_TRAVEL_STYLES:
+            raise HTTPException(status_code=400, detail="Invalid travel style")
+    if request.min_days > request.max_days:
+        raise HTTPException(status_code=400, detail="min_days must not exceed max_days")
+    
+    try:
+        result = await optimizer_service.optimize(
+            max_total=request.max_total,
+            num_travelers=request.num_travelers,
+            cities=[normalize_city(c) for c in cities],
+            months=month_window(request.earliest_month, request.latest_month),
+            travel_styles=request.travel_styles,
+            min_days=request.min_days,
+            max_days=request.max_days,
+            include_flights=request.include_flights,
+            shopping_budget=request.shopping_budget,
+            limit=request.limit
+        )
+    except OptimizerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except OptimizerTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return TripOptimizeResponse(
+        candidates=[TripCandidateSchema(**vars(c)) for c in result.candidates],
+        candidates_evaluated=result.candidates_evaluated,
+        search_time_ms=result.search_time_ms
+    )
+
+
 @router.get("/tips")
 async def get_tips(travel_style: str = "mid"):
     if travel_style not in VALID_TRAVEL_STYLES:
@@ -144,8 +488,7 @@ async def get_recommendations(city: str):
     return recommendations
 
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest, req: Request):
+async def _prepare_chat(request: ChatRequest, req: Request):
     if not request.message or len(request.message.strip()) == 0:
         raise HTTPException(status_code=400, detail="Message is required")
     
@@ -158,31 +501,132 @@ async def chat(request: ChatRequest, req: Request):
     if request.history and len(request.history) > 50:
         raise HTTPException(status_code=400, detail="Too many messages in history (max 50)")
     
+    referer = req.headers.get("referer", "https://japan-travel-budget.replit.app")
+    
+    sanitized_message = sanitize_string(request.message, 4000)
+    
+    history = None
+    if request.history:
+        history = [
+            {"role": h.role, "content": sanitize_string(h.content, 4000)} 
+            for h in request.history 
+            if h.role in ["user", "assistant"] and len(h.content.strip()) > 0
+        ]
+    elif request.session_id:
+        # Server-side history was sanitized when stored, so clients only send the new message.
+        history = await chat_history.load(request.session_id) or None
+    
+    return sanitized_message, history, referer
+
+
+def _record_chat(session_id: Optional[str], message: str, reply: str) -> None:
+    if session_id:
+        chat_history.append(session_id, "user", message)
+        # Replies are sent back upstream as history on later turns, so they get the same treatment.
+        chat_history.append(session_id, "assistant", sanitize_string(reply, 4000))
+
+
+def _screen_chat(message: str) -> Optional[str]:
+    verdict = get_topic_filter().check(message)
+    return None if verdict.allowed else REFUSALS[verdict.label]
+
+
+def _local_answer(request: ChatRequest, message: str, history) -> Optional[str]:
+    # Follow-ups lean on the conversation so far, and cache=False asks for a fresh, personal answer.
+    if history or not request.cache:
+        return None
+    match = get_answer_index().answer(message)
+    return match.document.answer if match else None
+
+
+def _sse_event(data: dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest, req: Request):
+    sanitized_message, history, referer = await _prepare_chat(request, req)
+    
+    refusal = _screen_chat(sanitized_message)
+    if refusal is not None:
+        return ChatResponse(message=refusal, session_id=request.session_id, source="filter")
+    
+    local = _local_answer(request, sanitized_message, history)
+    if local is not None:
+        _record_chat(request.session_id, sanitized_message, local)
+        return ChatResponse(message=local, session_id=request.session_id, source="local")
+    
     try:
-        referer = req.headers.get("referer", "https://japan-travel-budget.replit.app")
-        
-        sanitized_message = sanitize_string(request.message, 4000)
-        
-        history = None
-        if request.history:
-            history = [
-                {"role": h.role, "content": sanitize_string(h.content, 4000)} 
-                for h in request.history 
-                if h.role in ["user", "assistant"] and len(h.content.strip()) > 0
-            ]
-        
         response = await chat_service.send_message(
             message=sanitized_message,
             history=history,
-            referer=referer
+            referer=referer,
+            use_cache=request.cache
         )
+        _record_chat(request.session_id, sanitized_message, response)
         
         return ChatResponse(
             message=response,
             session_id=request.session_id
         )
+    except ChatBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest, req: Request):
+    sanitized_message, history, referer = await _prepare_chat(request, req)
+    
+    refusal = _screen_chat(sanitized_message)
+    local = None if refusal is not None else _local_answer(request, sanitized_message, history)
+    if refusal is not None or local is not None:
+        if local is not None:
+            _record_chat(request.session_id, sanitized_message, local)
+        source = "local" if local is not None else "filter"
+        body = _sse_event({"content": local or refusal}) + _sse_event({"session_id": request.session_id, "source": source}, event="done")
+        return StreamingResponse(iter([body]), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+    
+    tokens = chat_service.stream_message(
+        message=sanitized_message,
+        history=history,
+        referer=referer,
+        use_cache=request.cache
+    )
+    # Wait for the first token so configuration and upstream errors still get a proper status code.
+    try:
+        first_token = await tokens.__anext__()
+    except StopAsyncIteration:
+        first_token = None
+    except ChatBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    async def events():
+        try:
+            parts = []
+            if first_token is not None:
+                parts.append(first_token)
+                yield _sse_event({"content": first_token})
+                async for token in tokens:
+                    parts.append(token)
+                    yield _sse_event({"content": token})
+            if parts:
+                _record_chat(request.session_id, sanitized_message, "".join(parts))
+            yield _sse_event({"session_id": request.session_id}, event="done")
+        except ValueError as e:
+            yield _sse_event({"error": str(e)}, event="error")
+        finally:
+            await tokens.aclose()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/google-maps-configured")
@@ -211,64 +655,131 @@ async def health_check():
     return {"status": "healthy", "service": "japan-travel-budget-api"}
 
 
+def _queue_analytics(table: str, row: dict) -> dict:
+    if analytics_buffer.session_factory is None:
+        raise HTTPException(status_code=503, detail="Analytics storage not configured")
+    if not analytics_buffer.add(table, row):
+        raise HTTPException(status_code=503, detail="Analytics buffer full, please retry later")
+    return {"success": True, "queued": True}
+
+
+def _budget_calculation_row(request: BudgetCalculationCreate) -> dict:
+    return {
+        "session_id": sanitize_string(request.session_id, 100) if request.session_id else None,
+        "departure_date": sanitize_string(request.departure_date, 20) if request.departure_date else None,
+        "return_date": sanitize_string(request.return_date, 20) if request.return_date else None,
+        "travelers": request.travelers,
+        "cities": [sanitize_string(c, 50) for c in request.cities],
+        "travel_style": sanitize_string(request.travel_style, 20),
+        "total_budget_sgd": request.total_budget_sgd,
+        "per_person_sgd": request.per_person_sgd,
+        "exchange_rate": request.exchange_rate,
+        "breakdown": request.breakdown,
+    }
+
+
+def _page_view_row(request: PageViewCreate) -> dict:
+    return {
+        "session_id": sanitize_string(request.session_id, 100) if request.session_id else None,
+        "page_path": sanitize_string(request.page_path, 500),
+        "referrer": sanitize_string(request.referrer, 500) if request.referrer else None,
+        "user_agent": sanitize_string(request.user_agent, 500) if request.user_agent else None,
+    }
+
+
+def _user_event_row(request: UserEventCreate) -> dict:
+    return {
+        "session_id": sanitize_string(request.session_id, 100) if request.session_id else None,
+        "event_type": sanitize_string(request.event_type, 100),
+        "event_category": sanitize_string(request.event_category, 100),
+        "event_data": request.event_data,
+    }
+
+
+ANALYTICS_BATCH_TYPES = {
+    "budget": (BudgetCalculationCreate, BudgetCalculation.__tablename__, _budget_calculation_row),
+    "pageview": (PageViewCreate, PageView.__tablename__, _page_view_row),
+    "event": (UserEventCreate, UserEvent.__tablename__, _user_event_row),
+}
+MAX_BATCH_BYTES = 1_000_000
+MAX_BATCH_RECORDS = 1000
+MAX_BATCH_ERRORS = 50
+
+
 @router.post("/analytics/budget")
-async def track_budget_calculation(request: BudgetCalculationCreate, db: Session = Depends(get_db)):
-    try:
-        calculation = BudgetCalculation(
-            session_id=sanitize_string(request.session_id, 100) if request.session_id else None,
-            departure_date=sanitize_string(request.departure_date, 20) if request.departure_date else None,
-            return_date=sanitize_string(request.return_date, 20) if request.return_date else None,
-            travelers=request.travelers,
-            cities=[sanitize_string(c, 50) for c in request.cities],
-            travel_style=sanitize_string(request.travel_style, 20),
-            total_budget_sgd=request.total_budget_sgd,
-            per_person_sgd=request.per_person_sgd,
-            exchange_rate=request.exchange_rate,
-            breakdown=request.breakdown
-        )
-        db.add(calculation)
-        db.commit()
-        db.refresh(calculation)
-        return {"success": True, "id": calculation.id}
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail="Failed to track budget calculation")
+async def track_budget_calculation(request: BudgetCalculationCreate):
+    return _queue_analytics(BudgetCalculation.__tablename__, _budget_calculation_row(request))
 
 
 @router.post("/analytics/pageview")
-async def track_page_view(request: PageViewCreate, db: Session = Depends(get_db)):
-    try:
-        page_view = PageView(
-            session_id=sanitize_string(request.session_id, 100) if request.session_id else None,
-            page_path=sanitize_string(request.page_path, 500),
-            referrer=sanitize_string(request.referrer, 500) if request.referrer else None,
-            user_agent=sanitize_string(request.user_agent, 500) if request.user_agent else None
-        )
-        db.add(page_view)
-        db.commit()
-        db.refresh(page_view)
-        return {"success": True, "id": page_view.id}
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail="Failed to track page view")
+async def track_page_view(request: PageViewCreate):
+    return _queue_analytics(PageView.__tablename__, _page_view_row(request))
 
 
 @router.post("/analytics/event")
-async def track_user_event(request: UserEventCreate, db: Session = Depends(get_db)):
-    try:
-        event = UserEvent(
-            session_id=sanitize_string(request.session_id, 100) if request.session_id else None,
-            event_type=sanitize_string(request.event_type, 100),
-            event_category=sanitize_string(request.event_category, 100),
-            event_data=request.event_data
-        )
-        db.add(event)
-        db.commit()
-        db.refresh(event)
-        return {"success": True, "id": event.id}
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail="Failed to track event")
+async def track_user_event(request: UserEventCreate):
+    return _queue_analytics(UserEvent.__tablename__, _user_event_row(request))
+
+
+async def _ndjson_lines(req: Request) -> AsyncIterator[Tuple[int, bytes]]:
+    # Lines are handed out as chunks arrive, so only one partial line is ever buffered.
+    pending = b""
+    received = 0
+    line_no = 0
+    async for chunk in req.stream():
+        received += len(chunk)
+        if received > MAX_BATCH_BYTES:
+            raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH_BYTES} bytes)")
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line
+    if pending:
+        yield line_no + 1, pending
+
+
+def _batch_record(line: bytes) -> Tuple[str, dict]:
+    data = json.loads(line)
+    if not isinstance(data, dict):
+        raise ValueError("Record must be a JSON object")
+    record_type = data.pop("type", None)
+    if record_type not in ANALYTICS_BATCH_TYPES:
+        raise ValueError(f"Unknown record type: {record_type}")
+    schema, table, build_row = ANALYTICS_BATCH_TYPES[record_type]
+    return table, build_row(schema.model_validate(data))
+
+
+@router.post("/analytics/batch", response_model=AnalyticsBatchResponse)
+async def track_analytics_batch(req: Request):
+    if analytics_buffer.session_factory is None:
+        raise HTTPException(status_code=503, detail="Analytics storage not configured")
+    
+    records = []
+    errors = []
+    async for line_no, line in _ndjson_lines(req):
+        if not line.strip():
+            continue
+        if len(records) + len(errors) >= MAX_BATCH_RECORDS:
+            raise HTTPException(status_code=413, detail=f"Too many records (max {MAX_BATCH_RECORDS})")
+        try:
+            records.append(_batch_record(line))
+        except ValidationError as e:
+            message = "; ".join(f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors())
+            errors.append(AnalyticsBatchError(line=line_no, error=message))
+        except json.JSONDecodeError:
+            errors.append(AnalyticsBatchError(line=line_no, error="Invalid JSON"))
+        except ValueError as e:
+            errors.append(AnalyticsBatchError(line=line_no, error=str(e)))
+    
+    if records and not analytics_buffer.add_many(records):
+        raise HTTPException(status_code=503, detail="Analytics buffer full, please retry later")
+    
+    return AnalyticsBatchResponse(
+        success=not errors,
+        accepted=len(records),
+        rejected=len(errors),
+        errors=errors[:MAX_BATCH_ERRORS]
+    )
 
 
 @router.get("/analytics/dashboard")
@@ -277,61 +788,26 @@ async def get_analytics_dashboard(days: int = 30, db: Session = Depends(get_db))
         days = min(max(1, days), 365)
         start_date = datetime.utcnow() - timedelta(days=days)
         
-        budget_count = db.query(func.count(BudgetCalculation.id)).filter(
-            BudgetCalculation.created_at >= start_date
-        ).scalar() or 0
-        
-        page_view_count = db.query(func.count(PageView.id)).filter(
-            PageView.created_at >= start_date
-        ).scalar() or 0
-        
-        event_count = db.query(func.count(UserEvent.id)).filter(
-            UserEvent.created_at >= start_date
-        ).scalar() or 0
-        
+        # Pre-aggregated hourly/daily buckets; raw rows are only read for the partial edges.
+        summary = analytics_rollup.dashboard(db, start_date)
         subscriber_count = db.query(func.count(NewsletterSubscriber.id)).scalar() or 0
         session_count = db.query(func.count(ChatSession.id)).scalar() or 0
         
-        city_stats = db.execute(text("""
-            SELECT unnest(cities) as city, COUNT(*) as count 
-            FROM budget_calculations 
-            WHERE created_at >= :start_date
-            GROUP BY city 
-            ORDER BY count DESC 
-            LIMIT 10
-        """), {"start_date": start_date}).fetchall()
-        
-        style_stats = db.execute(text("""
-            SELECT travel_style as style, COUNT(*) as count 
-            FROM budget_calculations 
-            WHERE created_at >= :start_date
-            GROUP BY travel_style 
-            ORDER BY count DESC
-        """), {"start_date": start_date}).fetchall()
-        
-        avg_stats = db.execute(text("""
-            SELECT 
-                COALESCE(AVG(total_budget_sgd::numeric), 0) as avg_budget,
-                COALESCE(AVG(travelers), 0) as avg_travelers
-            FROM budget_calculations 
-            WHERE created_at >= :start_date
-        """), {"start_date": start_date}).fetchone()
-        
         recent_calcs = db.query(BudgetCalculation).order_by(
             BudgetCalculation.created_at.desc()
         ).limit(10).all()
         
         return {
             "period": f"{days} days",
-            "total_budget_calculations": budget_count,
-            "total_page_views": page_view_count,
-            "total_user_events": event_count,
+            "total_budget_calculations": summary.budget_calculations,
+            "total_page_views": summary.page_views,
+            "total_user_events": summary.user_events,
             "total_newsletter_subscribers": subscriber_count,
             "total_chat_sessions": session_count,
-            "popular_cities": [{"city": row[0], "count": row[1]} for row in city_stats],
-            "popular_travel_styles": [{"style": row[0], "count": row[1]} for row in style_stats],
-            "average_budget": float(avg_stats[0]) if avg_stats else 0,
-            "average_travelers": float(avg_stats[1]) if avg_stats else 0,
+            "popular_cities": [{"city": city, "count": count} for city, count in summary.popular_cities],
+            "popular_travel_styles": [{"style": style, "count": count} for style, count in summary.popular_travel_styles],
+            "average_budget": summary.average_budget,
+            "average_travelers": summary.average_travelers,
             "recent_calculations": [
                 {
                     "id": calc.id,
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Numeric, ARRAY
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Boolean, Numeric, ARRAY
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -51,7 +51,7 @@ class BudgetCalculation(Base):
     per_person_sgd = Column(Numeric(10, 2), nullable=False)
     exchange_rate = Column(Numeric(10, 4), nullable=False)
     breakdown = Column(JSONB, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
 
 class PageView(Base):
@@ -62,7 +62,7 @@ class PageView(Base):
     page_path = Column(Text, nullable=False)
     referrer = Column(Text, nullable=True)
     user_agent = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
 
 class UserEvent(Base):
@@ -73,4 +73,31 @@ class UserEvent(Base):
     event_type = Column(String(100), nullable=False)
     event_category = Column(String(100), nullable=False)
     event_data = Column(JSONB, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class AnalyticsHourlyRollup(Base):
+    __tablename__ = "analytics_hourly_rollups"
+
+    bucket_start = Column(DateTime, primary_key=True)
+    metric = Column(String(50), primary_key=True)
+    dimension = Column(String(100), primary_key=True, default="")
+    count = Column(BigInteger, nullable=False, default=0)
+    value_sum = Column(Numeric(18, 2), nullable=False, default=0)
+
+
+class AnalyticsDailyRollup(Base):
+    __tablename__ = "analytics_daily_rollups"
+
+    bucket_start = Column(DateTime, primary_key=True)
+    metric = Column(String(50), primary_key=True)
+    dimension = Column(String(100), primary_key=True, default="")
+    count = Column(BigInteger, nullable=False, default=0)
+    value_sum = Column(Numeric(18, 2), nullable=False, default=0)
+
+
+class AnalyticsRollupState(Base):
+    __tablename__ = "analytics_rollup_state"
+
+    source = Column(String(100), primary_key=True)
+    last_id = Column(BigInteger, nullable=False, default=0)
@@ -1,4 +1,11 @@
 # Domain layer - Pure business logic
 from .cost_calculator import CostCalculator, CostBreakdown, CITY_PRICING, FLIGHT_PRICES
-from .seasonality import get_season, get_seasonal_multiplier, get_weather_info
+from .pricing_table import PricingTable, get_pricing_table, compile_pricing_table
+from .batch_calculator import BatchCostCalculator, BudgetBatch
+from .seasonality import get_season, get_seasonal_multiplier, get_weather_info, get_date_range_multiplier
+from .currency import RateMatrix
+from .rate_history import RateHistory, RateTrend, get_rate_history
+from .climate import ClimateStore, ClimateInfo, get_climate_store
 from .travel_tips import get_travel_tips, get_city_recommendations
+from .answer_index import AnswerIndex, AnswerDocument, get_answer_index
+from .topic_filter import TopicFilter, TopicVerdict, get_topic_filter
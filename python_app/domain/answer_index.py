@@ -0,0 +1,298 @@
+import calendar
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .climate import CITY_CLIMATE, get_climate_store
+from .cost_calculator import CITY_PRICING
+from .seasonality import SEASONS, MONTH_MULTIPLIERS
+from .travel_tips import MONEY_SAVING_TIPS, CITY_RECOMMENDATIONS
+
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+DEFAULT_THRESHOLD = 0.8
+# A lone matched term ("tokyo") says too little about what the user actually wants.
+MIN_MATCHED_TERMS = 2
+# Runner-up this close to the best match means the question is ambiguous between documents.
+AMBIGUITY_RATIO = 0.95
+
+STOPWORDS = frozenset("""
+a an the is are was were be been am do does did can could would should will shall may might must
+i me my we our you your it its they them their there here this that these those
+what whats which who whom how when where why much many any some
+to in on at for of from by with about into over and or but if so as than then
+please tell know need want get going go like just also really very japan trip
+""".split()) - {"must"}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+SECTION_KEYWORDS = {
+    "must_see": ("Must-see in {city}", "must see sights attractions places visit things top landmarks"),
+    "hidden_gems": ("Hidden gems in {city}", "hidden gems secret spots off beaten path less touristy local"),
+    "food_spots": ("Where to eat in {city}", "food eat restaurants dishes cuisine local specialties"),
+}
+
+
+def tokenize(text: str, skip_stopwords: bool = False) -> List[str]:
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if len(token) < 2 or (skip_stopwords and token in STOPWORDS):
+            continue
+        # Light plural folding so "temples" matches "temple" without a full stemmer.
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def query_terms(text: str) -> List[str]:
+    return list(dict.fromkeys(tokenize(text, skip_stopwords=True)))
+
+
+@dataclass(frozen=True)
+class AnswerDocument:
+    doc_id: str
+    text: str
+    answer: str
+
+    @property
+    def digest(self) -> bytes:
+        return hashlib.blake2b(f"{self.text}\0{self.answer}".encode(), digest_size=16).digest()
+
+
+@dataclass
+class AnswerMatch:
+    document: AnswerDocument
+    score: float
+    confidence: float
+
+
+def _tip_documents() -> List[AnswerDocument]:
+    docs = []
+    by_category: Dict[str, List[dict]] = {}
+    for tip in MONEY_SAVING_TIPS:
+        by_category.setdefault(tip["category"], []).append(tip)
+        docs.append(AnswerDocument(
+            doc_id=f"tip:{tip['title'].lower()}",
+            text=f"{tip['category']} {tip['title']} {tip['description']} save saving cheap",
+            answer=f"{tip['title']}: {tip['description']}. Typical savings: {tip['savings']}.",
+        ))
+    for category, tips in by_category.items():
+        lines = "; ".join(f"{t['title']} ({t['savings']})" for t in tips)
+        docs.append(AnswerDocument(
+            doc_id=f"tips:{category.lower()}",
+            text=f"{category} save money saving tips cheap budget " + " ".join(t["title"] for t in tips),
+            answer=f"Money-saving tips for {category.lower()}: {lines}.",
+        ))
+    return docs
+
+
+def _recommendation_documents() -> List[AnswerDocument]:
+    docs = []
+    for city, sections in CITY_RECOMMENDATIONS.items():
+        for section, items in sections.items():
+            heading, keywords = SECTION_KEYWORDS.get(section, (section.replace("_", " ").title() + " in {city}", ""))
+            docs.append(AnswerDocument(
+                doc_id=f"recs:{city}:{section}",
+                text=f"{city} {keywords} " + " ".join(items),
+                answer=f"{heading.format(city=city.title())}: " + "; ".join(items) + ".",
+            ))
+    return docs
+
+
+def _pricing_documents() -> List[AnswerDocument]:
+    docs = []
+    for city, p in CITY_PRICING.items():
+        docs.append(AnswerDocument(
+            doc_id=f"pricing:{city}",
+            text=f"{city} cost costs price prices daily budget expensive hotel accommodation food meal transport activities",
+            answer=(
+                f"Typical daily costs in {city.title()}: accommodation S${p.accommodation_budget:.0f} budget, "
+                f"S${p.accommodation_mid:.0f} mid-range or S${p.accommodation_luxury:.0f} luxury per night; "
+                f"food S${p.food_budget:.0f} / S${p.food_mid:.0f} / S${p.food_luxury:.0f} per day; "
+                f"transport about S${p.transport_daily:.0f} and activities about S${p.activities_daily:.0f} per day."
+            ),
+        ))
+    return docs
+
+
+def _percent_vs_average(multiplier: float) -> str:
+    change = round((multiplier - 1) * 100)
+    if change == 0:
+        return "about average"
+    return f"about {abs(change)}% {'above' if change > 0 else 'below'} average"
+
+
+def _season_documents() -> List[AnswerDocument]:
+    docs = []
+    by_price = sorted(MONTH_MULTIPLIERS, key=MONTH_MULTIPLIERS.get)
+    cheapest = ", ".join(calendar.month_name[m] for m in by_price[:3])
+    priciest = ", ".join(calendar.month_name[m] for m in by_price[-3:][::-1])
+    docs.append(AnswerDocument(
+        doc_id="season:overview",
+        text="best time visit cheapest month months season when travel crowds peak off",
+        answer=(
+            f"The cheapest months to visit Japan are {cheapest}; the most expensive are {priciest}, "
+            f"driven by cherry blossoms, Golden Week and autumn leaves."
+        ),
+    ))
+    for month, (season, label) in SEASONS.items():
+        name = calendar.month_name[month]
+        docs.append(AnswerDocument(
+            doc_id=f"season:{month}",
+            text=f"{name} {calendar.month_abbr[month]} {season} {label} visit travel price prices crowds",
+            answer=f"{name} is {label.lower()} in Japan ({season}), with travel prices {_percent_vs_average(MONTH_MULTIPLIERS[month])}.",
+        ))
+    return docs
+
+
+def _weather_documents() -> List[AnswerDocument]:
+    store = get_climate_store()
+    docs = []
+    for city in CITY_CLIMATE:
+        for month in range(1, 13):
+            info = store.info(city, month)
+            name = calendar.month_name[month]
+            docs.append(AnswerDocument(
+                doc_id=f"weather:{city}:{month}",
+                text=f"{city} {name} {calendar.month_abbr[month]} weather temperature rain rainfall climate hot cold pack",
+                answer=(
+                    f"{city.title()} in {name}: {info.temp_low:.0f} to {info.temp_high:.0f}°C "
+                    f"with about {info.rainfall:.0f}mm of rain. {info.description}"
+                ),
+            ))
+    return docs
+
+
+def build_documents() -> List[AnswerDocument]:
+    return (
+        _tip_documents() + _recommendation_documents() + _pricing_documents()
+        + _season_documents() + _weather_documents()
+    )
+
+
+class AnswerIndex:
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B, threshold: Optional[float] = None):
+        self.k1 = k1
+        self.b = b
+        if threshold is None:
+            threshold = float(os.environ.get("CHAT_LOCAL_ANSWER_THRESHOLD", DEFAULT_THRESHOLD))
+        self.threshold = threshold
+        self._documents: Dict[str, Tuple[AnswerDocument, bytes, Counter]] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _add(self, doc: AnswerDocument, digest: bytes) -> None:
+        counts = Counter(tokenize(doc.text))
+        self._documents[doc.doc_id] = (doc, digest, counts)
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[doc.doc_id] = tf
+        length = sum(counts.values())
+        self._lengths[doc.doc_id] = length
+        self._total_length += length
+
+    def _remove(self, doc_id: str) -> None:
+        _, _, counts = self._documents.pop(doc_id)
+        for term in counts:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+
+    def upsert(self, doc: AnswerDocument) -> bool:
+        digest = doc.digest
+        with self._lock:
+            existing = self._documents.get(doc.doc_id)
+            if existing is not None and existing[1] == digest:
+                return False
+            if existing is not None:
+                self._remove(doc.doc_id)
+            self._add(doc, digest)
+            return True
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            if doc_id not in self._documents:
+                return False
+            self._remove(doc_id)
+            return True
+
+    def sync(self, documents: Iterable[AnswerDocument]) -> Tuple[int, int]:
+        # Only documents whose content changed are re-tokenized; the rest keep their postings.
+        documents = list(documents)
+        updated = sum(self.upsert(doc) for doc in documents)
+        current = {doc.doc_id for doc in documents}
+        removed = sum(self.remove(doc_id) for doc_id in list(self._documents) if doc_id not in current)
+        return updated, removed
+
+    def _idf(self, term: str, total: int) -> float:
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (total - df + 0.5) / (df + 0.5))
+
+    def search(self, text: str, limit: int = 3) -> List[AnswerMatch]:
+        terms = query_terms(text)
+        with self._lock:
+            total = len(self._documents)
+            if not terms or not total:
+                return []
+            avg_length = self._total_length / total
+            weights = {term: self._idf(term, total) for term in terms}
+            scores: Dict[str, float] = {}
+            matched: Dict[str, float] = {}
+            for term, idf in weights.items():
+                for doc_id, tf in self._postings.get(term, {}).items():
+                    norm = tf + self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+                    matched[doc_id] = matched.get(doc_id, 0.0) + idf
+
+            # Confidence is the idf-weighted share of the question the document covers, so rare
+            # unmatched words ("visa", "onsen etiquette") pull it down far more than filler does.
+            weight_total = sum(weights.values())
+            best = sorted(scores, key=scores.get, reverse=True)[:limit]
+            return [
+                AnswerMatch(self._documents[doc_id][0], scores[doc_id], matched[doc_id] / weight_total)
+                for doc_id in best
+            ]
+
+    def answer(self, text: str, threshold: Optional[float] = None) -> Optional[AnswerMatch]:
+        threshold = self.threshold if threshold is None else threshold
+        if threshold > 1:
+            return None
+        matches = self.search(text, limit=2)
+        if not matches:
+            return None
+        top = matches[0]
+        if top.confidence < threshold:
+            return None
+        if sum(1 for term in query_terms(text) if term in self._documents[top.document.doc_id][2]) < MIN_MATCHED_TERMS:
+            return None
+        if len(matches) > 1 and matches[1].score >= top.score * AMBIGUITY_RATIO:
+            return None
+        return top
+
+
+_index: Optional[AnswerIndex] = None
+
+
+def get_answer_index() -> AnswerIndex:
+    global _index
+    if _index is None:
+        _index = AnswerIndex()
+        _index.sync(build_documents())
+    return _index
+
+
+def refresh_answer_index() -> Tuple[int, int]:
+    return get_answer_index().sync(build_documents())
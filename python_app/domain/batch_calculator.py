@@ -0,0 +1,141 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Union
+from .cost_calculator import CostBreakdown
+from .pricing_table import PricingTable, get_pricing_table, style_id
+from .seasonality import MONTH_MULTIPLIERS
+
+
+MONTH_MULTIPLIER_TABLE = np.array([MONTH_MULTIPLIERS[m] for m in range(1, 13)], dtype=np.float64)
+
+ArrayLike = Union[Sequence, np.ndarray]
+
+
+def month_index(months: ArrayLike) -> np.ndarray:
+    return np.clip(np.asarray(months, dtype=np.int64), 1, 12) - 1
+
+
+def round_array(values: np.ndarray, ndigits: int) -> np.ndarray:
+    # np.round can disagree with Python's round() when the scaled value sits on a
+    # half boundary; those few entries fall back to round() so results match CostCalculator.
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    rounded = np.rint(scaled) / scale
+    distance = np.abs(scaled - np.floor(scaled) - 0.5)
+    for i in np.flatnonzero(distance <= 4 * np.spacing(np.abs(scaled))):
+        rounded.flat[i] = round(float(values.flat[i]), ndigits)
+    return rounded
+
+
+def _round_list(values: np.ndarray, ndigits: int) -> List[float]:
+    return round_array(values, ndigits).tolist()
+
+
+@dataclass
+class BudgetBatch:
+    flights: np.ndarray
+    accommodation: np.ndarray
+    food: np.ndarray
+    transport: np.ndarray
+    activities: np.ndarray
+    shopping: np.ndarray
+    total: np.ndarray
+    daily_average: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.total)
+
+    def breakdowns(self) -> List[CostBreakdown]:
+        columns = [
+            _round_list(self.flights, 2),
+            _round_list(self.accommodation, 2),
+            _round_list(self.food, 2),
+            _round_list(self.transport, 2),
+            _round_list(self.activities, 2),
+            _round_list(self.shopping, 2),
+            _round_list(self.total, 2),
+            _round_list(self.daily_average, 2),
+        ]
+        return [CostBreakdown(*row) for row in zip(*columns)]
+
+
+class BatchCostCalculator:
+    def __init__(self, exchange_rate: float = 0.0089, pricing_table: Optional[PricingTable] = None):
+        self.exchange_rate = exchange_rate
+        self.pricing_table = pricing_table
+
+    def _table(self) -> PricingTable:
+        return self.pricing_table or get_pricing_table()
+
+    def calculate_budgets(
+        self,
+        cities: Sequence[str],
+        num_days: ArrayLike,
+        num_travelers: ArrayLike,
+        travel_styles: Sequence[str],
+        months: ArrayLike,
+        include_flights: ArrayLike,
+        shopping_budgets: ArrayLike,
+    ) -> BudgetBatch:
+        table = self._table()
+        city_idx = np.fromiter((table.city_id(c) for c in cities), dtype=np.int64, count=len(cities))
+        style_idx = np.fromiter((style_id(s) for s in travel_styles), dtype=np.int64, count=len(travel_styles))
+        return self.calculate_indexed(
+            city_idx, style_idx, month_index(months),
+            np.asarray(num_days, dtype=np.int64),
+            np.asarray(num_travelers, dtype=np.int64),
+            np.asarray(include_flights, dtype=bool),
+            np.asarray(shopping_budgets, dtype=np.float64),
+            table,
+        )
+
+    def calculate_indexed(
+        self,
+        city_idx: np.ndarray,
+        style_idx: np.ndarray,
+        month_idx: np.ndarray,
+        num_days: np.ndarray,
+        num_travelers: np.ndarray,
+        include_flights: np.ndarray,
+        shopping_budgets: np.ndarray,
+        table: Optional[PricingTable] = None,
+    ) -> BudgetBatch:
+        table = table or self._table()
+        # Operation order mirrors CostCalculator.calculate_budget so float results are bit-identical.
+        seasonal_mult = MONTH_MULTIPLIER_TABLE[month_idx]
+
+        accommodation = table.accommodation[city_idx, style_idx] * seasonal_mult * num_days
+        food = table.food[city_idx, style_idx] * num_days * num_travelers
+        transport = table.transport[city_idx] * num_days * num_travelers
+        activities = table.activities[city_idx] * num_days * num_travelers
+        shopping = shopping_budgets * num_travelers
+        flights = np.where(
+            include_flights,
+            table.flights[city_idx, style_idx] * num_travelers * seasonal_mult,
+            0.0,
+        )
+
+        total = flights + accommodation + food + transport + activities + shopping
+        daily_average = np.divide(
+            total - flights, num_days,
+            out=np.zeros_like(total), where=num_days > 0,
+        )
+
+        return BudgetBatch(
+            flights=flights,
+            accommodation=accommodation,
+            food=food,
+            transport=transport,
+            activities=activities,
+            shopping=shopping,
+            total=total,
+            daily_average=daily_average,
+        )
+
+    def convert_to_jpy(self, sgd_amounts: ArrayLike) -> np.ndarray:
+        amounts = np.asarray(sgd_amounts, dtype=np.float64)
+        if self.exchange_rate > 0:
+            jpy_per_sgd = 1 / self.exchange_rate
+            return np.rint(amounts * jpy_per_sgd)
+        return np.zeros_like(amounts)
@@ -0,0 +1,148 @@
+from typing import Iterable, List, Optional, Tuple
+from .cost_calculator import CostCalculator, CostBreakdown
+from .batch_calculator import MONTH_MULTIPLIER_TABLE
+from .pricing_table import PricingTable, TRAVEL_STYLES, get_pricing_table, style_id
+from .seasonality import get_season
+
+
+class BudgetGrid:
+    def __init__(self, exchange_rate: float = 0.0089, pricing_table: Optional[PricingTable] = None):
+        self.exchange_rate = exchange_rate
+        self.jpy_per_sgd = 1 / exchange_rate if exchange_rate > 0 else 0.0
+        self.pricing_table = pricing_table or get_pricing_table()
+        table = self.pricing_table
+
+        # Plain Python floats: indexing nested lists is cheaper than numpy scalar reads.
+        self.daily_accommodation: List[List[List[float]]] = (
+            table.accommodation[:, :, None] * MONTH_MULTIPLIER_TABLE[None, None, :]
+        ).tolist()
+        self.daily_food: List[List[float]] = table.food.tolist()
+        self.daily_transport: List[float] = table.transport.tolist()
+        self.daily_activities: List[float] = table.activities.tolist()
+        self.flight_base: List[List[float]] = table.flights.tolist()
+        self.seasonal: List[float] = MONTH_MULTIPLIER_TABLE.tolist()
+        self.seasons: List[Tuple[str, str]] = [get_season(m) for m in range(1, 13)]
+
+    def lookup(
+        self,
+        city: str,
+        num_days: int,
+        num_travelers: int,
+        travel_style: str,
+        month: int,
+        include_flights: bool = True,
+        shopping_budget: float = 200.0
+    ) -> CostBreakdown:
+        return self.lookup_indexed(
+            self.pricing_table.city_id(city), style_id(travel_style), month,
+            num_days, num_travelers, include_flights, shopping_budget
+        )
+
+    def lookup_indexed(
+        self,
+        city_idx: int,
+        style_idx: int,
+        month: int,
+        num_days: int,
+        num_travelers: int,
+        include_flights: bool = True,
+        shopping_budget: float = 200.0
+    ) -> CostBreakdown:
+        month_idx = max(1, min(12, month)) - 1
+
+        # Same operation order as CostCalculator.calculate_budget for identical rounding.
+        accommodation_total = self.daily_accommodation[city_idx][style_idx][month_idx] * num_days
+        food_total = self.daily_food[city_idx][style_idx] * num_days * num_travelers
+        transport_total = self.daily_transport[city_idx] * num_days * num_travelers
+        activities_total = self.daily_activities[city_idx] * num_days * num_travelers
+        shopping_total = shopping_budget * num_travelers
+
+        flights_total = 0.0
+        if include_flights:
+            flights_total = self.flight_base[city_idx][style_idx] * num_travelers * self.seasonal[month_idx]
+
+        total = (
+            flights_total + accommodation_total + food_total +
+            transport_total + activities_total + shopping_total
+        )
+
+        daily_average = (total - flights_total) / num_days if num_days > 0 else 0
+
+        return CostBreakdown(
+            flights=round(flights_total, 2),
+            accommodation=round(accommodation_total, 2),
+            food=round(food_total, 2),
+            transport=round(transport_total, 2),
+            activities=round(activities_total, 2),
+            shopping=round(shopping_total, 2),
+            total=round(total, 2),
+            daily_average=round(daily_average, 2)
+        )
+
+    def flights(self, city: str, num_travelers: int, travel_style: str, month: int) -> float:
+        month_idx = max(1, min(12, month)) - 1
+        base_flight = self.flight_base[self.pricing_table.city_id(city)][style_id(travel_style)]
+        return round(base_flight * num_travelers * self.seasonal[month_idx], 2)
+
+    def season(self, month: int) -> Tuple[str, str]:
+        return self.seasons[max(1, min(12, month)) - 1]
+
+    def convert_to_jpy(self, sgd_amount: float) -> float:
+        if self.jpy_per_sgd > 0:
+            return round(sgd_amount * self.jpy_per_sgd, 0)
+        return 0.0
+
+    def self_check(
+        self,
+        cities: Optional[Iterable[str]] = None,
+        days: Iterable[int] = range(1, 91),
+        travelers: Iterable[int] = range(1, 21),
+        shopping_budgets: Iterable[float] = (0.0, 200.0),
+    ) -> List[Tuple[tuple, CostBreakdown, CostBreakdown]]:
+        calculator = CostCalculator(exchange_rate=self.exchange_rate, pricing_table=self.pricing_table)
+        cities = list(cities) if cities is not None else self.pricing_table.cities
+        days = list(days)
+        travelers = list(travelers)
+        shopping_budgets = list(shopping_budgets)
+
+        mismatches = []
+        for city in cities:
+            for style in TRAVEL_STYLES:
+                for month in range(1, 13):
+                    for num_days in days:
+                        for num_travelers in travelers:
+                            for include_flights in (True, False):
+                                for shopping in shopping_budgets:
+                                    args = (city, num_days, num_travelers, style, month, include_flights, shopping)
+                                    expected = calculator.calculate_budget(*args)
+                                    actual = self.lookup(*args)
+                                    if actual != expected:
+                                        mismatches.append((args, expected, actual))
+        return mismatches
+
+
+_current_grid: Optional[BudgetGrid] = None
+
+
+def get_budget_grid(exchange_rate: float) -> BudgetGrid:
+    global _current_grid
+    table = get_pricing_table()
+    if (
+        _current_grid is None
+        or _current_grid.exchange_rate != exchange_rate
+        or _current_grid.pricing_table is not table
+    ):
+        _current_grid = BudgetGrid(exchange_rate=exchange_rate, pricing_table=table)
+    return _current_grid
+
+
+if __name__ == "__main__":
+    import sys
+    from ..middleware.security import VALID_CITIES
+
+    grid = BudgetGrid()
+    mismatches = grid.self_check(cities=VALID_CITIES)
+    for args, expected, actual in mismatches[:20]:
+        print(f"MISMATCH {args}: expected {expected}, got {actual}")
+    print(f"Budget grid self-check: {len(mismatches)} mismatches")
+    sys.exit(1 if mismatches else 0)
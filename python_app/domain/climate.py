@@ -0,0 +1,223 @@
+import numpy as np
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Sequence, Union
+
+
+METRICS = ["temp_low", "temp_high", "rainfall"]
+DEFAULT_CITY = "tokyo"
+
+# Monthly normals per city, January to December: low and high in Celsius, rainfall in mm.
+CITY_CLIMATE = {
+    "tokyo": (
+        [2, 3, 6, 11, 15, 19, 23, 24, 21, 15, 10, 5],
+        [10, 11, 14, 19, 24, 26, 30, 31, 27, 22, 17, 12],
+        [50, 55, 115, 130, 140, 165, 155, 150, 210, 195, 95, 50],
+    ),
+    "osaka": (
+        [3, 3, 6, 11, 16, 20, 24, 25, 22, 16, 10, 5],
+        [10, 10, 14, 20, 25, 28, 32, 33, 29, 23, 17, 12],
+        [45, 60, 105, 105, 145, 185, 155, 90, 160, 110, 70, 45],
+    ),
+    "kyoto": (
+        [1, 1, 4, 9, 14, 19, 23, 24, 20, 14, 8, 3],
+        [9, 10, 14, 20, 25, 28, 32, 34, 29, 23, 17, 12],
+        [50, 65, 105, 120, 160, 215, 220, 130, 175, 120, 70, 50],
+    ),
+    "hokkaido": (
+        [-7, -7, -3, 3, 8, 13, 17, 19, 15, 8, 1, -4],
+        [-1, 0, 4, 11, 17, 21, 25, 26, 22, 16, 8, 2],
+        [110, 90, 80, 55, 55, 60, 90, 125, 140, 110, 105, 115],
+    ),
+    "fukuoka": (
+        [4, 4, 7, 11, 16, 20, 24, 25, 21, 15, 10, 6],
+        [10, 12, 15, 20, 24, 27, 31, 32, 28, 23, 18, 13],
+        [75, 70, 105, 115, 140, 255, 280, 170, 175, 80, 85, 60],
+    ),
+    "okinawa": (
+        [15, 15, 16, 19, 22, 25, 27, 27, 26, 24, 21, 17],
+        [20, 20, 22, 24, 27, 30, 32, 31, 30, 28, 25, 22],
+        [105, 120, 160, 165, 230, 250, 140, 240, 260, 150, 110, 100],
+    ),
+    "nagoya": (
+        [1, 1, 5, 10, 15, 19, 23, 24, 21, 14, 8, 3],
+        [9, 10, 14, 20, 24, 27, 31, 33, 29, 23, 17, 12],
+        [50, 65, 120, 125, 155, 200, 195, 140, 230, 165, 80, 55],
+    ),
+    "hiroshima": (
+        [2, 2, 5, 10, 15, 20, 24, 25, 21, 14, 9, 4],
+        [9, 11, 14, 20, 24, 27, 31, 32, 28, 23, 17, 12],
+        [45, 65, 120, 155, 160, 260, 260, 110, 170, 90, 70, 45],
+    ),
+    "nara": (
+        [0, 0, 3, 8, 13, 18, 22, 23, 19, 12, 6, 2],
+        [9, 10, 14, 20, 25, 28, 31, 33, 29, 23, 17, 11],
+        [50, 65, 105, 105, 145, 200, 175, 120, 155, 110, 65, 45],
+    ),
+    "yokohama": (
+        [2, 3, 6, 11, 15, 19, 23, 24, 21, 15, 10, 5],
+        [10, 11, 14, 19, 23, 26, 30, 31, 27, 22, 17, 12],
+        [60, 65, 130, 130, 140, 170, 150, 125, 210, 200, 95, 55],
+    ),
+}
+
+CITY_DESCRIPTIONS = {
+    "tokyo": [
+        "Cold and dry",
+        "Cold with occasional snow",
+        "Warming up, cherry blossoms begin",
+        "Mild, peak cherry blossom season",
+        "Pleasant warm weather",
+        "Rainy season begins",
+        "Hot and humid",
+        "Hottest month",
+        "Typhoon season",
+        "Cooling down, autumn colors",
+        "Autumn foliage peak",
+        "Cold and dry",
+    ],
+    "hokkaido": [
+        "Deep winter, heavy snow",
+        "Snow festival season",
+        "Snow lingers, still cold",
+        "Thawing, late spring",
+        "Cherry blossoms arrive",
+        "Cool and dry, no rainy season",
+        "Mild summer, lavender fields",
+        "Warmest month, comfortable",
+        "Crisp early autumn",
+        "Autumn colors, cooling fast",
+        "First snowfall",
+        "Snowy and cold",
+    ],
+    "okinawa": [
+        "Mild subtropical winter",
+        "Mild, early cherry blossoms",
+        "Warm spring weather",
+        "Warm, beach season starts",
+        "Rainy season begins",
+        "Rainy season ends, hot",
+        "Hot and sunny",
+        "Hot, peak typhoon risk",
+        "Hot with typhoons",
+        "Warm and pleasant",
+        "Warm and dry",
+        "Mild and breezy",
+    ],
+}
+
+# Mid-month day of year for each month, used as interpolation knots.
+MONTH_MIDPOINTS = np.array([15.5, 45.0, 74.5, 105.0, 135.5, 166.0, 196.5, 227.5, 258.0, 288.5, 319.0, 349.5])
+DAYS_PER_YEAR = 365
+
+
+def _describe(low: float, high: float, rainfall: float, month: int) -> str:
+    if high <= 5:
+        return "Freezing with snow"
+    if high <= 12:
+        return "Cold and dry" if rainfall < 80 else "Cold and damp"
+    if month == 6 and rainfall >= 150:
+        return "Rainy season"
+    if month in (8, 9) and rainfall >= 150:
+        return "Typhoon season"
+    if high >= 30:
+        return "Hot and humid"
+    if high >= 24:
+        return "Warm" if rainfall < 150 else "Warm and wet"
+    return "Mild" if month < 7 else "Cool, autumn colors"
+
+
+@dataclass
+class ClimateInfo:
+    temp_low: float
+    temp_high: float
+    rainfall: float
+    description: str
+
+
+class ClimateStore:
+    def __init__(self, city_climate: Dict[str, tuple] = None, city_descriptions: Dict[str, List[str]] = None):
+        city_climate = city_climate or CITY_CLIMATE
+        city_descriptions = CITY_DESCRIPTIONS if city_descriptions is None else city_descriptions
+
+        self.cities: List[str] = list(city_climate.keys())
+        self.city_ids: Dict[str, int] = {city: idx for idx, city in enumerate(self.cities)}
+        self.default_city_id = self.city_ids.get(DEFAULT_CITY, 0)
+
+        # city x month x metric
+        self.values = np.array(
+            [np.array(series, dtype=np.float32).T for series in city_climate.values()],
+            dtype=np.float32
+        )
+        self.values.setflags(write=False)
+
+        self.descriptions: List[List[str]] = [
+            city_descriptions.get(city) or [
+                _describe(*self.values[c, m].tolist(), month=m + 1) for m in range(12)
+            ]
+            for c, city in enumerate(self.cities)
+        ]
+
+        # Wrap December before January and January after December so interpolation
+        # across the new year needs no special case.
+        self._knots = np.concatenate([[MONTH_MIDPOINTS[-1] - DAYS_PER_YEAR], MONTH_MIDPOINTS,
+                                      [MONTH_MIDPOINTS[0] + DAYS_PER_YEAR]])
+        self._wrapped = np.concatenate([self.values[:, -1:], self.values, self.values[:, :1]], axis=1)
+
+    def city_id(self, city: str) -> int:
+        return self.city_ids.get(city.lower(), self.default_city_id)
+
+    def city_index(self, cities: Union[str, Sequence[str]]) -> np.ndarray:
+        if isinstance(cities, str):
+            return np.int64(self.city_id(cities))
+        return np.array([self.city_id(c) for c in cities], dtype=np.int64)
+
+    @staticmethod
+    def month_index(months) -> np.ndarray:
+        # Out-of-range months fall back to January, as the original weather lookup did.
+        months = np.asarray(months, dtype=np.int64)
+        return np.where((months >= 1) & (months <= 12), months - 1, 0)
+
+    def query_indexed(self, city_idx, month_idx) -> np.ndarray:
+        return self.values[city_idx, month_idx]
+
+    def query(self, cities: Union[str, Sequence[str]], months) -> np.ndarray:
+        return self.query_indexed(self.city_index(cities), self.month_index(months))
+
+    def interpolate(self, cities: Union[str, Sequence[str]], days_of_year) -> np.ndarray:
+        city_idx = self.city_index(cities)
+        day = (np.asarray(days_of_year, dtype=np.float64) - 1) % DAYS_PER_YEAR + 1
+        right = np.searchsorted(self._knots, day, side="right")
+        left = right - 1
+        weight = ((day - self._knots[left]) / (self._knots[right] - self._knots[left]))[..., None]
+        lower = self._wrapped[city_idx, left].astype(np.float64)
+        upper = self._wrapped[city_idx, right].astype(np.float64)
+        return lower + (upper - lower) * weight
+
+    def interpolate_dates(self, cities: Union[str, Sequence[str]], days: Sequence[date]) -> np.ndarray:
+        return self.interpolate(cities, [min(d.timetuple().tm_yday, DAYS_PER_YEAR) for d in days])
+
+    def describe(self, city_idx: int, month_idx: int) -> str:
+        return self.descriptions[city_idx][month_idx]
+
+    def info(self, city: str, month: int) -> ClimateInfo:
+        c = self.city_id(city)
+        m = month - 1 if 1 <= month <= 12 else 0
+        low, high, rainfall = self.values[c, m].tolist()
+        return ClimateInfo(temp_low=low, temp_high=high, rainfall=rainfall, description=self.describe(c, m))
+
+    def infos(self, cities: Sequence[str], months: Sequence[int]) -> List[ClimateInfo]:
+        city_idx = self.city_index(cities)
+        month_idx = self.month_index(months)
+        rows = self.query_indexed(city_idx, month_idx).tolist()
+        return [
+            ClimateInfo(temp_low=row[0], temp_high=row[1], rainfall=row[2], description=self.describe(c, m))
+            for row, c, m in zip(rows, city_idx.tolist(), month_idx.tolist())
+        ]
+
+
+_store = ClimateStore()
+
+
+def get_climate_store() -> ClimateStore:
+    return _store
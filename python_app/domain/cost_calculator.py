@@ -1,6 +1,9 @@
 from dataclasses import dataclass
-from typing import List, Optional
-from .seasonality import get_seasonal_multiplier
+from datetime import date
+from typing import List, Optional, Tuple
+from .seasonality import get_seasonal_multiplier, get_date_range_multiplier, get_daily_multiplier
+from .pricing_table import PricingTable, get_pricing_table, style_id
+from .rate_history import RateHistory, RateTrend, get_rate_history
 
 
 @dataclass
@@ -36,11 +39,36 @@ CITY_PRICING = {
         food_budget=25, food_mid=50, food_luxury=110,
         transport_daily=18, activities_daily=40
     ),
+    "fukuoka": CityPricing(
+        accommodation_budget=60, accommodation_mid=130, accommodation_luxury=300,
+        food_budget=22, food_mid=45, food_luxury=105,
+        transport_daily=12, activities_daily=25
+    ),
     "okinawa": CityPricing(
         accommodation_budget=60, accommodation_mid=130, accommodation_luxury=300,
         food_budget=22, food_mid=45, food_luxury=100,
         transport_daily=20, activities_daily=35
     ),
+    "nagoya": CityPricing(
+        accommodation_budget=70, accommodation_mid=150, accommodation_luxury=340,
+        food_budget=25, food_mid=50, food_luxury=120,
+        transport_daily=12, activities_daily=25
+    ),
+    "hiroshima": CityPricing(
+        accommodation_budget=60, accommodation_mid=130, accommodation_luxury=300,
+        food_budget=23, food_mid=48, food_luxury=110,
+        transport_daily=10, activities_daily=30
+    ),
+    "nara": CityPricing(
+        accommodation_budget=65, accommodation_mid=140, accommodation_luxury=330,
+        food_budget=24, food_mid=48, food_luxury=110,
+        transport_daily=8, activities_daily=25
+    ),
+    "yokohama": CityPricing(
+        accommodation_budget=75, accommodation_mid=165, accommodation_luxury=380,
+        food_budget=28, food_mid=55, food_luxury=135,
+        transport_daily=12, activities_daily=28
+    ),
 }
 
 FLIGHT_PRICES = {
@@ -48,7 +76,12 @@ FLIGHT_PRICES = {
     "osaka": {"budget": 320, "mid": 500, "luxury": 1100},
     "kyoto": {"budget": 320, "mid": 500, "luxury": 1100},
     "hokkaido": {"budget": 400, "mid": 650, "luxury": 1400},
+    "fukuoka": {"budget": 280, "mid": 450, "luxury": 1000},
     "okinawa": {"budget": 380, "mid": 600, "luxury": 1300},
+    "nagoya": {"budget": 340, "mid": 530, "luxury": 1150},
+    "hiroshima": {"budget": 360, "mid": 570, "luxury": 1250},
+    "nara": {"budget": 320, "mid": 500, "luxury": 1100},
+    "yokohama": {"budget": 350, "mid": 550, "luxury": 1200},
 }
 
 
@@ -65,8 +98,24 @@ class CostBreakdown:
 
 
 class CostCalculator:
-    def __init__(self, exchange_rate: float = 0.0089):
+    def __init__(self, exchange_rate: float = 0.0089, pricing_table: Optional[PricingTable] = None):
         self.exchange_rate = exchange_rate
+        self.pricing_table = pricing_table
+
+    @classmethod
+    def as_of(
+        cls,
+        day: date,
+        history: Optional[RateHistory] = None,
+        pricing_table: Optional[PricingTable] = None
+    ) -> "CostCalculator":
+        jpy_per_sgd = (history or get_rate_history()).rate_as_of("JPY", day)
+        if jpy_per_sgd is None:
+            raise ValueError(f"No exchange rate recorded on or before {day.isoformat()}")
+        return cls(exchange_rate=1 / jpy_per_sgd, pricing_table=pricing_table)
+
+    def _table(self) -> PricingTable:
+        return self.pricing_table or get_pricing_table()
 
     def calculate_budget(
         self,
@@ -78,23 +127,80 @@ class CostCalculator:
         include_flights: bool = True,
         shopping_budget: float = 200.0
     ) -> CostBreakdown:
-        city_lower = city.lower()
-        pricing = CITY_PRICING.get(city_lower, CITY_PRICING["tokyo"])
-        
-        style_map = {"budget": 0, "mid": 1, "luxury": 2}
-        style_idx = style_map.get(travel_style.lower(), 1)
+        table = self._table()
+        return self.calculate_budget_by_id(
+            table.city_id(city), style_id(travel_style), num_days, num_travelers,
+            month, include_flights, shopping_budget, table
+        )
+
+    def calculate_budget_by_id(
+        self,
+        city_idx: int,
+        style_idx: int,
+        num_days: int,
+        num_travelers: int,
+        month: int,
+        include_flights: bool = True,
+        shopping_budget: float = 200.0,
+        table: Optional[PricingTable] = None
+    ) -> CostBreakdown:
+        table = table or self._table()
         
         seasonal_mult = get_seasonal_multiplier(month)
         
-        acc_rates = [pricing.accommodation_budget, pricing.accommodation_mid, pricing.accommodation_luxury]
-        food_rates = [pricing.food_budget, pricing.food_mid, pricing.food_luxury]
+        daily_accommodation = table.accommodation.item(city_idx, style_idx) * seasonal_mult
+        accommodation_total = daily_accommodation * num_days
+        
+        return self._build_breakdown(
+            table, city_idx, style_idx, num_days, num_travelers,
+            accommodation_total, seasonal_mult, include_flights, shopping_budget
+        )
+
+    def calculate_budget_for_dates(
+        self,
+        city: str,
+        departure_date: date,
+        return_date: date,
+        num_travelers: int,
+        travel_style: str,
+        include_flights: bool = True,
+        shopping_budget: float = 200.0
+    ) -> CostBreakdown:
+        num_days = (return_date - departure_date).days
+        if num_days <= 0:
+            raise ValueError("Return date must be after departure date")
         
-        daily_accommodation = acc_rates[style_idx] * seasonal_mult
-        daily_food = food_rates[style_idx]
-        daily_transport = pricing.transport_daily
-        daily_activities = pricing.activities_daily
+        table = self._table()
+        city_idx = table.city_id(city)
+        style_idx = style_id(travel_style)
+        
+        accommodation_total = (
+            table.accommodation.item(city_idx, style_idx) *
+            get_date_range_multiplier(departure_date, return_date)
+        )
+        flight_mult = (get_daily_multiplier(departure_date) + get_daily_multiplier(return_date)) / 2
+        
+        return self._build_breakdown(
+            table, city_idx, style_idx, num_days, num_travelers,
+            accommodation_total, flight_mult, include_flights, shopping_budget
+        )
+
+    def _build_breakdown(
+        self,
+        table: PricingTable,
+        city_idx: int,
+        style_idx: int,
+        num_days: int,
+        num_travelers: int,
+        accommodation_total: float,
+        flight_mult: float,
+        include_flights: bool,
+        shopping_budget: float
+    ) -> CostBreakdown:
+        daily_food = table.food.item(city_idx, style_idx)
+        daily_transport = table.transport.item(city_idx)
+        daily_activities = table.activities.item(city_idx)
         
-        accommodation_total = daily_accommodation * num_days
         food_total = daily_food * num_days * num_travelers
         transport_total = daily_transport * num_days * num_travelers
         activities_total = daily_activities * num_days * num_travelers
@@ -102,10 +208,8 @@ class CostCalculator:
         
         flights_total = 0.0
         if include_flights:
-            flight_prices = FLIGHT_PRICES.get(city_lower, FLIGHT_PRICES["tokyo"])
-            flight_styles = ["budget", "mid", "luxury"]
-            base_flight = flight_prices[flight_styles[style_idx]]
-            flights_total = base_flight * num_travelers * seasonal_mult
+            base_flight = table.flights.item(city_idx, style_idx)
+            flights_total = base_flight * num_travelers * flight_mult
         
         total = (
             flights_total + accommodation_total + food_total +
@@ -130,3 +234,10 @@ class CostCalculator:
             jpy_per_sgd = 1 / self.exchange_rate
             return round(sgd_amount * jpy_per_sgd, 0)
         return 0.0
+
+    def jpy_trend_band(self, sgd_amount: float, trend: RateTrend) -> Tuple[float, float, float]:
+        return (
+            round(sgd_amount * trend.low, 0),
+            round(sgd_amount * trend.mean, 0),
+            round(sgd_amount * trend.high, 0)
+        )
@@ -0,0 +1,63 @@
+import numpy as np
+from dataclasses import dataclass, fields
+from typing import Dict, List, Sequence
+from .batch_calculator import round_array
+from .cost_calculator import CostBreakdown
+
+
+BASE_CURRENCY = "SGD"
+DEFAULT_CURRENCIES = ["SGD", "JPY", "USD", "EUR", "GBP", "AUD", "MYR", "HKD"]
+
+# Units of each currency per 1 SGD, used until the first successful fetch.
+FALLBACK_RATES = {
+    "SGD": 1.0,
+    "JPY": 1 / 0.0089,
+    "USD": 0.74,
+    "EUR": 0.68,
+    "GBP": 0.58,
+    "AUD": 1.13,
+    "MYR": 3.45,
+    "HKD": 5.78,
+}
+
+ZERO_DECIMAL_CURRENCIES = {"JPY", "KRW"}
+
+BREAKDOWN_FIELDS = [f.name for f in fields(CostBreakdown)]
+
+
+@dataclass
+class RateMatrix:
+    currencies: List[str]
+    # rates[i, j] is units of currencies[j] per one unit of currencies[i].
+    rates: np.ndarray
+    last_updated: str = None
+
+    @classmethod
+    def from_base_rates(cls, base_rates: Dict[str, float], currencies: Sequence[str], last_updated: str = None) -> "RateMatrix":
+        available = [c for c in currencies if base_rates.get(c)]
+        per_base = np.array([base_rates[c] for c in available], dtype=np.float64)
+        rates = per_base[None, :] / per_base[:, None]
+        rates.setflags(write=False)
+        return cls(currencies=available, rates=rates, last_updated=last_updated)
+
+    def __post_init__(self):
+        self._index = {c: i for i, c in enumerate(self.currencies)}
+
+    def supports(self, currency: str) -> bool:
+        return currency.upper() in self._index
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        return self.rates.item(self._index[from_currency.upper()], self._index[to_currency.upper()])
+
+    def convert(self, amounts, from_currency: str, to_currency: str) -> np.ndarray:
+        return np.asarray(amounts, dtype=np.float64) * self.rate(from_currency, to_currency)
+
+    def convert_all(self, amounts, from_currency: str = BASE_CURRENCY) -> np.ndarray:
+        # One outer product converts every amount into every currency: shape (..., currencies).
+        return np.asarray(amounts, dtype=np.float64)[..., None] * self.rates[self._index[from_currency.upper()]]
+
+    def convert_breakdown(self, breakdown: CostBreakdown, to_currency: str, from_currency: str = BASE_CURRENCY) -> CostBreakdown:
+        amounts = np.array([getattr(breakdown, name) for name in BREAKDOWN_FIELDS], dtype=np.float64)
+        ndigits = 0 if to_currency.upper() in ZERO_DECIMAL_CURRENCIES else 2
+        converted = round_array(self.convert(amounts, from_currency, to_currency), ndigits).tolist()
+        return CostBreakdown(**dict(zip(BREAKDOWN_FIELDS, converted)))
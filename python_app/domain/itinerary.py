@@ -0,0 +1,187 @@
+from dataclasses import dataclass
+from typing import List, Optional
+from .budget_grid import BudgetGrid
+from .pricing_table import style_id
+from .cost_calculator import CostBreakdown
+from .climate import ClimateInfo, get_climate_store
+
+
+INTERCITY_FARES = {
+    ("tokyo", "yokohama"): 8,
+    ("nagoya", "tokyo"): 115,
+    ("kyoto", "tokyo"): 150,
+    ("osaka", "tokyo"): 155,
+    ("nara", "tokyo"): 165,
+    ("hiroshima", "tokyo"): 210,
+    ("fukuoka", "tokyo"): 260,
+    ("hokkaido", "tokyo"): 190,
+    ("okinawa", "tokyo"): 200,
+    ("nagoya", "yokohama"): 110,
+    ("kyoto", "yokohama"): 145,
+    ("osaka", "yokohama"): 150,
+    ("kyoto", "osaka"): 8,
+    ("nara", "osaka"): 8,
+    ("kyoto", "nara"): 8,
+    ("kyoto", "nagoya"): 60,
+    ("nagoya", "osaka"): 65,
+    ("nagoya", "nara"): 50,
+    ("hiroshima", "osaka"): 110,
+    ("hiroshima", "kyoto"): 120,
+    ("fukuoka", "osaka"): 165,
+    ("fukuoka", "kyoto"): 175,
+    ("fukuoka", "hiroshima"): 95,
+    ("hokkaido", "osaka"): 210,
+    ("okinawa", "osaka"): 170,
+    ("fukuoka", "okinawa"): 150,
+}
+
+DEFAULT_INTERCITY_FARE = 200
+INTERCITY_STYLE_FACTORS = [0.6, 1.0, 1.5]
+
+
+def intercity_fare(origin: str, destination: str, travel_style: str = "mid") -> float:
+    origin_lower = origin.lower()
+    destination_lower = destination.lower()
+    if origin_lower == destination_lower:
+        return 0.0
+    key = tuple(sorted((origin_lower, destination_lower)))
+    base_fare = INTERCITY_FARES.get(key, DEFAULT_INTERCITY_FARE)
+    return round(base_fare * INTERCITY_STYLE_FACTORS[style_id(travel_style)], 2)
+
+
+@dataclass
+class ItineraryLeg:
+    city: str
+    nights: int
+    month: Optional[int] = None
+
+
+@dataclass
+class LegCost:
+    leg: ItineraryLeg
+    month: int
+    breakdown: CostBreakdown
+    transfer_cost: float
+    climate: ClimateInfo
+
+
+@dataclass
+class ItineraryBreakdown:
+    legs: List[LegCost]
+    breakdown: CostBreakdown
+    intercity_transport: float
+    total_nights: int
+
+
+class ItineraryCalculator:
+    def __init__(
+        self,
+        num_travelers: int,
+        travel_style: str,
+        month: int,
+        include_flights: bool = True,
+        shopping_budget: float = 200.0,
+        grid: Optional[BudgetGrid] = None
+    ):
+        self.num_travelers = num_travelers
+        self.travel_style = travel_style
+        self.month = month
+        self.include_flights = include_flights
+        self.shopping_budget = shopping_budget
+        self.grid = grid or BudgetGrid()
+        self._legs: List[ItineraryLeg] = []
+        self._leg_costs: List[CostBreakdown] = []
+        self._transfers: List[float] = []
+
+    @property
+    def legs(self) -> List[ItineraryLeg]:
+        return list(self._legs)
+
+    def add_leg(self, leg: ItineraryLeg) -> None:
+        self._legs.append(leg)
+        self._leg_costs.append(self._compute_leg(leg))
+        self._transfers.append(self._compute_transfer(len(self._legs) - 1))
+
+    def set_leg(self, index: int, leg: ItineraryLeg) -> None:
+        self._legs[index] = leg
+        self._leg_costs[index] = self._compute_leg(leg)
+        self._refresh_transfers(index)
+
+    def remove_leg(self, index: int) -> None:
+        del self._legs[index]
+        del self._leg_costs[index]
+        del self._transfers[index]
+        self._refresh_transfers(index)
+
+    def _refresh_transfers(self, index: int) -> None:
+        # Only the transfers into and out of an edited leg can change.
+        for i in (index, index + 1):
+            if 0 <= i < len(self._legs):
+                self._transfers[i] = self._compute_transfer(i)
+
+    def _leg_month(self, leg: ItineraryLeg) -> int:
+        return leg.month if leg.month is not None else self.month
+
+    def _compute_leg(self, leg: ItineraryLeg) -> CostBreakdown:
+        return self.grid.lookup(
+            city=leg.city,
+            num_days=leg.nights,
+            num_travelers=self.num_travelers,
+            travel_style=self.travel_style,
+            month=self._leg_month(leg),
+            include_flights=False,
+            shopping_budget=0.0
+        )
+
+    def _compute_transfer(self, index: int) -> float:
+        if index == 0:
+            return 0.0
+        fare = intercity_fare(self._legs[index - 1].city, self._legs[index].city, self.travel_style)
+        return round(fare * self.num_travelers, 2)
+
+    def calculate(self) -> ItineraryBreakdown:
+        if not self._legs:
+            raise ValueError("Itinerary has no legs")
+
+        flights_total = 0.0
+        if self.include_flights:
+            flights_total = self.grid.flights(
+                self._legs[0].city, self.num_travelers, self.travel_style, self.month
+            )
+
+        accommodation_total = sum(c.accommodation for c in self._leg_costs)
+        food_total = sum(c.food for c in self._leg_costs)
+        transport_total = sum(c.transport for c in self._leg_costs)
+        activities_total = sum(c.activities for c in self._leg_costs)
+        intercity_total = sum(self._transfers)
+        shopping_total = self.shopping_budget * self.num_travelers
+        total_nights = sum(leg.nights for leg in self._legs)
+
+        total = (
+            flights_total + accommodation_total + food_total + transport_total +
+            activities_total + intercity_total + shopping_total
+        )
+        daily_average = (total - flights_total) / total_nights if total_nights > 0 else 0
+        leg_months = [self._leg_month(leg) for leg in self._legs]
+        climates = get_climate_store().infos([leg.city for leg in self._legs], leg_months)
+
+        return ItineraryBreakdown(
+            legs=[
+                LegCost(leg=leg, month=month, breakdown=cost, transfer_cost=transfer, climate=climate)
+                for leg, month, cost, transfer, climate in zip(
+                    self._legs, leg_months, self._leg_costs, self._transfers, climates
+                )
+            ],
+            breakdown=CostBreakdown(
+                flights=round(flights_total, 2),
+                accommodation=round(accommodation_total, 2),
+                food=round(food_total, 2),
+                transport=round(transport_total, 2),
+                activities=round(activities_total, 2),
+                shopping=round(shopping_total, 2),
+                total=round(total, 2),
+                daily_average=round(daily_average, 2)
+            ),
+            intercity_transport=round(intercity_total, 2),
+            total_nights=total_nights
+        )
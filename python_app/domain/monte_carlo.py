@@ -0,0 +1,142 @@
+import time
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Optional
+from .cost_calculator import CostBreakdown
+from .pricing_table import style_id
+from .seasonality import get_seasonal_multiplier
+
+
+CATEGORIES = ["flights", "accommodation", "food", "transport", "activities", "shopping"]
+
+# One-sigma log price variance per category, indexed by travel style (budget, mid, luxury).
+PRICE_VOLATILITY = np.array([
+    [0.20, 0.15, 0.10],
+    [0.15, 0.12, 0.10],
+    [0.20, 0.15, 0.12],
+    [0.15, 0.12, 0.08],
+    [0.25, 0.20, 0.15],
+    [0.30, 0.25, 0.20],
+], dtype=np.float64)
+
+CITY_VOLATILITY = {
+    "tokyo": 1.0,
+    "osaka": 0.95,
+    "kyoto": 1.1,
+    "hokkaido": 1.15,
+    "fukuoka": 1.0,
+    "okinawa": 1.2,
+    "nagoya": 0.95,
+    "hiroshima": 1.05,
+    "nara": 1.1,
+    "yokohama": 1.0,
+}
+
+BASE_SEASONAL_VOLATILITY = 0.05
+PEAK_SEASONAL_VOLATILITY = 0.10
+FX_VOLATILITY = 0.04
+
+# Seasonal demand moves flights and accommodation; FX moves everything paid in yen.
+SEASONAL_EXPOSURE = np.array([1, 1, 0, 0, 0, 0], dtype=np.float64)
+FX_EXPOSURE = np.array([0, 1, 1, 1, 1, 1], dtype=np.float64)
+
+DEFAULT_DRAWS = 10000
+MAX_DRAWS = 100000
+DRAW_CHUNK = 10000
+# Drawn and summarised first to price the rest: the draw count is capped so that sampling and the
+# final percentile pass together fit in max_time_ms.
+PROBE_DRAWS = 1000
+# Headroom for percentile cost growing slightly faster than linearly and for timer jitter.
+TIME_SAFETY = 0.8
+DEFAULT_MAX_TIME_MS = 100.0
+PERCENTILES = [10, 50, 90]
+
+
+@dataclass
+class CategoryBand:
+    p10: float
+    p50: float
+    p90: float
+
+
+@dataclass
+class UncertaintyBands:
+    bands: Dict[str, CategoryBand]
+    draws: int
+    seed: Optional[int]
+    compute_time_ms: float
+
+
+def _loading_matrix(travel_style: str, city: str, month: int) -> np.ndarray:
+    # Rows are independent shocks (one per category, then seasonal, then FX);
+    # columns are the categories each shock moves, in log space.
+    price_sigma = PRICE_VOLATILITY[:, style_id(travel_style)] * CITY_VOLATILITY.get(city.lower(), 1.0)
+    seasonal_sigma = BASE_SEASONAL_VOLATILITY + PEAK_SEASONAL_VOLATILITY * abs(get_seasonal_multiplier(month) - 1.0)
+    return np.vstack([
+        np.diag(price_sigma),
+        seasonal_sigma * SEASONAL_EXPOSURE,
+        FX_VOLATILITY * FX_EXPOSURE,
+    ])
+
+
+def _sample(rng: np.random.Generator, point: np.ndarray, loadings: np.ndarray, drift: np.ndarray, n: int) -> np.ndarray:
+    shocks = rng.standard_normal((loadings.shape[0], n))
+    return point * np.exp(loadings.T @ shocks + drift)
+
+
+def _quantiles(samples: np.ndarray) -> list:
+    samples = np.vstack([samples, samples.sum(axis=0)])
+    return np.percentile(samples, PERCENTILES, axis=1).T.tolist()
+
+
+def simulate_budget(
+    breakdown: CostBreakdown,
+    city: str,
+    travel_style: str,
+    month: int,
+    draws: int = DEFAULT_DRAWS,
+    seed: Optional[int] = None,
+    max_time_ms: float = DEFAULT_MAX_TIME_MS,
+) -> UncertaintyBands:
+    started = time.perf_counter()
+    draws = max(1, min(draws, MAX_DRAWS))
+    rng = np.random.default_rng(seed)
+
+    point = np.array([getattr(breakdown, c) for c in CATEGORIES], dtype=np.float64)[:, None]
+    loadings = _loading_matrix(travel_style, city, month)
+    # Mean-one lognormal factors keep the point estimate as the expected value.
+    drift = (-0.5 * (loadings ** 2).sum(axis=0))[:, None]
+
+    probe = min(draws, PROBE_DRAWS)
+    chunks = [_sample(rng, point, loadings, drift, probe)]
+    sampled = time.perf_counter()
+    _quantiles(chunks[0])
+    summarised = time.perf_counter()
+
+    sample_cost = (sampled - started) / probe
+    quantile_cost = (summarised - sampled) / probe
+    remaining = max_time_ms / 1000 * TIME_SAFETY - (summarised - started)
+    affordable = int((remaining + probe * sample_cost) / (sample_cost + quantile_cost))
+    target = max(probe, min(draws, affordable))
+
+    # If sampling runs slower than probed, stop early rather than eat into the percentile pass.
+    sampling_deadline = started + max_time_ms / 1000 * TIME_SAFETY - target * quantile_cost
+    drawn = probe
+    while drawn < target and time.perf_counter() < sampling_deadline:
+        n = min(DRAW_CHUNK, target - drawn)
+        chunks.append(_sample(rng, point, loadings, drift, n))
+        drawn += n
+
+    quantiles = _quantiles(np.concatenate(chunks, axis=1))
+
+    bands = {
+        name: CategoryBand(p10=round(q[0], 2), p50=round(q[1], 2), p90=round(q[2], 2))
+        for name, q in zip(CATEGORIES + ["total"], quantiles)
+    }
+
+    return UncertaintyBands(
+        bands=bands,
+        draws=drawn,
+        seed=seed,
+        compute_time_ms=round((time.perf_counter() - started) * 1000, 3)
+    )
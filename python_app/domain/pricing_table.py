@@ -0,0 +1,206 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+import numpy as np
+from typing import Dict, List, Optional
+
+
+TRAVEL_STYLES = ["budget", "mid", "luxury"]
+STYLE_IDS = {style: idx for idx, style in enumerate(TRAVEL_STYLES)}
+DEFAULT_STYLE_ID = STYLE_IDS["mid"]
+DEFAULT_CITY = "tokyo"
+
+MAGIC = b"JPPT"
+FORMAT_VERSION = 1
+NAME_WIDTH = 32
+# magic, format version, data version, city count, style count, name width
+HEADER = struct.Struct("<4sIIIII")
+RELOAD_CHECK_INTERVAL = 1.0
+
+
+def style_id(travel_style: str) -> int:
+    return STYLE_IDS.get(travel_style.lower(), DEFAULT_STYLE_ID)
+
+
+def _encode_payload(
+    cities: List[str],
+    accommodation: np.ndarray,
+    food: np.ndarray,
+    transport: np.ndarray,
+    activities: np.ndarray,
+    flights: np.ndarray,
+) -> bytes:
+    names = b"".join(c.encode("utf-8")[:NAME_WIDTH].ljust(NAME_WIDTH, b"\0") for c in cities)
+    arrays = b"".join(
+        np.ascontiguousarray(a, dtype="<f8").tobytes()
+        for a in (accommodation, food, transport, activities, flights)
+    )
+    return names + arrays
+
+
+def build_pricing_table(city_pricing: Optional[dict] = None, flight_prices: Optional[dict] = None) -> bytes:
+    if city_pricing is None or flight_prices is None:
+        from .cost_calculator import CITY_PRICING, FLIGHT_PRICES
+        city_pricing = city_pricing or CITY_PRICING
+        flight_prices = flight_prices or FLIGHT_PRICES
+
+    cities = list(city_pricing.keys())
+    pricing = list(city_pricing.values())
+    default_flights = flight_prices[DEFAULT_CITY]
+    payload = _encode_payload(
+        cities,
+        accommodation=np.array([[p.accommodation_budget, p.accommodation_mid, p.accommodation_luxury] for p in pricing]),
+        food=np.array([[p.food_budget, p.food_mid, p.food_luxury] for p in pricing]),
+        transport=np.array([p.transport_daily for p in pricing]),
+        activities=np.array([p.activities_daily for p in pricing]),
+        flights=np.array([
+            [flight_prices.get(city, default_flights)[s] for s in TRAVEL_STYLES] for city in cities
+        ]),
+    )
+    data_version = zlib.crc32(payload)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, data_version, len(cities), len(TRAVEL_STYLES), NAME_WIDTH) + payload
+
+
+def table_version(blob: bytes) -> int:
+    return HEADER.unpack_from(blob, 0)[2]
+
+
+def compile_pricing_table(path: str, city_pricing: Optional[dict] = None, flight_prices: Optional[dict] = None) -> int:
+    blob = build_pricing_table(city_pricing, flight_prices)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".pricing-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+        # Atomic swap so readers never map a half-written table.
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    return table_version(blob)
+
+
+class PricingTable:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size:
+            raise ValueError(f"Truncated pricing table: {path}")
+        magic, format_version, data_version, n_cities, n_styles, name_width = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported pricing table: {path}")
+        if n_styles != len(TRAVEL_STYLES):
+            raise ValueError(f"Pricing table has {n_styles} styles, expected {len(TRAVEL_STYLES)}")
+
+        self.version = data_version
+        offset = HEADER.size
+        self.cities: List[str] = [
+            bytes(self._mmap[offset + i * name_width:offset + (i + 1) * name_width]).rstrip(b"\0").decode("utf-8")
+            for i in range(n_cities)
+        ]
+        offset += n_cities * name_width
+
+        def view(*shape) -> np.ndarray:
+            nonlocal offset
+            count = int(np.prod(shape))
+            array = np.frombuffer(self._mmap, dtype="<f8", count=count, offset=offset).reshape(shape)
+            offset += count * 8
+            return array
+
+        self.accommodation = view(n_cities, n_styles)
+        self.food = view(n_cities, n_styles)
+        self.transport = view(n_cities)
+        self.activities = view(n_cities)
+        self.flights = view(n_cities, n_styles)
+
+        if zlib.crc32(self._mmap[HEADER.size:offset]) != self.version:
+            raise ValueError(f"Pricing table checksum mismatch: {path}")
+
+        self.city_ids: Dict[str, int] = {city: idx for idx, city in enumerate(self.cities)}
+        self.default_city_id = self.city_ids.get(DEFAULT_CITY, 0)
+
+    def city_id(self, city: str) -> int:
+        return self.city_ids.get(city.lower(), self.default_city_id)
+
+
+class PricingTableStore:
+    def __init__(self, path: str, check_interval: float = RELOAD_CHECK_INTERVAL, managed: bool = False):
+        self.path = path
+        self.check_interval = check_interval
+        # A managed table is compiled from CITY_PRICING and recompiled when the code's tables change;
+        # an operator-supplied table is only compiled if missing and otherwise left alone.
+        self.managed = managed
+        self._table: Optional[PricingTable] = None
+        self._stat_key = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _file_key(self):
+        stat = os.stat(self.path)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def get(self) -> PricingTable:
+        now = time.monotonic()
+        if self._table is not None and now - self._last_check < self.check_interval:
+            return self._table
+
+        with self._lock:
+            self._last_check = now
+            if self._table is None:
+                self._ensure_compiled()
+                self._stat_key = self._file_key()
+                self._table = PricingTable(self.path)
+                return self._table
+
+            try:
+                key = self._file_key()
+                if key != self._stat_key:
+                    self._table = PricingTable(self.path)
+                    self._stat_key = key
+            except (OSError, ValueError) as e:
+                print(f"Pricing table reload error, keeping version {self._table.version}: {e}")
+            return self._table
+
+    def _ensure_compiled(self) -> None:
+        if not os.path.exists(self.path):
+            compile_pricing_table(self.path)
+            return
+        if self.managed:
+            expected = table_version(build_pricing_table())
+            with open(self.path, "rb") as f:
+                header = f.read(HEADER.size)
+            if len(header) < HEADER.size or table_version(header) != expected:
+                compile_pricing_table(self.path)
+
+    def reload(self) -> PricingTable:
+        self._last_check = 0.0
+        return self.get()
+
+
+DEFAULT_PRICING_TABLE_PATH = os.path.join(tempfile.gettempdir(), f"jp-budget-pricing-v{FORMAT_VERSION}.bin")
+
+_store = PricingTableStore(
+    os.environ.get("PRICING_TABLE_PATH", DEFAULT_PRICING_TABLE_PATH),
+    managed="PRICING_TABLE_PATH" not in os.environ
+)
+
+
+def get_pricing_table() -> PricingTable:
+    return _store.get()
+
+
+def set_pricing_table_path(path: str, check_interval: float = RELOAD_CHECK_INTERVAL) -> PricingTableStore:
+    global _store
+    _store = PricingTableStore(path, check_interval)
+    return _store
+
+
+def city_id(city: str) -> int:
+    return get_pricing_table().city_id(city)
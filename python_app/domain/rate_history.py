@@ -0,0 +1,184 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import numpy as np
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+
+
+MAGIC = b"JPRH"
+FORMAT_VERSION = 1
+# magic, format version, currency count
+HEADER = struct.Struct("<4sII")
+CODE_WIDTH = 3
+HISTORY_CURRENCIES = ["JPY", "USD", "EUR", "GBP", "AUD", "MYR", "HKD"]
+TREND_DAYS = 30
+
+
+def day_end_timestamp(day: date) -> float:
+    # Exclusive upper bound: everything recorded before the next UTC midnight counts as that day.
+    return datetime.combine(day + timedelta(days=1), time(), tzinfo=timezone.utc).timestamp()
+
+
+def _timestamp(moment) -> float:
+    if isinstance(moment, datetime):
+        return moment.timestamp()
+    if isinstance(moment, date):
+        return day_end_timestamp(moment)
+    return float(moment)
+
+
+@dataclass
+class RateTrend:
+    currency: str
+    as_of: date
+    rate: float
+    low: float
+    high: float
+    mean: float
+    samples: int
+
+
+class RateHistory:
+    def __init__(self, path: str, currencies: Sequence[str] = HISTORY_CURRENCIES):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mmap: Optional[mmap.mmap] = None
+        self._size = -1
+        self._records = None
+
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            self._create(list(currencies))
+        self._read_header()
+
+    def _create(self, currencies: List[str]) -> None:
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, len(currencies))
+        codes = b"".join(c.encode("ascii")[:CODE_WIDTH].ljust(CODE_WIDTH, b"\0") for c in currencies)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".rate-history-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header + codes)
+            # A concurrent creator may win; link fails instead of clobbering its records.
+            os.link(tmp_path, self.path)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(tmp_path)
+
+    def _read_header(self) -> None:
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"Truncated rate history: {self.path}")
+            magic, format_version, count = HEADER.unpack(header)
+            if magic != MAGIC or format_version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported rate history: {self.path}")
+            codes = f.read(count * CODE_WIDTH)
+
+        self.currencies: List[str] = [
+            codes[i * CODE_WIDTH:(i + 1) * CODE_WIDTH].rstrip(b"\0").decode("ascii") for i in range(count)
+        ]
+        self.currency_ids: Dict[str, int] = {c: i for i, c in enumerate(self.currencies)}
+        self.record_dtype = np.dtype([("timestamp", "<f8"), ("rates", "<f8", (count,))])
+        self.data_offset = HEADER.size + count * CODE_WIDTH
+
+    def _view(self) -> np.ndarray:
+        # Remap only when the file has grown; readers in other workers see appends on their next call.
+        size = os.path.getsize(self.path)
+        if size != self._size:
+            with self._lock:
+                usable = (size - self.data_offset) // self.record_dtype.itemsize
+                if usable > 0:
+                    with open(self.path, "rb") as f:
+                        self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._records = np.frombuffer(
+                        self._mmap, dtype=self.record_dtype, count=usable, offset=self.data_offset
+                    )
+                else:
+                    self._records = np.zeros(0, dtype=self.record_dtype)
+                self._size = size
+        return self._records
+
+    def __len__(self) -> int:
+        return len(self._view())
+
+    def append(self, timestamp: float, rates: Dict[str, float]) -> bool:
+        records = self._view()
+        if len(records) and timestamp <= records["timestamp"][-1]:
+            # Timestamps must stay sorted for binary search; late or duplicate samples are dropped.
+            return False
+
+        record = np.zeros(1, dtype=self.record_dtype)
+        record["timestamp"] = timestamp
+        record["rates"] = [rates.get(c, np.nan) or np.nan for c in self.currencies]
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        try:
+            torn = (os.fstat(fd).st_size - self.data_offset) % self.record_dtype.itemsize
+            if torn:
+                # Drop a record left half-written by a crash so later records stay aligned.
+                os.ftruncate(fd, os.fstat(fd).st_size - torn)
+            os.write(fd, record.tobytes())
+        finally:
+            os.close(fd)
+        return True
+
+    def _column(self, currency: str) -> int:
+        currency = currency.upper()
+        if currency not in self.currency_ids:
+            raise ValueError(f"Currency {currency} is not recorded")
+        return self.currency_ids[currency]
+
+    def rate_as_of(self, currency: str, moment) -> Optional[float]:
+        column = self._column(currency)
+        records = self._view()
+        position = int(np.searchsorted(records["timestamp"], _timestamp(moment), side="left")) - 1
+        # Walk back past samples where this currency was missing.
+        while position >= 0:
+            rate = records["rates"][position, column]
+            if not np.isnan(rate):
+                return float(rate)
+            position -= 1
+        return None
+
+    def window(self, currency: str, start: float, end: float) -> np.ndarray:
+        column = self._column(currency)
+        records = self._view()
+        times = records["timestamp"]
+        lo, hi = np.searchsorted(times, [start, end], side="left")
+        rates = records["rates"][lo:hi, column]
+        return rates[~np.isnan(rates)]
+
+    def trend(self, currency: str, as_of: date, days: int = TREND_DAYS) -> Optional[RateTrend]:
+        rate = self.rate_as_of(currency, as_of)
+        if rate is None:
+            return None
+        end = day_end_timestamp(as_of)
+        rates = self.window(currency, end - days * 86400, end)
+        if len(rates) == 0:
+            rates = np.array([rate])
+        return RateTrend(
+            currency=currency.upper(),
+            as_of=as_of,
+            rate=rate,
+            low=float(rates.min()),
+            high=float(rates.max()),
+            mean=float(rates.mean()),
+            samples=len(rates),
+        )
+
+
+DEFAULT_RATE_HISTORY_PATH = os.path.join(tempfile.gettempdir(), f"jp-budget-rate-history-v{FORMAT_VERSION}.bin")
+
+_history: Optional[RateHistory] = None
+
+
+def get_rate_history() -> RateHistory:
+    global _history
+    if _history is None:
+        _history = RateHistory(os.environ.get("EXCHANGE_RATE_HISTORY_PATH", DEFAULT_RATE_HISTORY_PATH))
+    return _history
@@ -1,4 +1,7 @@
-from typing import Tuple
+import numpy as np
+from datetime import date, timedelta
+from typing import Optional, Tuple
+from .climate import get_climate_store
 
 
 SEASONS = {
@@ -39,6 +42,61 @@ MONTH_MULTIPLIERS = {
 }
 
 
+HOLIDAY_PERIODS = [
+    ((12, 28), (12, 31), 1.5, "Year-End Holidays"),
+    ((1, 1), (1, 3), 1.5, "New Year Holidays"),
+    ((4, 29), (5, 5), 1.6, "Golden Week"),
+    ((8, 11), (8, 16), 1.45, "Obon Festival"),
+]
+
+# Two 4-year leap cycles of per-day multipliers; any date from 1901 to 2099 shifts into the
+# first cycle, leaving room for a trip of up to four years to end inside the table.
+CALENDAR_EPOCH = date(2024, 1, 1)
+CALENDAR_CYCLE_DAYS = 1461
+CALENDAR_DAYS = 2 * CALENDAR_CYCLE_DAYS
+
+
+def _build_day_multipliers() -> np.ndarray:
+    days = [CALENDAR_EPOCH + timedelta(days=i) for i in range(CALENDAR_DAYS)]
+    multipliers = np.array([MONTH_MULTIPLIERS[d.month] for d in days], dtype=np.float64)
+    for (start_month, start_day), (end_month, end_day), multiplier, _ in HOLIDAY_PERIODS:
+        for i, d in enumerate(days):
+            if (start_month, start_day) <= (d.month, d.day) <= (end_month, end_day):
+                multipliers[i] = max(multipliers[i], multiplier)
+    return multipliers
+
+
+DAY_MULTIPLIERS = _build_day_multipliers()
+# Prefix sums in integer hundredths stay exact however long the range, unlike float cumsum.
+CUMULATIVE_MULTIPLIER_CENTS = np.concatenate([[0], np.cumsum(np.rint(DAY_MULTIPLIERS * 100).astype(np.int64))])
+
+
+def _calendar_index(day: date) -> int:
+    cycles = (day.year - CALENDAR_EPOCH.year) // 4
+    return (day - CALENDAR_EPOCH).days - cycles * CALENDAR_CYCLE_DAYS
+
+
+def get_daily_multiplier(day: date) -> float:
+    return DAY_MULTIPLIERS.item(_calendar_index(day))
+
+
+def get_date_range_multiplier(departure_date: date, return_date: date) -> float:
+    nights = (return_date - departure_date).days
+    if nights <= 0:
+        return 0.0
+    if nights > CALENDAR_CYCLE_DAYS:
+        raise ValueError("Date range too long")
+    start = _calendar_index(departure_date)
+    return (CUMULATIVE_MULTIPLIER_CENTS.item(start + nights) - CUMULATIVE_MULTIPLIER_CENTS.item(start)) / 100
+
+
+def get_holiday(day: date) -> Optional[str]:
+    for (start_month, start_day), (end_month, end_day), _, label in HOLIDAY_PERIODS:
+        if (start_month, start_day) <= (day.month, day.day) <= (end_month, end_day):
+            return label
+    return None
+
+
 def get_season(month: int) -> Tuple[str, str]:
     if month < 1 or month > 12:
         month = max(1, min(12, month))
@@ -52,22 +110,10 @@ def get_seasonal_multiplier(month: int) -> float:
 
 
 def get_weather_info(city: str, month: int) -> dict:
-    weather_data = {
-        "tokyo": {
-            1: {"temp_low": 2, "temp_high": 10, "rainfall": 50, "description": "Cold and dry"},
-            2: {"temp_low": 3, "temp_high": 11, "rainfall": 55, "description": "Cold with occasional snow"},
-            3: {"temp_low": 6, "temp_high": 14, "rainfall": 115, "description": "Warming up, cherry blossoms begin"},
-            4: {"temp_low": 11, "temp_high": 19, "rainfall": 130, "description": "Mild, peak cherry blossom season"},
-            5: {"temp_low": 15, "temp_high": 24, "rainfall": 140, "description": "Pleasant warm weather"},
-            6: {"temp_low": 19, "temp_high": 26, "rainfall": 165, "description": "Rainy season begins"},
-            7: {"temp_low": 23, "temp_high": 30, "rainfall": 155, "description": "Hot and humid"},
-            8: {"temp_low": 24, "temp_high": 31, "rainfall": 150, "description": "Hottest month"},
-            9: {"temp_low": 21, "temp_high": 27, "rainfall": 210, "description": "Typhoon season"},
-            10: {"temp_low": 15, "temp_high": 22, "rainfall": 195, "description": "Cooling down, autumn colors"},
-            11: {"temp_low": 10, "temp_high": 17, "rainfall": 95, "description": "Autumn foliage peak"},
-            12: {"temp_low": 5, "temp_high": 12, "rainfall": 50, "description": "Cold and dry"},
-        }
+    info = get_climate_store().info(city, month)
+    return {
+        "temp_low": int(info.temp_low),
+        "temp_high": int(info.temp_high),
+        "rainfall": int(info.rainfall),
+        "description": info.description,
     }
-    city_lower = city.lower()
-    city_data = weather_data.get(city_lower, weather_data["tokyo"])
-    return city_data.get(month, city_data[1])
@@ -0,0 +1,199 @@
+import math
+import os
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .climate import CITY_CLIMATE
+from .travel_tips import CITY_RECOMMENDATIONS
+
+
+HASH_BITS = 20
+HASH_MASK = (1 << HASH_BITS) - 1
+DEFAULT_THRESHOLD = 0.9
+# Long messages are classified on their opening; that is where the ask usually is.
+MAX_TOKENS = 64
+
+TRAVEL_WEIGHT = 3.0
+OFF_TOPIC_WEIGHT = -2.5
+# One strong term is abuse on its own; mild ones (swearing as emphasis, "shut up") take two.
+STRONG_ABUSE_WEIGHT = 5.0
+MILD_ABUSE_WEIGHT = 2.5
+# With no evidence either way a message is as likely on topic as not, which never clears the threshold.
+TOPIC_BIAS = 0.0
+ABUSE_BIAS = -2.0
+
+TRAVEL_TERMS = """
+japan japanese tokyo osaka kyoto hokkaido sapporo okinawa fukuoka nagoya hiroshima nara yokohama
+kobe nikko hakone kamakura niseko fuji shinjuku shibuya asakusa ginza akihabara harajuku gion
+travel trip trips visit visiting holiday vacation itinerary tour tourist sightseeing
+flight flights airport narita haneda kansai hotel hotels ryokan hostel airbnb capsule onsen accommodation
+train trains shinkansen jr pass suica pasmo metro subway bus taxi
+ramen sushi izakaya bento onigiri sake matcha wagyu takoyaki okonomiyaki
+yen jpy sgd budget cost costs price prices cheap expensive money currency exchange
+temple temples shrine shrines castle museum garden market shopping souvenir
+weather season seasons cherry blossom sakura autumn leaves snow ski festival
+visa passport luggage pack packing etiquette culture
+pharmacy pharmacies drugstore medicine medication prescription hospital clinic doctor insurance
+"""
+
+TRAVEL_PHRASES = [
+    "golden week", "jr pass", "bullet train", "tax free", "cherry blossom", "mount fuji",
+    "ic card", "pocket wifi", "sim card", "day trip",
+]
+
+OFF_TOPIC_TERMS = """
+python javascript java typescript sql html css code coding program programming function compile debug bug
+homework essay assignment exam equation algebra calculus integral derivative theorem
+stock stocks crypto bitcoin ethereum forex trading invest investment mortgage
+election president politics political senator parliament
+lottery casino betting gambling
+lyrics poem
+"""
+
+OFF_TOPIC_PHRASES = [
+    "write code", "solve for", "prime number", "machine learning", "neural network", "who won",
+]
+
+STRONG_ABUSE_TERMS = """
+fuck fucker bitch bastard asshole cunt motherfucker retard retarded
+"""
+
+STRONG_ABUSE_PHRASES = ["kill yourself", "fuck you"]
+
+MILD_ABUSE_TERMS = """
+fucking shit dick idiot
+"""
+
+MILD_ABUSE_PHRASES = [
+    "shut up", "you suck", "stupid bot", "useless bot", "to hell",
+]
+
+REFUSALS = {
+    "off_topic": (
+        "I can only help with travel to Japan - destinations, budgets, transport, food and culture. "
+        "What would you like to know about your trip?"
+    ),
+    "abusive": "Let's keep things friendly. I'm happy to help you plan your trip to Japan whenever you're ready.",
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _sigmoid(x: float) -> float:
+    return 1.0 / (1.0 + math.exp(-x))
+
+
+def _bucket(feature: str) -> int:
+    return zlib.crc32(feature.encode()) & HASH_MASK
+
+
+def features(text: str) -> List[str]:
+    tokens = _TOKEN.findall(text.lower())[:MAX_TOKENS]
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+@dataclass
+class TopicVerdict:
+    label: str
+    off_topic: float
+    abusive: float
+    allowed: bool
+
+
+class TopicFilter:
+    def __init__(self, weights: Optional[Dict[int, Tuple[float, float]]] = None, threshold: Optional[float] = None):
+        # Sparse hashed weights: bucket -> (travel relevance, abuse). Hashing keeps the model a flat
+        # lookup table, so retrained weights can be dropped in without changing the feature code.
+        self.weights = weights if weights is not None else default_weights()
+        if threshold is None:
+            threshold = float(os.environ.get("CHAT_TOPIC_FILTER_THRESHOLD", DEFAULT_THRESHOLD))
+        self.threshold = threshold
+        self.checked = 0
+        self.rejected = 0
+
+    def classify(self, text: str) -> TopicVerdict:
+        topic, abuse = TOPIC_BIAS, ABUSE_BIAS
+        for feature in features(text):
+            weight = self.weights.get(_bucket(feature))
+            if weight is not None:
+                topic += weight[0]
+                abuse += weight[1]
+
+        off_topic = _sigmoid(-topic)
+        abusive = _sigmoid(abuse)
+        if abusive >= self.threshold:
+            label = "abusive"
+        elif off_topic >= self.threshold:
+            label = "off_topic"
+        else:
+            label = "travel"
+        return TopicVerdict(label=label, off_topic=off_topic, abusive=abusive, allowed=label == "travel")
+
+    def check(self, text: str) -> TopicVerdict:
+        verdict = self.classify(text)
+        self.checked += 1
+        if not verdict.allowed:
+            self.rejected += 1
+        return verdict
+
+    def get_stats(self) -> dict:
+        return {
+            "threshold": self.threshold,
+            "features": len(self.weights),
+            "checked": self.checked,
+            "rejected": self.rejected,
+        }
+
+
+def _add(weights: Dict[int, Tuple[float, float]], terms: Iterable[str], topic: float, abuse: float) -> None:
+    for term in terms:
+        bucket = _bucket(term)
+        current = weights.get(bucket, (0.0, 0.0))
+        weights[bucket] = (current[0] + topic, current[1] + abuse)
+
+
+def default_weights() -> Dict[int, Tuple[float, float]]:
+    weights: Dict[int, Tuple[float, float]] = {}
+    places = set(CITY_CLIMATE) | set(CITY_RECOMMENDATIONS)
+    _add(weights, set(TRAVEL_TERMS.split()) | places, TRAVEL_WEIGHT, 0.0)
+    _add(weights, TRAVEL_PHRASES, TRAVEL_WEIGHT, 0.0)
+    _add(weights, OFF_TOPIC_TERMS.split(), OFF_TOPIC_WEIGHT, 0.0)
+    _add(weights, OFF_TOPIC_PHRASES, OFF_TOPIC_WEIGHT, 0.0)
+    _add(weights, STRONG_ABUSE_TERMS.split(), 0.0, STRONG_ABUSE_WEIGHT)
+    _add(weights, STRONG_ABUSE_PHRASES, 0.0, STRONG_ABUSE_WEIGHT)
+    _add(weights, MILD_ABUSE_TERMS.split(), 0.0, MILD_ABUSE_WEIGHT)
+    _add(weights, MILD_ABUSE_PHRASES, 0.0, MILD_ABUSE_WEIGHT)
+    return weights
+
+
+_filter: Optional[TopicFilter] = None
+
+
+def get_topic_filter() -> TopicFilter:
+    global _filter
+    if _filter is None:
+        _filter = TopicFilter()
+    return _filter
+
+
+if __name__ == "__main__":
+    # Opt-in benchmark: python -m python_app.domain.topic_filter [iterations]
+    import sys
+    import time
+
+    samples = [
+        "Is the JR Pass worth it for a 5 day Osaka trip?",
+        "Write python code to sort a list",
+        "shut up you useless bot",
+        "What should I pack for Hokkaido in winter? " * 20,
+    ]
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    topic_filter = TopicFilter()
+    for sample in samples:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            topic_filter.classify(sample)
+        per_call = (time.perf_counter() - started) / iterations * 1e6
+        print(f"{per_call:8.2f} us  {topic_filter.classify(sample).label:9}  {sample[:48]!r}")
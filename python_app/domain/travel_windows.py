@@ -0,0 +1,76 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Optional
+from .batch_calculator import BatchCostCalculator, round_array
+from .climate import ClimateInfo, get_climate_store
+from .pricing_table import get_pricing_table, style_id
+
+
+@dataclass
+class TravelWindow:
+    month: int
+    num_days: int
+    total: float
+    cost_per_day: float
+
+
+@dataclass
+class BudgetSweep:
+    months: List[int]
+    days: List[int]
+    totals: List[List[float]]
+    cheapest_windows: List[TravelWindow]
+    climate: List[ClimateInfo]
+
+
+def sweep_budget(
+    city: str,
+    travel_style: str,
+    num_travelers: int,
+    min_days: int = 1,
+    max_days: int = 30,
+    include_flights: bool = True,
+    shopping_budget: float = 200.0,
+    target_total: Optional[float] = None,
+    limit: int = 10,
+) -> BudgetSweep:
+    months = np.arange(12, dtype=np.int64)[:, None]
+    days = np.arange(min_days, max_days + 1, dtype=np.int64)[None, :]
+
+    table = get_pricing_table()
+    batch = BatchCostCalculator(pricing_table=table).calculate_indexed(
+        city_idx=np.int64(table.city_id(city)),
+        style_idx=np.int64(style_id(travel_style)),
+        month_idx=months,
+        num_days=days,
+        num_travelers=np.int64(num_travelers),
+        include_flights=np.bool_(include_flights),
+        shopping_budgets=np.float64(shopping_budget),
+    )
+    rounded = round_array(batch.total, 2)
+
+    mask = rounded <= target_total if target_total is not None else np.ones_like(rounded, dtype=bool)
+    month_pos, day_pos = np.nonzero(mask)
+    window_days = days[0, day_pos]
+    window_totals = rounded[month_pos, day_pos]
+    cost_per_day = window_totals / window_days
+    # Cheapest per day first; ties favour the longer trip, then the earlier month.
+    order = np.lexsort((month_pos, -window_days, cost_per_day))[:limit]
+
+    windows = [
+        TravelWindow(
+            month=int(month_pos[i]) + 1,
+            num_days=int(window_days[i]),
+            total=float(window_totals[i]),
+            cost_per_day=round(float(cost_per_day[i]), 2),
+        )
+        for i in order
+    ]
+
+    return BudgetSweep(
+        months=list(range(1, 13)),
+        days=days[0].tolist(),
+        totals=rounded.tolist(),
+        cheapest_windows=windows,
+        climate=get_climate_store().infos([city] * 12, range(1, 13)),
+    )
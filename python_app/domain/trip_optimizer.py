@@ -0,0 +1,95 @@
+import time
+from dataclasses import dataclass
+from typing import List, Sequence
+from .cost_calculator import CostCalculator
+from .pricing_table import TRAVEL_STYLES, style_id
+
+
+@dataclass
+class TripCandidate:
+    city: str
+    month: int
+    travel_style: str
+    num_days: int
+    total: float
+
+
+@dataclass
+class OptimizerResult:
+    candidates: List[TripCandidate]
+    candidates_evaluated: int
+    search_time_ms: float
+
+
+def month_window(earliest_month: int, latest_month: int) -> List[int]:
+    if earliest_month <= latest_month:
+        return list(range(earliest_month, latest_month + 1))
+    return list(range(earliest_month, 13)) + list(range(1, latest_month + 1))
+
+
+def optimize_trip(
+    max_total: float,
+    num_travelers: int,
+    cities: Sequence[str],
+    months: Sequence[int],
+    travel_styles: Sequence[str] = TRAVEL_STYLES,
+    min_days: int = 1,
+    max_days: int = 30,
+    include_flights: bool = True,
+    shopping_budget: float = 200.0,
+    limit: int = 10,
+) -> OptimizerResult:
+    started = time.perf_counter()
+    calculator = CostCalculator()
+    evaluated = 0
+
+    def total_for(city: str, style: str, month: int, num_days: int) -> float:
+        nonlocal evaluated
+        evaluated += 1
+        return calculator.calculate_budget(
+            city=city,
+            num_days=num_days,
+            num_travelers=num_travelers,
+            travel_style=style,
+            month=month,
+            include_flights=include_flights,
+            shopping_budget=shopping_budget
+        ).total
+
+    # Every cost component is non-decreasing in trip length and in travel style, so the
+    # longest affordable trip is found by binary search and pricier styles can be pruned.
+    styles = sorted(set(travel_styles), key=style_id)
+    candidates = []
+    for city in cities:
+        for month in months:
+            for style in styles:
+                shortest_total = total_for(city, style, month, min_days)
+                if shortest_total > max_total:
+                    break
+
+                best_days, best_total = min_days, shortest_total
+                lo, hi = min_days + 1, max_days
+                while lo <= hi:
+                    mid = (lo + hi) // 2
+                    mid_total = total_for(city, style, month, mid)
+                    if mid_total <= max_total:
+                        best_days, best_total = mid, mid_total
+                        lo = mid + 1
+                    else:
+                        hi = mid - 1
+
+                candidates.append(TripCandidate(
+                    city=city,
+                    month=month,
+                    travel_style=style,
+                    num_days=best_days,
+                    total=best_total
+                ))
+
+    candidates.sort(key=lambda c: (-c.num_days, -style_id(c.travel_style), c.total))
+
+    return OptimizerResult(
+        candidates=candidates[:limit],
+        candidates_evaluated=evaluated,
+        search_time_ms=round((time.perf_counter() - started) * 1000, 3)
+    )
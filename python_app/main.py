@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
@@ -5,19 +6,38 @@ import os
 
 load_dotenv()
 
-from .api.routes import router
+from .api.routes import router, optimizer_service, chat_history, analytics_buffer, analytics_rollup
+from .services.http_client import http_clients
+from .domain.answer_index import get_answer_index
 from .middleware.security import (
     RateLimitMiddleware,
     SecurityHeadersMiddleware,
     RequestValidationMiddleware,
 )
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await http_clients.start()
+    await chat_history.start()
+    await analytics_buffer.start()
+    await analytics_rollup.start()
+    get_answer_index()
+    yield
+    await analytics_rollup.stop()
+    await analytics_buffer.stop()
+    await chat_history.stop()
+    await http_clients.aclose()
+    optimizer_service.shutdown()
+
+
 app = FastAPI(
     title="Japan Travel Budget Calculator API",
     description="A modular Python backend for the Japan Travel Budget Calculator",
     version="2.0.0",
     docs_url="/docs" if os.environ.get("NODE_ENV") != "production" else None,
     redoc_url="/redoc" if os.environ.get("NODE_ENV") != "production" else None,
+    lifespan=lifespan,
 )
 
 allowed_origins = [
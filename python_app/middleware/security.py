@@ -7,6 +7,8 @@ import re
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
+    CHAT_PATHS = ("/api/chat", "/api/chat/stream")
+    
     def __init__(self, app, requests_per_minute: int = 60, chat_requests_per_minute: int = 10):
         super().__init__(app)
         self.requests_per_minute = requests_per_minute
@@ -18,7 +20,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         client_ip = self._get_client_ip(request)
         current_time = time.time()
         
-        is_chat_endpoint = request.url.path == "/api/chat" and request.method == "POST"
+        is_chat_endpoint = request.url.path in self.CHAT_PATHS and request.method == "POST"
         
         if is_chat_endpoint:
             self.chat_request_counts[client_ip] = [
@@ -1,4 +1,4 @@
 # Pydantic schemas for request/response validation
-from .budget import BudgetRequest, BudgetResponse, CostBreakdown
+from .budget import BudgetRequest, BudgetScenario, BudgetResponse, CostBreakdown, BudgetBatchRequest, BudgetBatchResponse
 from .chat import ChatRequest, ChatResponse, ChatHistoryItem
 from .newsletter import NewsletterRequest, NewsletterResponse
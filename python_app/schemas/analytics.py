@@ -1,35 +1,85 @@
-from pydantic import BaseModel, Field
+import math
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Any
 from datetime import datetime
 
 
-class BudgetCalculationCreate(BaseModel):
+# Exclusive bounds for the Numeric(10, 2) and Numeric(10, 4) columns in budget_calculations: anything
+# at or above these rounds up to 10^8 or 10^6 on insert and overflows the column.
+MAX_SGD_AMOUNT = 99999999.995
+MAX_EXCHANGE_RATE = 999999.99995
+
+
+def _check_storable(value: Any) -> Any:
+    # Postgres rejects NUL in text and JSONB and NaN/Infinity in JSONB; catching them here keeps
+    # one bad beacon from failing the batched insert it would otherwise be written with.
+    if isinstance(value, str):
+        if "\x00" in value:
+            raise ValueError("NUL characters are not allowed")
+        try:
+            value.encode("utf-8")
+        except UnicodeEncodeError:
+            # JSON can spell out lone surrogates ("\\ud800") that no database encoding accepts.
+            raise ValueError("Text must be valid Unicode")
+    elif isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError("Numbers must be finite")
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            _check_storable(key)
+            _check_storable(item)
+    elif isinstance(value, list):
+        for item in value:
+            _check_storable(item)
+    return value
+
+
+class AnalyticsRecord(BaseModel):
+    @field_validator("*")
+    @classmethod
+    def storable(cls, value: Any) -> Any:
+        return _check_storable(value)
+
+
+class BudgetCalculationCreate(AnalyticsRecord):
     session_id: Optional[str] = None
     departure_date: Optional[str] = None
     return_date: Optional[str] = None
     travelers: int = Field(..., ge=1, le=20)
     cities: List[str] = Field(..., min_length=1)
     travel_style: str
-    total_budget_sgd: float
-    per_person_sgd: float
-    exchange_rate: float
+    total_budget_sgd: float = Field(..., ge=0, lt=MAX_SGD_AMOUNT)
+    per_person_sgd: float = Field(..., ge=0, lt=MAX_SGD_AMOUNT)
+    exchange_rate: float = Field(..., gt=0, lt=MAX_EXCHANGE_RATE)
     breakdown: dict
 
 
-class PageViewCreate(BaseModel):
+class PageViewCreate(AnalyticsRecord):
     session_id: Optional[str] = None
     page_path: str
     referrer: Optional[str] = None
     user_agent: Optional[str] = None
 
 
-class UserEventCreate(BaseModel):
+class UserEventCreate(AnalyticsRecord):
     session_id: Optional[str] = None
     event_type: str
     event_category: str
     event_data: Optional[dict] = None
 
 
+class AnalyticsBatchError(BaseModel):
+    line: int = Field(..., description="1-based line number in the NDJSON body")
+    error: str
+
+
+class AnalyticsBatchResponse(BaseModel):
+    success: bool
+    accepted: int
+    rejected: int
+    errors: List[AnalyticsBatchError] = Field(default_factory=list, description="First errors, one per rejected line")
+
+
 class CityCount(BaseModel):
     city: str
     count: int
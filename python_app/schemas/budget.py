@@ -1,8 +1,12 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, List, Optional
+from datetime import date
 
 
-class BudgetRequest(BaseModel):
+class BudgetScenario(BaseModel):
+    # Batch scenarios are priced in SGD only; conversion and uncertainty options are rejected, not ignored.
+    model_config = ConfigDict(extra="forbid")
+
     city: str = Field(..., description="Destination city in Japan")
     num_days: int = Field(..., ge=1, le=90, description="Number of days")
     num_travelers: int = Field(..., ge=1, le=20, description="Number of travelers")
@@ -10,6 +14,18 @@ class BudgetRequest(BaseModel):
     month: int = Field(..., ge=1, le=12, description="Travel month (1-12)")
     include_flights: bool = Field(True, description="Include flight costs")
     shopping_budget: float = Field(200.0, ge=0, description="Shopping budget per person in SGD")
+    departure_date: Optional[date] = Field(None, description="Departure date; with return_date, prices each night by date")
+    return_date: Optional[date] = Field(None, description="Return date; overrides num_days and month when both dates are set")
+
+
+class BudgetRequest(BudgetScenario):
+    model_config = ConfigDict(extra="ignore")
+
+    currency: str = Field("SGD", description="Home currency for an additional converted breakdown")
+    as_of: Optional[date] = Field(None, description="Convert to JPY at the recorded rate on this date")
+    include_uncertainty: bool = Field(False, description="Include Monte Carlo p10/p50/p90 bands")
+    uncertainty_draws: int = Field(10000, ge=100, le=100000, description="Monte Carlo draws")
+    uncertainty_seed: Optional[int] = Field(None, ge=0, description="Seed for reproducible bands")
 
 
 class CostBreakdown(BaseModel):
@@ -23,9 +39,151 @@ class CostBreakdown(BaseModel):
     daily_average: float
 
 
+class CategoryBand(BaseModel):
+    p10: float
+    p50: float
+    p90: float
+
+
+class UncertaintyBands(BaseModel):
+    bands: Dict[str, CategoryBand]
+    draws: int
+    seed: Optional[int]
+    compute_time_ms: float
+
+
+class RateTrend(BaseModel):
+    currency: str
+    as_of: date
+    rate: float
+    low: float
+    high: float
+    mean: float
+    samples: int
+    total_jpy_low: Optional[float] = None
+    total_jpy_mean: Optional[float] = None
+    total_jpy_high: Optional[float] = None
+
+
 class BudgetResponse(BaseModel):
     breakdown: CostBreakdown
     exchange_rate: float
     total_jpy: float
     season: str
     season_label: str
+    currency: str = "SGD"
+    currency_rate: float = 1.0
+    converted_breakdown: Optional[CostBreakdown] = None
+    rate_trend: Optional[RateTrend] = None
+    uncertainty: Optional[UncertaintyBands] = None
+
+
+class BudgetBatchRequest(BaseModel):
+    scenarios: List[BudgetScenario] = Field(..., min_length=1, max_length=5000, description="Budget scenarios to evaluate")
+
+
+class BudgetBatchResponse(BaseModel):
+    results: List[BudgetResponse]
+    exchange_rate: float
+    count: int
+
+
+class BudgetSweepRequest(BaseModel):
+    city: str = Field(..., description="Destination city in Japan")
+    num_travelers: int = Field(..., ge=1, le=20, description="Number of travelers")
+    travel_style: str = Field("mid", description="Travel style: budget, mid, or luxury")
+    min_days: int = Field(1, ge=1, le=90, description="Shortest trip length to sweep")
+    max_days: int = Field(30, ge=1, le=90, description="Longest trip length to sweep")
+    include_flights: bool = Field(True, description="Include flight costs")
+    shopping_budget: float = Field(200.0, ge=0, description="Shopping budget per person in SGD")
+    target_total: Optional[float] = Field(None, gt=0, description="Maximum trip total in SGD for cheapest windows")
+    limit: int = Field(10, ge=1, le=100, description="Number of cheapest windows to return")
+
+
+class Climate(BaseModel):
+    temp_low: float
+    temp_high: float
+    rainfall: float
+    description: str
+
+
+class TravelWindow(BaseModel):
+    month: int
+    num_days: int
+    total: float
+    cost_per_day: float
+
+
+class BudgetSweepResponse(BaseModel):
+    city: str
+    travel_style: str
+    num_travelers: int
+    months: List[int]
+    days: List[int]
+    totals: List[List[float]]
+    cheapest_windows: List[TravelWindow]
+    climate: List[Climate]
+    compute_time_ms: float
+
+
+class ItineraryLegRequest(BaseModel):
+    city: str = Field(..., description="City for this leg")
+    nights: int = Field(..., ge=1, le=90, description="Nights spent in this city")
+    month: Optional[int] = Field(None, ge=1, le=12, description="Month for this leg, defaults to the trip month")
+
+
+class ItineraryRequest(BaseModel):
+    legs: List[ItineraryLegRequest] = Field(..., min_length=1, max_length=10, description="Ordered city legs")
+    num_travelers: int = Field(..., ge=1, le=20, description="Number of travelers")
+    travel_style: str = Field("mid", description="Travel style: budget, mid, or luxury")
+    month: int = Field(..., ge=1, le=12, description="Departure month (1-12)")
+    include_flights: bool = Field(True, description="Include flight costs")
+    shopping_budget: float = Field(200.0, ge=0, description="Shopping budget per person in SGD")
+
+
+class ItineraryLegResult(BaseModel):
+    city: str
+    nights: int
+    month: int
+    breakdown: CostBreakdown
+    transfer_cost: float
+    climate: Climate
+
+
+class ItineraryResponse(BaseModel):
+    legs: List[ItineraryLegResult]
+    breakdown: CostBreakdown
+    intercity_transport: float
+    total_nights: int
+    exchange_rate: float
+    total_jpy: float
+    season: str
+    season_label: str
+
+
+class TripOptimizeRequest(BaseModel):
+    max_total: float = Field(..., gt=0, description="Maximum trip total in SGD")
+    num_travelers: int = Field(..., ge=1, le=20, description="Number of travelers")
+    cities: Optional[List[str]] = Field(None, max_length=10, description="Cities to consider, defaults to all")
+    earliest_month: int = Field(1, ge=1, le=12, description="Earliest departure month")
+    latest_month: int = Field(12, ge=1, le=12, description="Latest departure month, may wrap past December")
+    min_days: int = Field(1, ge=1, le=90, description="Minimum trip length")
+    max_days: int = Field(30, ge=1, le=90, description="Maximum trip length")
+    travel_styles: List[str] = Field(["budget", "mid", "luxury"], min_length=1, description="Allowed travel styles")
+    include_flights: bool = Field(True, description="Include flight costs")
+    shopping_budget: float = Field(200.0, ge=0, description="Shopping budget per person in SGD")
+    limit: int = Field(10, ge=1, le=50, description="Number of candidates to return")
+
+
+class TripCandidate(BaseModel):
+    city: str
+    month: int
+    travel_style: str
+    num_days: int
+    total: float
+
+
+class TripOptimizeResponse(BaseModel):
+    candidates: List[TripCandidate]
+    candidates_evaluated: int
+    search_time_ms: float
@@ -9,10 +9,12 @@ class ChatHistoryItem(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str = Field(..., min_length=1, description="User message")
-    history: Optional[List[ChatHistoryItem]] = Field(default=None, description="Chat history")
+    history: Optional[List[ChatHistoryItem]] = Field(default=None, description="Chat history; omit to use the server-side history for session_id")
     session_id: Optional[str] = Field(default=None, description="Session ID for persistence")
+    cache: bool = Field(default=True, description="Allow a cached answer; disable for personalized conversations")
 
 
 class ChatResponse(BaseModel):
     message: str = Field(..., description="Assistant response")
     session_id: Optional[str] = Field(default=None, description="Session ID")
+    source: str = Field(default="assistant", description="assistant, local when answered from built-in travel data, or filter when declined as off-topic")
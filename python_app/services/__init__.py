@@ -1,4 +1,13 @@
 # Services layer - External API integrations
+from .http_client import HttpClientPool, ServiceLimits, http_clients
+from .rate_cache import SharedRateCache
+from .chat_cache import ChatResponseCache
+from .chat_history import ChatHistoryStore
+from .analytics_buffer import AnalyticsBuffer
+from .history_compactor import HistoryCompactor
+from .chat_scheduler import ChatScheduler, ChatBusyError
+from .model_latency import ModelLatencyStats
 from .exchange_rate import ExchangeRateService
 from .chat import ChatService
 from .google_maps import GoogleMapsService
+from .trip_optimizer import TripOptimizerService
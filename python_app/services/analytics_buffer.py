@@ -0,0 +1,309 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import InterfaceError, OperationalError, ProgrammingError
+from sqlalchemy.orm import Session
+
+from ..db import database
+from ..db.models import BudgetCalculation, PageView, UserEvent
+
+
+ANALYTICS_MODELS = {model.__tablename__: model for model in (BudgetCalculation, PageView, UserEvent)}
+DEFAULT_MAX_PENDING = 10000
+DEFAULT_FLUSH_INTERVAL = 2.0
+DEFAULT_FLUSH_BATCH = 500
+OVERFLOW_POLICIES = ("drop", "spill")
+DEFAULT_SPILL_PATH = os.path.join(tempfile.gettempdir(), "jp-analytics-spill.ndjson")
+DEFAULT_DEAD_LETTER_PATH = os.path.join(tempfile.gettempdir(), "jp-analytics-rejected.ndjson")
+# The database (or the schema) is unavailable; retrying the same rows later can succeed.
+# Anything else is taken to be a problem with a row, which is isolated by bisecting the batch.
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, ProgrammingError, ConnectionError, TimeoutError)
+# Transactions spent isolating bad rows per batch; what is left is requeued for the next flush.
+# Never fewer than it takes to bisect down to one row, so every flush makes progress.
+MAX_ISOLATION_WRITES = 64
+
+
+class AnalyticsBuffer:
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        max_pending: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        flush_batch: Optional[int] = None,
+        overflow: Optional[str] = None,
+        spill_path: Optional[str] = None,
+        dead_letter_path: Optional[str] = None
+    ):
+        self._session_factory = session_factory
+        self.max_pending = max_pending or int(os.environ.get("ANALYTICS_BUFFER_MAX", DEFAULT_MAX_PENDING))
+        self.flush_interval = flush_interval or float(os.environ.get("ANALYTICS_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL))
+        self.flush_batch = flush_batch or int(os.environ.get("ANALYTICS_FLUSH_BATCH", DEFAULT_FLUSH_BATCH))
+        self.overflow = (overflow or os.environ.get("ANALYTICS_OVERFLOW", "drop")).lower()
+        if self.overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown analytics overflow policy: {self.overflow}")
+        self.spill_path = spill_path or os.environ.get("ANALYTICS_SPILL_PATH", DEFAULT_SPILL_PATH)
+        self.dead_letter_path = dead_letter_path or os.environ.get("ANALYTICS_DEAD_LETTER_PATH", DEFAULT_DEAD_LETTER_PATH)
+
+        self._pending: List[Tuple[str, dict]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.accepted = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dead_lettered = 0
+        self.failed_flushes = 0
+
+    @property
+    def session_factory(self) -> Optional[Callable[[], Session]]:
+        return self._session_factory or database.SessionLocal
+
+    def add(self, table: str, row: dict) -> bool:
+        return self.add_many([(table, row)])
+
+    def add_many(self, records: List[Tuple[str, dict]]) -> bool:
+        # Stamped on arrival; the server default would record when the batch happened to flush.
+        now = datetime.now(timezone.utc)
+        stamped = []
+        for table, row in records:
+            if table not in ANALYTICS_MODELS:
+                raise ValueError(f"Unknown analytics table: {table}")
+            stamped.append((table, dict(row, created_at=row.get("created_at") or now)))
+
+        with self._lock:
+            # All or nothing, so the records of one request always land in the same flush transaction.
+            if len(self._pending) + len(stamped) > self.max_pending:
+                return self._overflow(stamped)
+            self._pending.extend(stamped)
+            self.accepted += len(stamped)
+            should_wake = len(self._pending) >= self.flush_batch
+
+        if should_wake and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def _overflow(self, records: List[Tuple[str, dict]]) -> bool:
+        if self.overflow == "spill":
+            try:
+                self._spill(records)
+                self.spilled += len(records)
+                return True
+            except OSError as e:
+                print(f"Analytics spill error: {e}")
+        print(f"Analytics buffer dropped {len(records)} records")
+        self.dropped += len(records)
+        return False
+
+    def _spill(self, records: List[Tuple[str, dict]]) -> None:
+        self._append(self.spill_path, records)
+
+    def _append(self, path: str, records: List[Tuple[str, dict]]) -> None:
+        lines = "".join(
+            json.dumps({"table": table, "row": dict(row, created_at=row["created_at"].isoformat())}, default=str) + "\n"
+            for table, row in records
+        )
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        try:
+            os.write(fd, lines.encode())
+        finally:
+            os.close(fd)
+
+    def _claim_spill(self) -> Optional[str]:
+        # Renaming claims the file atomically, so only one worker replays a given spill.
+        claimed = f"{self.spill_path}.replay-{os.getpid()}"
+        try:
+            os.rename(self.spill_path, claimed)
+        except FileNotFoundError:
+            return None
+        return claimed
+
+    def _read_spill(self, path: str) -> List[Tuple[str, dict]]:
+        records = []
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    row = record["row"]
+                    row["created_at"] = datetime.fromisoformat(row["created_at"])
+                    records.append((record["table"], row))
+                except (ValueError, KeyError, TypeError):
+                    # A line cut short by a crash mid-append; the rest of the file is still good.
+                    continue
+        return records
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if self.session_factory is None:
+                with self._lock:
+                    self._pending[:0] = batch
+                return 0
+
+            written = 0
+            if batch:
+                written, unwritten = await asyncio.to_thread(self._write_isolated, batch)
+                self.flushed += written
+                if unwritten:
+                    self.failed_flushes += 1
+                    self._requeue(unwritten)
+                    return written
+
+            written += await self._replay()
+            return written
+
+    def _requeue(self, batch: List[Tuple[str, dict]]) -> None:
+        with self._lock:
+            room = max(0, self.max_pending - len(self._pending))
+            # Oldest rows go back to the front; whatever no longer fits takes the overflow path.
+            self._pending[:0] = batch[:room]
+            overflow = batch[room:]
+        if overflow:
+            self._overflow(overflow)
+
+    async def _replay(self) -> int:
+        if self.overflow != "spill":
+            return 0
+        path = await asyncio.to_thread(self._claim_spill)
+        if path is None:
+            return 0
+        try:
+            records = await asyncio.to_thread(self._read_spill, path)
+        except OSError as e:
+            print(f"Analytics spill read error: {e}")
+            return 0
+
+        written = 0
+        unwritten: List[Tuple[str, dict]] = []
+        for start in range(0, len(records), self.flush_batch):
+            chunk = records[start:start + self.flush_batch]
+            done, unwritten = await asyncio.to_thread(self._write_isolated, chunk)
+            written += done
+            if unwritten:
+                self.failed_flushes += 1
+                unwritten = unwritten + records[start + len(chunk):]
+                break
+        self.replayed += written
+
+        if unwritten:
+            # Committed rows are not replayed twice; the rest goes back to the spill file.
+            try:
+                self._spill(unwritten)
+            except OSError as e:
+                print(f"Analytics spill error, {len(unwritten)} unwritten records left in {path}: {e}")
+                return written
+        os.unlink(path)
+        return written
+
+    def _write_isolated(self, batch: List[Tuple[str, dict]]) -> Tuple[int, List[Tuple[str, dict]]]:
+        # Bisects around rows the database rejects, which go to the dead-letter file. Returns the rows
+        # written and those left unwritten by a transient failure or by running out of isolation writes.
+        chunks = [batch]
+        written = 0
+        writes = 0
+        budget = max(MAX_ISOLATION_WRITES, 2 * len(batch).bit_length())
+        while chunks:
+            chunk = chunks.pop()
+            if writes >= budget:
+                return written, [record for c in [chunk] + chunks[::-1] for record in c]
+            writes += 1
+            try:
+                self._write(chunk)
+            except TRANSIENT_ERRORS as e:
+                print(f"Analytics flush error, will retry: {e}")
+                return written, [record for c in [chunk] + chunks[::-1] for record in c]
+            except Exception as e:
+                if len(chunk) == 1:
+                    self._dead_letter(chunk, e)
+                else:
+                    # Second half pushed first so rows keep their order.
+                    middle = len(chunk) // 2
+                    chunks.append(chunk[middle:])
+                    chunks.append(chunk[:middle])
+            else:
+                written += len(chunk)
+        return written, []
+
+    def _dead_letter(self, records: List[Tuple[str, dict]], error: Exception) -> None:
+        table = records[0][0]
+        print(f"Analytics row rejected by {table}: {error}")
+        self.dead_lettered += len(records)
+        try:
+            self._append(self.dead_letter_path, records)
+        except OSError as e:
+            print(f"Analytics dead-letter write error: {e}")
+
+    def _write(self, batch: List[Tuple[str, dict]]) -> None:
+        rows_by_table: Dict[str, List[dict]] = defaultdict(list)
+        for table, row in batch:
+            rows_by_table[table].append(row)
+
+        db = self.session_factory()
+        try:
+            # executemany inserts; SQLAlchemy sends these to Postgres as multi-row VALUES batches.
+            for table, rows in rows_by_table.items():
+                db.execute(insert(ANALYTICS_MODELS[table]), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        await self.flush()
+        if self._pending:
+            # The database is still unreachable at shutdown: spilled rows wait for the next start,
+            # otherwise they are counted as dropped.
+            with self._lock:
+                batch, self._pending = self._pending, []
+            self._overflow(batch)
+
+    def get_stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "overflow": self.overflow,
+            "accepted": self.accepted,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "dead_lettered": self.dead_lettered,
+            "failed_flushes": self.failed_flushes,
+            "persistent": self.session_factory is not None,
+        }
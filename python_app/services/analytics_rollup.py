@@ -0,0 +1,391 @@
+import asyncio
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, literal_column, select, text
+from sqlalchemy.orm import Session
+
+from ..db import database
+from ..db.models import (
+    AnalyticsDailyRollup, AnalyticsHourlyRollup, AnalyticsRollupState, BudgetCalculation, PageView, UserEvent,
+)
+
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+DEFAULT_INTERVAL = 300.0
+# Closed hours are recomputed for this long to absorb in-flight flushes and clock skew between
+# workers. Rows stamped further back (spill replays, requeues after an outage, client-supplied
+# created_at) are found through the raw tables' id watermark and their hours recomputed.
+DEFAULT_LAG_HOURS = 2
+# Hours compacted per transaction; a first run over a large history catches up in chunks.
+MAX_HOURS_PER_RUN = 24 * 7
+# Arbitrary constant for pg_try_advisory_xact_lock, so only one worker compacts at a time.
+ADVISORY_LOCK_KEY = 0x4A505452
+
+PAGE_VIEWS = "page_views"
+USER_EVENTS = "user_events"
+BUDGETS = "budget_calculations"
+TRAVELERS = "budget_travelers"
+CITY = "budget_city"
+STYLE = "budget_style"
+# Written for every compacted bucket, even at zero, so the newest bucket marks how far compaction got.
+BASE_METRICS = (PAGE_VIEWS, USER_EVENTS, BUDGETS, TRAVELERS)
+
+# (metric, dimension) -> [count, value_sum]
+Totals = Dict[Tuple[str, str], list]
+
+def floor_hour(t: datetime) -> datetime:
+    return t.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_hour(t: datetime) -> datetime:
+    floor = floor_hour(t)
+    return floor if floor == t else floor + HOUR
+
+
+def floor_day(t: datetime) -> datetime:
+    return t.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def as_utc(t: datetime) -> datetime:
+    return t.astimezone(timezone.utc).replace(tzinfo=None) if t.tzinfo is not None else t
+
+
+def _bucket_start(value) -> datetime:
+    # date_trunc returns timestamps; the SQLite fallback returns text.
+    return datetime.fromisoformat(value) if isinstance(value, str) else as_utc(value)
+
+
+def ceil_day(t: datetime) -> datetime:
+    floor = floor_day(t)
+    return floor if floor == t else floor + DAY
+
+
+def hour_ranges(hours: Iterable[datetime]) -> List[Tuple[datetime, datetime]]:
+    # Consecutive hours merged into [start, end) ranges, so they are compacted together.
+    ranges: List[Tuple[datetime, datetime]] = []
+    for hour in sorted(hours):
+        if ranges and ranges[-1][1] == hour:
+            ranges[-1] = (ranges[-1][0], hour + HOUR)
+        else:
+            ranges.append((hour, hour + HOUR))
+    return ranges
+
+
+def empty_totals() -> Totals:
+    # value_sum stays Decimal end to end, so rolled-up money sums match the raw Numeric ones.
+    totals: Totals = defaultdict(lambda: [0, Decimal(0)])
+    for metric in BASE_METRICS:
+        totals[(metric, "")]
+    return totals
+
+
+def merge_totals(target: Totals, source: Totals) -> Totals:
+    for key, (count, value_sum) in source.items():
+        target[key][0] += count
+        target[key][1] += value_sum
+    return target
+
+
+@dataclass
+class DashboardTotals:
+    page_views: int = 0
+    user_events: int = 0
+    budget_calculations: int = 0
+    average_budget: float = 0.0
+    average_travelers: float = 0.0
+    popular_cities: List[Tuple[str, int]] = field(default_factory=list)
+    popular_travel_styles: List[Tuple[str, int]] = field(default_factory=list)
+
+    @classmethod
+    def from_totals(cls, totals: Totals, top_cities: int = 10) -> "DashboardTotals":
+        def ranked(metric: str) -> List[Tuple[str, int]]:
+            counts = [(dim, int(c)) for (m, dim), (c, _) in totals.items() if m == metric and c > 0]
+            return sorted(counts, key=lambda item: (-item[1], item[0]))
+
+        budgets, budget_sum = totals.get((BUDGETS, ""), (0, 0.0))
+        travelers, traveler_sum = totals.get((TRAVELERS, ""), (0, 0.0))
+        return cls(
+            page_views=int(totals.get((PAGE_VIEWS, ""), (0, 0.0))[0]),
+            user_events=int(totals.get((USER_EVENTS, ""), (0, 0.0))[0]),
+            budget_calculations=int(budgets),
+            average_budget=float(budget_sum / budgets) if budgets else 0.0,
+            average_travelers=float(traveler_sum / travelers) if travelers else 0.0,
+            popular_cities=ranked(CITY)[:top_cities],
+            popular_travel_styles=ranked(STYLE),
+        )
+
+
+class AnalyticsRollup:
+    # Hourly and daily pre-aggregates of the raw analytics tables. The Node server writes analytics
+    # rows as well, so buckets are built by a periodic compaction job over the raw tables rather than
+    # at insert time; queries read raw rows only for the edges the rollups do not cover.
+    raw_models = (PageView, UserEvent, BudgetCalculation)
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        interval: Optional[float] = None,
+        lag_hours: Optional[int] = None,
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
+        self._session_factory = session_factory
+        self.interval = interval or float(os.environ.get("ANALYTICS_ROLLUP_INTERVAL", DEFAULT_INTERVAL))
+        if lag_hours is None:
+            lag_hours = int(os.environ.get("ANALYTICS_ROLLUP_LAG_HOURS", DEFAULT_LAG_HOURS))
+        self.lag = lag_hours * HOUR
+        self._clock = clock
+
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.hours_compacted = 0
+        self.days_compacted = 0
+        self.late_hours = 0
+        self.failed_runs = 0
+        self.last_run: Optional[datetime] = None
+
+    @property
+    def session_factory(self) -> Optional[Callable[[], Session]]:
+        return self._session_factory or database.SessionLocal
+
+    def _hour(self, db: Session, column):
+        if db.get_bind().dialect.name == "postgresql":
+            # Inlined rather than bound, so the select and GROUP BY expressions are identical.
+            return func.date_trunc(literal_column("'hour'"), column)
+        return func.strftime("%Y-%m-%d %H:00:00", column)
+
+    def _budget_queries(self, db: Session, start: datetime, end: datetime):
+        hour = self._hour(db, BudgetCalculation.created_at)
+        window = (BudgetCalculation.created_at >= start, BudgetCalculation.created_at < end)
+        by_style = select(
+            hour, BudgetCalculation.travel_style, func.count(BudgetCalculation.id),
+            func.sum(BudgetCalculation.total_budget_sgd), func.sum(BudgetCalculation.travelers),
+        ).where(*window).group_by(hour, BudgetCalculation.travel_style)
+        city = func.unnest(BudgetCalculation.cities).column_valued("city")
+        by_city = select(hour, city, func.count()).where(*window).group_by(hour, city)
+        return by_style, by_city
+
+    def _budget_totals(self, db: Session, start: datetime, end: datetime) -> Dict[datetime, Totals]:
+        hours: Dict[datetime, Totals] = defaultdict(empty_totals)
+        by_style, by_city = self._budget_queries(db, start, end)
+        for bucket, style, count, total_budget, travelers in db.execute(by_style):
+            totals = hours[_bucket_start(bucket)]
+            merge_totals(totals, {
+                (BUDGETS, ""): [count, total_budget or Decimal(0)],
+                (TRAVELERS, ""): [count, Decimal(travelers or 0)],
+                (STYLE, style): [count, Decimal(0)],
+            })
+        for bucket, city, count in db.execute(by_city):
+            hours[_bucket_start(bucket)][(CITY, city)][0] += count
+        return hours
+
+    def hourly_totals(self, db: Session, start: datetime, end: datetime) -> Dict[datetime, Totals]:
+        hours: Dict[datetime, Totals] = defaultdict(empty_totals)
+        if start >= end:
+            return hours
+        for metric, model in ((PAGE_VIEWS, PageView), (USER_EVENTS, UserEvent)):
+            hour = self._hour(db, model.created_at)
+            rows = db.query(hour, func.count(model.id)).filter(
+                model.created_at >= start, model.created_at < end
+            ).group_by(hour)
+            for bucket, count in rows:
+                hours[_bucket_start(bucket)][(metric, "")][0] += count
+        for bucket, totals in self._budget_totals(db, start, end).items():
+            merge_totals(hours[bucket], totals)
+        return hours
+
+    def raw_totals(self, db: Session, start: datetime, end: datetime) -> Totals:
+        totals = empty_totals()
+        for hour_totals in self.hourly_totals(db, start, end).values():
+            merge_totals(totals, hour_totals)
+        return totals
+
+    def _rollup_totals(self, db: Session, model, start: datetime, end: datetime) -> Totals:
+        totals = empty_totals()
+        if start >= end:
+            return totals
+        rows = db.query(
+            model.metric, model.dimension, func.sum(model.count), func.sum(model.value_sum)
+        ).filter(model.bucket_start >= start, model.bucket_start < end).group_by(model.metric, model.dimension)
+        for metric, dimension, count, value_sum in rows:
+            totals[(metric, dimension)][0] += count or 0
+            totals[(metric, dimension)][1] += value_sum or Decimal(0)
+        return totals
+
+    def _watermark(self, db: Session, model, width: timedelta) -> Optional[datetime]:
+        newest = db.query(func.max(model.bucket_start)).filter(model.metric == PAGE_VIEWS).scalar()
+        return newest + width if newest is not None else None
+
+    def _earliest_raw(self, db: Session) -> Optional[datetime]:
+        starts = [db.query(func.min(model.created_at)).scalar() for model in self.raw_models]
+        starts = [as_utc(s) for s in starts if s is not None]
+        return min(starts) if starts else None
+
+    def totals(self, db: Session, start: datetime, end: Optional[datetime] = None) -> Totals:
+        end = end or self._clock()
+        hourly_end = self._watermark(db, AnalyticsHourlyRollup, HOUR)
+        daily_end = self._watermark(db, AnalyticsDailyRollup, DAY)
+
+        # Raw rows up to the first hour boundary, then whole days where the daily rollup has
+        # them, whole hours around those, and raw rows again past the last compacted hour.
+        cursor = min(ceil_hour(start), end)
+        totals = self.raw_totals(db, start, cursor)
+        if hourly_end is not None and cursor < min(hourly_end, end):
+            covered = min(hourly_end, floor_hour(end))
+            days_from = ceil_day(cursor)
+            days_to = min(floor_day(covered), daily_end) if daily_end is not None else days_from
+            if days_from < days_to:
+                merge_totals(totals, self._rollup_totals(db, AnalyticsHourlyRollup, cursor, days_from))
+                merge_totals(totals, self._rollup_totals(db, AnalyticsDailyRollup, days_from, days_to))
+                cursor = days_to
+            merge_totals(totals, self._rollup_totals(db, AnalyticsHourlyRollup, cursor, covered))
+            cursor = max(cursor, covered)
+        return merge_totals(totals, self.raw_totals(db, cursor, end))
+
+    def dashboard(self, db: Session, start: datetime, end: Optional[datetime] = None) -> DashboardTotals:
+        return DashboardTotals.from_totals(self.totals(db, start, end))
+
+    def _write_buckets(self, db: Session, model, buckets: Dict[datetime, Totals], start: datetime, end: datetime) -> None:
+        # Delete and reinsert makes recomputing a bucket idempotent.
+        db.execute(delete(model).where(model.bucket_start >= start, model.bucket_start < end))
+        rows = [
+            {"bucket_start": bucket, "metric": metric, "dimension": dimension, "count": count, "value_sum": value_sum}
+            for bucket, totals in buckets.items()
+            for (metric, dimension), (count, value_sum) in totals.items()
+        ]
+        if rows:
+            db.execute(insert(model), rows)
+
+    def _lock(self, db: Session) -> bool:
+        if db.get_bind().dialect.name != "postgresql":
+            return True
+        return bool(db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY}).scalar())
+
+    def _late_hours(self, db: Session, before: datetime) -> List[datetime]:
+        # Hours before `before` that received rows since the previous run, found through the id
+        # watermark, which is advanced in the same transaction. A flush still in flight carries
+        # recent timestamps, so the lag window covers it if its ids end up below the watermark.
+        hours = set()
+        for model in self.raw_models:
+            state = db.get(AnalyticsRollupState, model.__tablename__)
+            if state is None:
+                # First run: everything is compacted from the earliest raw row anyway.
+                newest = db.query(func.max(model.id)).scalar() or 0
+                db.add(AnalyticsRollupState(source=model.__tablename__, last_id=newest))
+                continue
+            hour = self._hour(db, model.created_at)
+            rows = db.query(hour, func.max(model.id)).filter(model.id > state.last_id).group_by(hour).all()
+            for bucket, newest in rows:
+                state.last_id = max(state.last_id, newest)
+                bucket = _bucket_start(bucket)
+                if bucket < before:
+                    hours.add(bucket)
+        return sorted(hours)
+
+    def _compact_hours(self, db: Session, start: datetime, end: datetime) -> int:
+        # Every hour gets a bucket, empty ones included, so the newest bucket marks progress.
+        raw = self.hourly_totals(db, start, end)
+        hours: Dict[datetime, Totals] = {}
+        hour = start
+        while hour < end:
+            hours[hour] = raw.get(hour) or empty_totals()
+            hour += HOUR
+        self._write_buckets(db, AnalyticsHourlyRollup, hours, start, end)
+        return len(hours)
+
+    def _compact_days(self, db: Session, days: Iterable[datetime]) -> int:
+        count = 0
+        for day in sorted(days):
+            totals = self._rollup_totals(db, AnalyticsHourlyRollup, day, day + DAY)
+            self._write_buckets(db, AnalyticsDailyRollup, {day: totals}, day, day + DAY)
+            count += 1
+        return count
+
+    def compact(self) -> bool:
+        # Recomputes closed buckets up to the current hour; returns True once caught up.
+        db = self.session_factory()
+        try:
+            if not self._lock(db):
+                return True
+            current_hour = floor_hour(self._clock())
+            hourly_end = self._watermark(db, AnalyticsHourlyRollup, HOUR)
+            if hourly_end is None:
+                earliest = self._earliest_raw(db)
+                if earliest is None:
+                    return True
+                start = floor_hour(earliest)
+            else:
+                start = min(hourly_end - self.lag, current_hour)
+            end = min(current_hour, start + MAX_HOURS_PER_RUN * HOUR)
+
+            late = self._late_hours(db, start)
+            for late_start, late_end in hour_ranges(late):
+                self._compact_hours(db, late_start, late_end)
+            hours = self._compact_hours(db, start, end)
+
+            # A day is rolled up once every hour in it is compacted; days touched by this run are redone.
+            days = {floor_day(hour) for hour in late}
+            day = floor_day(start)
+            while day < end:
+                days.add(day)
+                day += DAY
+            days_compacted = self._compact_days(db, [d for d in days if d + DAY <= end])
+            db.commit()
+
+            self.hours_compacted += hours
+            self.late_hours += len(late)
+            self.days_compacted += days_compacted
+            return end >= current_hour
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def run_once(self) -> None:
+        if self.session_factory is None:
+            return
+        self.runs += 1
+        try:
+            while not await asyncio.to_thread(self.compact):
+                pass
+        except Exception as e:
+            print(f"Analytics rollup error, will retry: {e}")
+            self.failed_runs += 1
+        self.last_run = self._clock()
+
+    async def _run(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "lag_hours": self.lag // HOUR,
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "hours_compacted": self.hours_compacted,
+            "days_compacted": self.days_compacted,
+            "late_hours_recomputed": self.late_hours,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "persistent": self.session_factory is not None,
+        }
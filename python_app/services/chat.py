@@ -1,6 +1,15 @@
+import asyncio
 import httpx
+import json
 import os
-from typing import List, Dict, Optional
+import time
+from typing import AsyncIterator, List, Dict, Optional, Sequence
+
+from .http_client import HttpClientPool, http_clients
+from .chat_cache import ChatResponseCache, cache_key
+from .history_compactor import HistoryCompactor
+from .chat_scheduler import ChatBusyError, ChatScheduler
+from .model_latency import ModelLatencyStats
 
 
 JAPAN_TRAVEL_SYSTEM_PROMPT = """You are a friendly and knowledgeable Japan travel assistant specifically designed to help Singaporean travelers plan their trips to Japan. 
@@ -28,57 +37,237 @@ IMPORTANT RULES:
 
 class ChatService:
     OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+    MODEL = "anthropic/claude-sonnet-4"
+    MAX_TOKENS = 1024
+    FALLBACK_REPLY = "Sorry, I couldn't process your request."
+    DEFAULT_HEDGE_DELAY = 3.0
+    MIN_HEDGE_DELAY = 0.25
 
-    def __init__(self):
+    def __init__(
+        self,
+        http: Optional[HttpClientPool] = None,
+        cache: Optional[ChatResponseCache] = None,
+        compactor: Optional[HistoryCompactor] = None,
+        scheduler: Optional[ChatScheduler] = None,
+        models: Optional[Sequence[str]] = None,
+        hedge_delay: Optional[float] = None,
+        latency: Optional[ModelLatencyStats] = None
+    ):
         self.api_key = os.environ.get("OPENROUTER_API_KEY")
+        self.http = http or http_clients
+        self.cache = cache or ChatResponseCache.from_env()
+        self.compactor = compactor or HistoryCompactor()
+        self.scheduler = scheduler or ChatScheduler()
+        if models is None:
+            fallbacks = os.environ.get("CHAT_FALLBACK_MODELS", "")
+            models = [self.MODEL] + [m.strip() for m in fallbacks.split(",") if m.strip()]
+        self.models = list(models)
+        if hedge_delay is None:
+            hedge_delay = float(os.environ.get("CHAT_HEDGE_DELAY", self.DEFAULT_HEDGE_DELAY))
+        self.hedge_delay = hedge_delay
+        self.latency = latency or ModelLatencyStats()
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.fallbacks = 0
+
+    def _build_messages(self, message: str, history: Optional[List[Dict]]) -> List[Dict]:
+        messages = [
+            {"role": "system", "content": JAPAN_TRAVEL_SYSTEM_PROMPT}
+        ]
+        
+        if history:
+            history = [
+                {"role": msg.get("role", "user"), "content": msg.get("content", "")}
+                for msg in history
+            ]
+            messages.extend(self.compactor.compact(JAPAN_TRAVEL_SYSTEM_PROMPT, history, message))
+        
+        messages.append({"role": "user", "content": message})
+        return messages
+
+    def _headers(self, referer: str) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": referer,
+            "X-Title": "Japan Travel Budget Calculator"
+        }
+
+    def hedge_delay_for(self, model: str) -> Optional[float]:
+        if self.hedge_delay <= 0:
+            return None
+        # Hedge once the primary is slower than 95% of its recent calls; the configured delay caps the wait.
+        p95 = self.latency.percentile(model, 95)
+        if p95 is None:
+            return self.hedge_delay
+        return min(self.hedge_delay, max(p95, self.MIN_HEDGE_DELAY))
+
+    async def _complete(self, model: str, messages: List[Dict], referer: str) -> Optional[str]:
+        started = time.monotonic()
+        try:
+            response = await self.http.client("chat").post(
+                self.OPENROUTER_API_URL,
+                headers=self._headers(referer),
+                json={
+                    "model": model,
+                    "messages": messages,
+                    "max_tokens": self.MAX_TOKENS
+                }
+            )
+            response.raise_for_status()
+            data = response.json()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.latency.record_failure(model)
+            raise
+        self.latency.record(model, time.monotonic() - started)
+        return data.get("choices", [{}])[0].get("message", {}).get("content")
+
+    async def _hedged_complete(self, messages: List[Dict], referer: str) -> Optional[str]:
+        models = self.latency.ranked(self.models)
+        primary = models[0]
+        backup = models[1] if len(models) > 1 else primary
+
+        started = time.monotonic()
+        first = asyncio.create_task(self._complete(primary, messages, referer))
+        try:
+            done, _ = await asyncio.wait((first,), timeout=self.hedge_delay_for(primary))
+            if done:
+                if first.exception() is None or backup == primary:
+                    return first.result()
+                self.fallbacks += 1
+                return await self._complete(backup, messages, referer)
+
+            # Hedges only use spare capacity; under load they would just add to the queue.
+            if not self.scheduler.try_acquire():
+                return await first
+            self.hedged += 1
+            second = asyncio.create_task(self._complete(backup, messages, referer))
+            try:
+                pending = {first, second}
+                error = None
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            if task is second:
+                                self.hedge_wins += 1
+                                if not first.done():
+                                    self.latency.record_lower_bound(primary, time.monotonic() - started)
+                            return task.result()
+                        error = task.exception()
+                raise error
+            finally:
+                second.cancel()
+                self.scheduler.release()
+        finally:
+            first.cancel()
 
     async def send_message(
         self,
         message: str,
         history: Optional[List[Dict]] = None,
-        referer: str = "https://japan-travel-budget.replit.app"
+        referer: str = "https://japan-travel-budget.replit.app",
+        use_cache: bool = True
     ) -> str:
         if not self.api_key:
             raise ValueError("Chat service not configured - missing API key")
 
-        messages = [
-            {"role": "system", "content": JAPAN_TRAVEL_SYSTEM_PROMPT}
-        ]
-        
-        if history:
-            for msg in history:
-                messages.append({
-                    "role": msg.get("role", "user"),
-                    "content": msg.get("content", "")
-                })
-        
-        messages.append({"role": "user", "content": message})
+        key = cache_key(message, history) if use_cache else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    self.OPENROUTER_API_URL,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": referer,
-                        "X-Title": "Japan Travel Budget Calculator"
-                    },
-                    json={
-                        "model": "anthropic/claude-sonnet-4",
-                        "messages": messages,
-                        "max_tokens": 1024
-                    }
-                )
+            async with self.scheduler.slot():
+                content = await self._hedged_complete(self._build_messages(message, history), referer)
+            if not content:
+                return self.FALLBACK_REPLY
+            if key is not None:
+                self.cache.put(key, content)
+            return content
+        except ChatBusyError:
+            raise
+        except httpx.TimeoutException:
+            raise ValueError("Chat request timed out")
+        except httpx.HTTPStatusError as e:
+            raise ValueError(f"Chat service error: {e.response.status_code}")
+        except Exception as e:
+            raise ValueError(f"Chat error: {str(e)}")
+
+    async def stream_message(
+        self,
+        message: str,
+        history: Optional[List[Dict]] = None,
+        referer: str = "https://japan-travel-budget.replit.app",
+        use_cache: bool = True
+    ) -> AsyncIterator[str]:
+        if not self.api_key:
+            raise ValueError("Chat service not configured - missing API key")
+
+        key = cache_key(message, history) if use_cache else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts = []
+        finished = False
+        try:
+            # The slot is held for the whole stream, since that is how long the upstream connection stays open.
+            async with self.scheduler.slot(), self.http.client("chat").stream(
+                "POST",
+                self.OPENROUTER_API_URL,
+                headers=self._headers(referer),
+                json={
+                    # Streams are routed to the fastest model but not hedged; tokens may already be on the wire.
+                    "model": self.latency.ranked(self.models)[0],
+                    "messages": self._build_messages(message, history),
+                    "max_tokens": self.MAX_TOKENS,
+                    "stream": True
+                }
+            ) as response:
                 response.raise_for_status()
-                data = response.json()
-                
-                return data.get("choices", [{}])[0].get("message", {}).get(
-                    "content", "Sorry, I couldn't process your request."
-                )
+                # Upstream speaks SSE too: one JSON chunk per "data:" line, ending with [DONE].
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    payload = line[5:].strip()
+                    if payload == "[DONE]":
+                        finished = True
+                        break
+                    chunk = json.loads(payload)
+                    if chunk.get("error"):
+                        raise ValueError(f"Chat service error: {chunk['error'].get('message', 'stream failed')}")
+                    content = chunk.get("choices", [{}])[0].get("delta", {}).get("content")
+                    if content:
+                        parts.append(content)
+                        yield content
         except httpx.TimeoutException:
             raise ValueError("Chat request timed out")
         except httpx.HTTPStatusError as e:
             raise ValueError(f"Chat service error: {e.response.status_code}")
+        except json.JSONDecodeError:
+            raise ValueError("Chat error: malformed stream chunk")
+        except (ValueError, ChatBusyError):
+            raise
         except Exception as e:
             raise ValueError(f"Chat error: {str(e)}")
+
+        # Only a stream that ran to completion is cached.
+        if key is not None and finished and parts:
+            self.cache.put(key, "".join(parts))
+
+    def get_upstream_stats(self) -> dict:
+        return {
+            "models": self.models,
+            "routing": self.latency.ranked(self.models),
+            "hedge_delay_seconds": self.hedge_delay,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "fallbacks": self.fallbacks,
+            "latency": self.latency.get_stats(),
+        }
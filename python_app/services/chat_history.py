@@ -0,0 +1,203 @@
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..db import database
+from ..db.models import ChatMessage, ChatSession
+
+
+DEFAULT_MAX_SESSIONS = 1000
+DEFAULT_MAX_MESSAGES = 50
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_FLUSH_BATCH = 200
+MAX_PENDING_WRITES = 10000
+
+
+class ChatHistoryStore:
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        max_sessions: Optional[int] = None,
+        max_messages: int = DEFAULT_MAX_MESSAGES,
+        flush_interval: Optional[float] = None,
+        flush_batch: int = DEFAULT_FLUSH_BATCH
+    ):
+        self._session_factory = session_factory
+        self.max_sessions = max_sessions or int(os.environ.get("CHAT_HISTORY_MAX_SESSIONS", DEFAULT_MAX_SESSIONS))
+        self.max_messages = max_messages
+        self.flush_interval = flush_interval or float(os.environ.get("CHAT_HISTORY_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL))
+        self.flush_batch = flush_batch
+
+        self._sessions: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._pending: List[Tuple[str, str, str]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.flushed = 0
+        self.dropped = 0
+
+    @property
+    def session_factory(self) -> Optional[Callable[[], Session]]:
+        # Resolved lazily so the store follows DATABASE_URL as configured at startup.
+        return self._session_factory or database.SessionLocal
+
+    async def load(self, session_id: str) -> List[Dict]:
+        with self._lock:
+            messages = self._sessions.get(session_id)
+            if messages is not None:
+                self._sessions.move_to_end(session_id)
+                self.hits += 1
+                return list(messages)
+            self.misses += 1
+
+        # Held across the read and the merge: a flush that has taken rows from _pending but not yet
+        # committed them would otherwise leave them in neither the database nor the queue.
+        async with self._flush_lock:
+            messages = []
+            if self.session_factory is not None:
+                try:
+                    messages = await asyncio.to_thread(self._read, session_id)
+                except Exception as e:
+                    print(f"Chat history load error: {e}")
+
+            with self._lock:
+                # Writes still queued for this session are newer than anything in the database.
+                messages += [{"role": role, "content": content} for sid, role, content in self._pending if sid == session_id]
+                cached = self._sessions.get(session_id)
+                if cached is None:
+                    cached = messages[-self.max_messages:]
+                    self._remember(session_id, cached)
+                return list(cached)
+
+    def _read(self, session_id: str) -> List[Dict]:
+        db = self.session_factory()
+        try:
+            rows = (
+                db.query(ChatMessage.role, ChatMessage.content)
+                .join(ChatSession, ChatMessage.session_id == ChatSession.id)
+                .filter(ChatSession.session_id == session_id)
+                .order_by(ChatMessage.id.desc())
+                .limit(self.max_messages)
+                .all()
+            )
+        finally:
+            db.close()
+        return [{"role": role, "content": content} for role, content in reversed(rows)]
+
+    def _remember(self, session_id: str, messages: List[Dict]) -> None:
+        self._sessions[session_id] = messages
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def append(self, session_id: str, role: str, content: str) -> None:
+        with self._lock:
+            messages = self._sessions.get(session_id)
+            if messages is None:
+                messages = []
+                self._remember(session_id, messages)
+            messages.append({"role": role, "content": content})
+            del messages[:-self.max_messages]
+
+            if self.session_factory is None:
+                return
+            self._pending.append((session_id, role, content))
+            if len(self._pending) > MAX_PENDING_WRITES:
+                # The database has been unavailable for a while; shed the oldest writes, not memory.
+                overflow = len(self._pending) - MAX_PENDING_WRITES
+                del self._pending[:overflow]
+                self.dropped += overflow
+            should_wake = len(self._pending) >= self.flush_batch
+
+        if should_wake and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch or self.session_factory is None:
+                return 0
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as e:
+                print(f"Chat history flush error, will retry: {e}")
+                with self._lock:
+                    self._pending[:0] = batch
+                return 0
+            self.flushed += len(batch)
+            return len(batch)
+
+    def _write(self, batch: List[Tuple[str, str, str]]) -> None:
+        for attempt in range(2):
+            db = self.session_factory()
+            try:
+                session_ids = {sid for sid, _, _ in batch}
+                ids = dict(
+                    db.query(ChatSession.session_id, ChatSession.id)
+                    .filter(ChatSession.session_id.in_(session_ids))
+                    .all()
+                )
+                created = [ChatSession(session_id=sid) for sid in session_ids if sid not in ids]
+                if created:
+                    db.add_all(created)
+                    db.flush()
+                    ids.update({s.session_id: s.id for s in created})
+                db.bulk_insert_mappings(ChatMessage, [
+                    {"session_id": ids[sid], "role": role, "content": content}
+                    for sid, role, content in batch
+                ])
+                db.commit()
+                return
+            except IntegrityError:
+                # Another worker created one of the sessions first; the retry will find it.
+                db.rollback()
+                if attempt:
+                    raise
+            finally:
+                db.close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        await self.flush()
+
+    def get_stats(self) -> dict:
+        return {
+            "hot_sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "hits": self.hits,
+            "misses": self.misses,
+            "pending_writes": len(self._pending),
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "persistent": self.session_factory is not None,
+        }
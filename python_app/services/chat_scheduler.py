@@ -0,0 +1,145 @@
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Optional
+
+
+DEFAULT_MAX_CONCURRENT = 16
+DEFAULT_QUEUE_TIMEOUT = 10.0
+# Weight of the newest sample in the moving average of upstream call durations.
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+class ChatBusyError(Exception):
+    pass
+
+
+class ChatScheduler:
+    def __init__(
+        self,
+        max_concurrent: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_concurrent = max_concurrent or int(os.environ.get("CHAT_MAX_CONCURRENT", DEFAULT_MAX_CONCURRENT))
+        if max_queue is None:
+            max_queue = int(os.environ.get("CHAT_MAX_QUEUE", self.max_concurrent * 4))
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout or float(os.environ.get("CHAT_QUEUE_TIMEOUT", DEFAULT_QUEUE_TIMEOUT))
+        self._clock = clock
+
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service_time: Optional[float] = None
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def expected_wait(self, position: int) -> float:
+        # Slots free up at roughly max_concurrent per average call; position 0 waits for the first one.
+        if self._service_time is None:
+            return 0.0
+        return (position + 1) * self._service_time / self.max_concurrent
+
+    def _admit(self, waited: float) -> None:
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        timeout = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+        if self.try_acquire():
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise ChatBusyError("Chat service is busy, please retry shortly")
+        if self.expected_wait(len(self._waiters)) > timeout:
+            # Queueing would only burn the caller's deadline before failing anyway.
+            self.rejected += 1
+            raise ChatBusyError("Chat service is busy, please retry shortly")
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        started = self._clock()
+        try:
+            await asyncio.wait((future,), timeout=timeout)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the caller went away; pass it on.
+                self.release()
+            else:
+                self._discard(future)
+            raise
+
+        if not future.done():
+            self._discard(future)
+            self.timed_out += 1
+            raise ChatBusyError("Chat request timed out waiting for capacity")
+        self._admit(self._clock() - started)
+
+    def try_acquire(self) -> bool:
+        if self._in_flight < self.max_concurrent and not self._waiters:
+            self._in_flight += 1
+            self._admit(0.0)
+            return True
+        return False
+
+    def _discard(self, future: asyncio.Future) -> None:
+        future.cancel()
+        try:
+            self._waiters.remove(future)
+        except ValueError:
+            pass
+
+    def release(self, service_time: Optional[float] = None) -> None:
+        if service_time is not None:
+            if self._service_time is None:
+                self._service_time = service_time
+            else:
+                self._service_time += SERVICE_TIME_SMOOTHING * (service_time - self._service_time)
+
+        # Hand the slot straight to the oldest waiter so in_flight never dips below the cap under load.
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self._in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        await self.acquire(timeout)
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.release(self._clock() - started)
+
+    def get_stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queue_timeout_seconds": self.queue_timeout,
+            "in_flight": self._in_flight,
+            "queue_depth": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": round(self.total_wait / self.admitted * 1000, 2) if self.admitted else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "avg_service_ms": round(self._service_time * 1000, 2) if self._service_time is not None else None,
+        }
@@ -1,55 +1,193 @@
-import httpx
-from datetime import datetime, timedelta
-from typing import Optional
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
 import os
 
+from ..domain.currency import BASE_CURRENCY, DEFAULT_CURRENCIES, FALLBACK_RATES, RateMatrix
+from ..domain.rate_history import RateHistory, get_rate_history
+from .http_client import HttpClientPool, http_clients
+from .rate_cache import SharedRateCache, default_rate_cache
+
+
+def _to_timestamp(moment: datetime) -> float:
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _from_timestamp(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
 
 class ExchangeRateService:
-    EXCHANGE_RATE_API = "https://api.exchangerate-api.com/v4/latest/SGD"
+    EXCHANGE_RATE_API = f"https://api.exchangerate-api.com/v4/latest/{BASE_CURRENCY}"
     CACHE_DURATION = timedelta(hours=1)
+    RETRY_INTERVAL = timedelta(minutes=1)
     DEFAULT_RATE = 0.0089
+    FETCHER_WAIT_TIMEOUT = 15.0
+
+    def __init__(
+        self,
+        currencies: Optional[List[str]] = None,
+        http: Optional[HttpClientPool] = None,
+        shared_cache: Optional[SharedRateCache] = None,
+        history: Optional[RateHistory] = None
+    ):
+        self.http = http or http_clients
+        self.shared_cache = shared_cache or default_rate_cache()
+        self._history = history
+        if currencies is None:
+            configured = os.environ.get("HOME_CURRENCIES")
+            currencies = configured.split(",") if configured else DEFAULT_CURRENCIES
+        currencies = [c.strip().upper() for c in currencies if c.strip()]
+        for required in (BASE_CURRENCY, "JPY"):
+            if required not in currencies:
+                currencies.append(required)
+        self.currencies = currencies
 
-    def __init__(self):
         self._cached_rate: Optional[float] = None
         self._cached_time: Optional[datetime] = None
         self._last_updated: Optional[str] = None
+        self._rate_matrix: Optional[RateMatrix] = None
+        self._fallback_matrix = RateMatrix.from_base_rates(FALLBACK_RATES, self.currencies)
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._retry_at: Optional[datetime] = None
+        # Warm start from the rates another worker (or a previous run) persisted.
+        self._adopt_shared()
 
-    async def get_exchange_rate(self) -> dict:
-        now = datetime.utcnow()
-        
-        if (
+    @property
+    def history(self) -> RateHistory:
+        if self._history is None:
+            self._history = get_rate_history()
+        return self._history
+
+    def _is_fresh(self, now: datetime) -> bool:
+        return (
             self._cached_rate is not None
             and self._cached_time is not None
             and now - self._cached_time < self.CACHE_DURATION
-        ):
-            return {
-                "rate": self._cached_rate,
-                "lastUpdated": self._last_updated
-            }
+        )
+
+    def _apply_rates(self, base_rates: Dict[str, float], fetched_at: datetime) -> None:
+        self._cached_rate = 1 / base_rates["JPY"]
+        self._cached_time = fetched_at
+        self._last_updated = fetched_at.isoformat()
+        self._rate_matrix = RateMatrix.from_base_rates(base_rates, self.currencies, self._last_updated)
+        self._retry_at = None
+
+    def _adopt_shared(self) -> bool:
+        # Every worker converges on the newest snapshot any worker has written.
+        snapshot = self.shared_cache.read()
+        if snapshot is None or not snapshot.rates.get("JPY"):
+            return False
+        fetched_at = _from_timestamp(snapshot.fetched_at)
+        if self._cached_time is None or fetched_at > self._cached_time:
+            self._apply_rates({**snapshot.rates, BASE_CURRENCY: 1.0}, fetched_at)
+        return True
+
+    async def _refresh(self) -> bool:
+        if self._adopt_shared() and self._is_fresh(datetime.utcnow()):
+            return True
+
+        try:
+            lock = self.shared_cache.try_acquire()
+        except OSError as e:
+            print(f"Shared rate cache lock error: {e}")
+            return await self._fetch()
+
+        if lock is None:
+            # Another worker is the elected fetcher; wait for its snapshot instead of fetching too.
+            await asyncio.to_thread(self.shared_cache.wait_for_fetcher, self.FETCHER_WAIT_TIMEOUT)
+            if self._adopt_shared() and self._is_fresh(datetime.utcnow()):
+                return True
+            self._retry_at = datetime.utcnow() + self.RETRY_INTERVAL
+            return False
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(self.EXCHANGE_RATE_API)
-                response.raise_for_status()
-                data = response.json()
-                
-                jpy_rate = data.get("rates", {}).get("JPY")
-                if jpy_rate:
-                    self._cached_rate = 1 / jpy_rate
-                    self._cached_time = now
-                    self._last_updated = now.isoformat()
-                    
-                    return {
-                        "rate": self._cached_rate,
-                        "lastUpdated": self._last_updated
-                    }
+            # The previous fetcher may have finished between our read and taking the lock.
+            if self._adopt_shared() and self._is_fresh(datetime.utcnow()):
+                return True
+            return await self._fetch()
+        finally:
+            self.shared_cache.release(lock)
+
+    async def _fetch(self) -> bool:
+        # One upstream fetch fills both the JPY rate and the whole currency matrix.
+        now = datetime.utcnow()
+        try:
+            response = await self.http.client("exchange_rate").get(self.EXCHANGE_RATE_API)
+            response.raise_for_status()
+            data = response.json()
+            
+            rates = data.get("rates", {})
+            if rates.get("JPY"):
+                base_rates = {**rates, BASE_CURRENCY: 1.0}
+                self._apply_rates(base_rates, now)
+                try:
+                    self.shared_cache.write(base_rates, _to_timestamp(now))
+                    # Only the elected fetcher gets here, so the history has a single writer.
+                    self.history.append(_to_timestamp(now), base_rates)
+                except (OSError, ValueError) as e:
+                    print(f"Exchange rate persist error: {e}")
+                return True
+            print("Exchange rate fetch error: response has no JPY rate")
         except Exception as e:
             print(f"Exchange rate fetch error: {e}")
+        # Keep serving the last good rate and back off instead of refetching on every request.
+        self._retry_at = now + self.RETRY_INTERVAL
+        return False
+
+    def _start_refresh(self) -> asyncio.Task:
+        # Single flight: concurrent callers share the refresh already in progress. A task left
+        # behind by another event loop (e.g. a finished test client portal) is not reused.
+        task = self._refresh_task
+        loop = asyncio.get_running_loop()
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(self._refresh())
+            self._refresh_task = task
+        return task
+
+    async def _ensure_rate(self) -> bool:
+        self._adopt_shared()
+        now = datetime.utcnow()
+        if self._is_fresh(now):
+            return True
+        if self._retry_at is not None and now < self._retry_at:
+            return self._cached_rate is not None
+
+        task = self._start_refresh()
+        if self._cached_rate is not None:
+            # Stale-while-revalidate: answer with the stale rate while the refresh runs.
+            return True
+        await asyncio.shield(task)
+        return self._cached_rate is not None
+
+    async def get_exchange_rate(self) -> dict:
+        if await self._ensure_rate():
+            return {
+                "rate": self._cached_rate,
+                "lastUpdated": self._last_updated,
+                "stale": not self._is_fresh(datetime.utcnow())
+            }
         
         return {
             "rate": self.DEFAULT_RATE,
-            "lastUpdated": None
+            "lastUpdated": None,
+            "stale": True
         }
 
+    async def get_rate_matrix(self) -> RateMatrix:
+        await self._ensure_rate()
+        return self.get_cached_matrix()
+
     def get_cached_rate(self) -> float:
         return self._cached_rate if self._cached_rate else self.DEFAULT_RATE
+
+    def get_cached_matrix(self) -> RateMatrix:
+        return self._rate_matrix or self._fallback_matrix
+
+    def matrix_as_of(self, day) -> RateMatrix:
+        # Currencies with nothing recorded by that day are left out rather than priced at today's rate.
+        base_rates = {BASE_CURRENCY: 1.0}
+        for currency in self.currencies:
+            if currency != BASE_CURRENCY and currency in self.history.currency_ids:
+                base_rates[currency] = self.history.rate_as_of(currency, day)
+        return RateMatrix.from_base_rates(base_rates, self.currencies, day.isoformat())
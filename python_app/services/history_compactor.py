@@ -0,0 +1,114 @@
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+DEFAULT_TOKEN_BUDGET = 3000
+DEFAULT_SUMMARY_TOKENS = 400
+SUMMARY_CACHE_SIZE = 2048
+# Chat formats wrap every message in a few tokens of role and separator markup.
+MESSAGE_OVERHEAD_TOKENS = 4
+CHARS_PER_TOKEN = 4
+SUMMARY_LINE_CHARS = 160
+SUMMARY_HEADER = "Summary of earlier conversation:"
+
+_WORD_OR_SYMBOL = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    # Close enough to BPE tokenizers for budgeting: long words cost more than one token, punctuation one each.
+    if not text:
+        return 0
+    return max(len(_WORD_OR_SYMBOL.findall(text)), math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def message_tokens(message: Dict) -> int:
+    return estimate_tokens(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+
+
+def summarize_turn(message: Dict) -> str:
+    text = " ".join(message.get("content", "").split())
+    first_sentence = _SENTENCE_END.split(text, 1)[0]
+    if len(first_sentence) > SUMMARY_LINE_CHARS:
+        first_sentence = first_sentence[:SUMMARY_LINE_CHARS - 3].rstrip() + "..."
+    speaker = "User" if message.get("role") == "user" else "Assistant"
+    return f"- {speaker}: {first_sentence}"
+
+
+class HistoryCompactor:
+    def __init__(self, token_budget: Optional[int] = None, summary_tokens: Optional[int] = None):
+        self.token_budget = token_budget or int(os.environ.get("CHAT_HISTORY_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET))
+        self.summary_tokens = summary_tokens or int(os.environ.get("CHAT_SUMMARY_TOKEN_BUDGET", DEFAULT_SUMMARY_TOKENS))
+        # Rolling summaries keyed by a hash chain over the folded turns, so each request
+        # only summarizes the turns that fell out of the window since the last one.
+        self._summaries: "OrderedDict[bytes, Tuple[str, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _roll(self, lines: Tuple[str, ...], message: Dict) -> Tuple[str, ...]:
+        lines = lines + (summarize_turn(message),)
+        limit = self.summary_tokens - estimate_tokens(SUMMARY_HEADER)
+        total = sum(estimate_tokens(line) for line in lines)
+        start = 0
+        while start < len(lines) - 1 and total > limit:
+            total -= estimate_tokens(lines[start])
+            start += 1
+        return lines[start:]
+
+    def summarize(self, folded: List[Dict]) -> str:
+        if not folded:
+            return ""
+
+        chain = [b""]
+        for message in folded:
+            digest = hashlib.blake2b(chain[-1], digest_size=16)
+            digest.update(message.get("role", "user").encode())
+            digest.update(b"\0")
+            digest.update(message.get("content", "").encode())
+            chain.append(digest.digest())
+
+        with self._lock:
+            start, lines = 0, ()
+            for i in range(len(folded), 0, -1):
+                cached = self._summaries.get(chain[i])
+                if cached is not None:
+                    self._summaries.move_to_end(chain[i])
+                    start, lines = i, cached
+                    break
+
+        for i in range(start, len(folded)):
+            lines = self._roll(lines, folded[i])
+            with self._lock:
+                self._summaries[chain[i + 1]] = lines
+                while len(self._summaries) > SUMMARY_CACHE_SIZE:
+                    self._summaries.popitem(last=False)
+
+        return "\n".join((SUMMARY_HEADER,) + lines)
+
+    def compact(self, system_prompt: str, history: List[Dict], message: str) -> List[Dict]:
+        budget = (
+            self.token_budget
+            - estimate_tokens(system_prompt) - MESSAGE_OVERHEAD_TOKENS
+            - estimate_tokens(message) - MESSAGE_OVERHEAD_TOKENS
+        )
+        history_tokens = [message_tokens(m) for m in history]
+        if sum(history_tokens) <= budget:
+            return list(history)
+
+        # Reserve room for the summary, then keep the newest turns that still fit.
+        remaining = budget - self.summary_tokens - MESSAGE_OVERHEAD_TOKENS
+        keep_from = len(history)
+        while keep_from > 0 and history_tokens[keep_from - 1] <= remaining:
+            remaining -= history_tokens[keep_from - 1]
+            keep_from -= 1
+
+        summary = self.summarize(history[:keep_from])
+        return [{"role": "system", "content": summary}] + history[keep_from:]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._summaries.clear()
@@ -0,0 +1,123 @@
+import importlib.util
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class ServiceLimits:
+    max_connections: int = 10
+    max_keepalive_connections: int = 5
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    timeout: float = 10.0
+    retries: int = 1
+
+
+DEFAULT_SERVICE_LIMITS = {
+    "exchange_rate": ServiceLimits(max_connections=4, max_keepalive_connections=2, timeout=10.0),
+    "chat": ServiceLimits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0, timeout=60.0),
+}
+
+
+class HttpClientPool:
+    def __init__(self, limits: Optional[Dict[str, ServiceLimits]] = None, http2: Optional[bool] = None):
+        self.limits: Dict[str, ServiceLimits] = dict(DEFAULT_SERVICE_LIMITS if limits is None else limits)
+        if http2 is None:
+            http2 = os.environ.get("HTTP2_ENABLED", "true").lower() != "false"
+        # HTTP/2 needs the optional h2 package; without it we stay on keep-alive HTTP/1.1.
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._transports: Dict[str, httpx.AsyncBaseTransport] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def register(
+        self,
+        service: str,
+        limits: Optional[ServiceLimits] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> None:
+        if service in self._clients:
+            raise ValueError(f"HTTP client for {service} is already open")
+        self.limits[service] = limits or self.limits.get(service) or ServiceLimits()
+        if transport is not None:
+            self._transports[service] = transport
+
+    def client(self, service: str) -> httpx.AsyncClient:
+        # Created lazily so the pool also works when the app runs without its lifespan (tests, scripts).
+        client = self._clients.get(service)
+        if client is None or client.is_closed:
+            client = self._create(service)
+            self._clients[service] = client
+        return client
+
+    def _create(self, service: str) -> httpx.AsyncClient:
+        limits = self.limits.setdefault(service, ServiceLimits())
+        transport = self._transports.get(service)
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(
+                http2=self.http2,
+                retries=limits.retries,
+                limits=httpx.Limits(
+                    max_connections=limits.max_connections,
+                    max_keepalive_connections=limits.max_keepalive_connections,
+                    keepalive_expiry=limits.keepalive_expiry,
+                ),
+            )
+            self._transports[service] = transport
+
+        stats = self._stats.setdefault(service, {"requests": 0, "responses": 0, "errors": 0})
+
+        async def on_request(request: httpx.Request) -> None:
+            stats["requests"] += 1
+
+        async def on_response(response: httpx.Response) -> None:
+            stats["responses"] += 1
+            if response.status_code >= 400:
+                stats["errors"] += 1
+
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(limits.timeout, connect=limits.connect_timeout),
+            event_hooks={"request": [on_request], "response": [on_response]},
+        )
+
+    async def start(self) -> None:
+        for service in self.limits:
+            self.client(service)
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+        # Closed transports cannot be reused; the next client() call builds fresh ones.
+        self._transports = {
+            service: transport for service, transport in self._transports.items()
+            if not isinstance(transport, httpx.AsyncHTTPTransport)
+        }
+
+    def get_stats(self) -> dict:
+        services = {}
+        for service, limits in self.limits.items():
+            stats = dict(self._stats.get(service, {"requests": 0, "responses": 0, "errors": 0}))
+            stats["max_connections"] = limits.max_connections
+            stats["max_keepalive_connections"] = limits.max_keepalive_connections
+            stats["timeout"] = limits.timeout
+
+            # httpcore does not publish pool counters; read them from the pool when it is there.
+            pool = getattr(self._transports.get(service), "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            stats["open_connections"] = len(connections)
+            stats["idle_connections"] = sum(1 for c in connections if c.is_idle())
+            stats["active"] = service in self._clients
+            services[service] = stats
+
+        return {"http2": self.http2, "services": services}
+
+
+http_clients = HttpClientPool()
@@ -0,0 +1,88 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+DEFAULT_WINDOW = 200
+MIN_SAMPLES = 20
+# Failures count against a model's success rate rather than as latency samples.
+MIN_SUCCESS_RATE = 0.05
+
+
+class ModelLatencyStats:
+    def __init__(self, window: int = DEFAULT_WINDOW, min_samples: int = MIN_SAMPLES):
+        self.window = window
+        self.min_samples = min_samples
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._outcomes: Dict[str, Deque[bool]] = {}
+        self._lock = threading.Lock()
+
+    def _series(self, model: str):
+        if model not in self._latencies:
+            self._latencies[model] = deque(maxlen=self.window)
+            self._outcomes[model] = deque(maxlen=self.window)
+        return self._latencies[model], self._outcomes[model]
+
+    def record(self, model: str, seconds: float) -> None:
+        with self._lock:
+            latencies, outcomes = self._series(model)
+            latencies.append(seconds)
+            outcomes.append(True)
+
+    def record_lower_bound(self, model: str, seconds: float) -> None:
+        # A call abandoned after `seconds` took at least that long. Dropping it would leave only the
+        # calls that beat the hedge in the window and bias p95, and with it the hedge delay, low.
+        with self._lock:
+            latencies, _ = self._series(model)
+            latencies.append(seconds)
+
+    def record_failure(self, model: str) -> None:
+        with self._lock:
+            _, outcomes = self._series(model)
+            outcomes.append(False)
+
+    def percentile(self, model: str, q: float) -> Optional[float]:
+        with self._lock:
+            latencies = list(self._latencies.get(model, ()))
+        if len(latencies) < self.min_samples:
+            return None
+        return float(np.percentile(latencies, q))
+
+    def success_rate(self, model: str) -> Optional[float]:
+        with self._lock:
+            outcomes = list(self._outcomes.get(model, ()))
+        if not outcomes:
+            return None
+        return sum(outcomes) / len(outcomes)
+
+    def score(self, model: str) -> Optional[float]:
+        # Expected time to a good answer: median latency, inflated by how often the model fails.
+        median = self.percentile(model, 50)
+        if median is None:
+            return None
+        # Abandoned calls add latency without an outcome, so a model may have no outcomes yet.
+        success_rate = self.success_rate(model)
+        return median / max(1.0 if success_rate is None else success_rate, MIN_SUCCESS_RATE)
+
+    def ranked(self, models: Sequence[str]) -> List[str]:
+        # Models without enough samples sort last in their configured order, so routing only
+        # moves away from the configured primary once there is evidence for it.
+        scores = {model: self.score(model) for model in models}
+        return sorted(models, key=lambda m: float("inf") if scores[m] is None else scores[m])
+
+    def get_stats(self) -> dict:
+        stats = {}
+        for model in list(self._outcomes):
+            p50 = self.percentile(model, 50)
+            p95 = self.percentile(model, 95)
+            success_rate = self.success_rate(model)
+            stats[model] = {
+                "samples": len(self._latencies[model]),
+                "failures": sum(1 for ok in self._outcomes[model] if not ok),
+                "success_rate": round(success_rate, 4) if success_rate is not None else None,
+                "p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+            }
+        return stats
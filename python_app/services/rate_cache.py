@@ -0,0 +1,126 @@
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts run single-worker
+    fcntl = None
+
+
+MAGIC = b"JPFX"
+FORMAT_VERSION = 1
+# magic, format version, payload crc32, fetched at (unix seconds), rate count
+HEADER = struct.Struct("<4sIIdI")
+# ISO currency code, padding, units per one base currency
+RECORD = struct.Struct("<3sxd")
+LOCK_POLL_INTERVAL = 0.05
+
+
+@dataclass
+class RateSnapshot:
+    rates: Dict[str, float]
+    fetched_at: float
+
+
+class SharedRateCache:
+    def __init__(self, path: str):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self._snapshot: Optional[RateSnapshot] = None
+        self._stat_key = None
+
+    def _file_key(self):
+        stat = os.stat(self.path)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def read(self) -> Optional[RateSnapshot]:
+        try:
+            key = self._file_key()
+        except OSError:
+            return None
+        if key == self._stat_key:
+            return self._snapshot
+
+        try:
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                snapshot = self._decode(data)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Shared rate cache read error: {e}")
+            return self._snapshot
+
+        self._snapshot = snapshot
+        self._stat_key = key
+        return snapshot
+
+    def _decode(self, data) -> RateSnapshot:
+        magic, format_version, crc, fetched_at, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported rate cache: {self.path}")
+        end = HEADER.size + count * RECORD.size
+        if len(data) < end or zlib.crc32(data[HEADER.size:end]) != crc:
+            raise ValueError(f"Rate cache checksum mismatch: {self.path}")
+
+        rates = {}
+        for i in range(count):
+            code, rate = RECORD.unpack_from(data, HEADER.size + i * RECORD.size)
+            rates[code.decode("ascii")] = rate
+        return RateSnapshot(rates=rates, fetched_at=fetched_at)
+
+    def write(self, rates: Dict[str, float], fetched_at: Optional[float] = None) -> RateSnapshot:
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        records = [(code, rate) for code, rate in rates.items() if len(code) == 3 and code.isascii() and rate]
+        payload = b"".join(RECORD.pack(code.encode("ascii"), float(rate)) for code, rate in records)
+        blob = HEADER.pack(MAGIC, FORMAT_VERSION, zlib.crc32(payload), fetched_at, len(records)) + payload
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".rates-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            # Atomic swap so other workers never read a half-written snapshot.
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        return self.read()
+
+    def try_acquire(self) -> Optional[int]:
+        # Whoever takes the lock is the elected fetcher until it releases.
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is None:
+            return fd
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return fd
+        except OSError:
+            os.close(fd)
+            return None
+
+    def release(self, fd: int) -> None:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    def wait_for_fetcher(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            fd = self.try_acquire()
+            if fd is not None:
+                self.release(fd)
+                return True
+            time.sleep(LOCK_POLL_INTERVAL)
+        return False
+
+
+DEFAULT_RATE_CACHE_PATH = os.path.join(tempfile.gettempdir(), f"jp-budget-rates-v{FORMAT_VERSION}.bin")
+
+
+def default_rate_cache() -> SharedRateCache:
+    return SharedRateCache(os.environ.get("EXCHANGE_RATE_CACHE_PATH", DEFAULT_RATE_CACHE_PATH))
@@ -0,0 +1,78 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional
+
+from ..domain.trip_optimizer import OptimizerResult, optimize_trip
+
+
+class OptimizerBusyError(Exception):
+    pass
+
+
+class OptimizerTimeoutError(Exception):
+    pass
+
+
+class TripOptimizerService:
+    DEFAULT_WORKERS = 2
+    DEFAULT_TIMEOUT = 10.0
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        self.max_workers = max_workers or int(os.environ.get("OPTIMIZER_WORKERS", self.DEFAULT_WORKERS))
+        self.max_pending = max_pending or int(os.environ.get("OPTIMIZER_MAX_PENDING", self.max_workers * 4))
+        self.timeout = timeout or float(os.environ.get("OPTIMIZER_TIMEOUT", self.DEFAULT_TIMEOUT))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self.timed_out = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def optimize(self, **kwargs) -> OptimizerResult:
+        if self._pending >= self.max_pending:
+            raise OptimizerBusyError("Trip optimizer is busy, please retry shortly")
+
+        loop = asyncio.get_running_loop()
+        job = self._get_executor().submit(partial(optimize_trip, **kwargs))
+        self._pending += 1
+        # The slot is held until the worker is actually done: a timed-out job keeps the
+        # process busy, so releasing on timeout would let new jobs queue up behind it.
+        job.add_done_callback(lambda _: self._release(loop))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            job.cancel()
+            self.timed_out += 1
+            raise OptimizerTimeoutError("Trip optimization timed out")
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            loop.call_soon_threadsafe(self._decrement)
+        except RuntimeError:
+            # Loop already closed at shutdown; nothing is left to admit.
+            pass
+
+    def _decrement(self) -> None:
+        self._pending -= 1
+
+    def get_stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "timed_out": self.timed_out,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,35 @@
+import pytest
+import httpx
+from python_app.domain.rate_history import RateHistory
+from python_app.services.chat import ChatService
+from python_app.services.exchange_rate import ExchangeRateService
+from python_app.services.http_client import HttpClientPool
+from python_app.services.rate_cache import SharedRateCache
+
+
+@pytest.fixture
+def make_chat_service():
+    # ChatService talking to an httpx MockTransport handler; keyword arguments go to ChatService.
+    def make(handler, **kwargs):
+        pool = HttpClientPool(http2=False)
+        pool.register("chat", transport=httpx.MockTransport(handler))
+        service = ChatService(http=pool, **kwargs)
+        service.api_key = "test-key"
+        return service
+    return make
+
+
+@pytest.fixture
+def make_rate_service(tmp_path):
+    # ExchangeRateService over a MockTransport handler. Services built with the same cache_path
+    # share the on-disk snapshot and history, like workers on one host.
+    def make(handler, cache_path=None, shared_cache=None, history=None):
+        cache_path = cache_path or str(tmp_path / "rates.bin")
+        pool = HttpClientPool(http2=False)
+        pool.register("exchange_rate", transport=httpx.MockTransport(handler))
+        return ExchangeRateService(
+            http=pool,
+            shared_cache=SharedRateCache(cache_path) if shared_cache is None else shared_cache,
+            history=RateHistory(cache_path + ".history") if history is None else history
+        )
+    return make
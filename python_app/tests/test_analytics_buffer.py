@@ -0,0 +1,361 @@
+import asyncio
+import json
+import pytest
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from python_app.api import routes
+from python_app.db.models import PageView, UserEvent
+from python_app.main import app
+from python_app.schemas.analytics import BudgetCalculationCreate
+from python_app.services.analytics_buffer import AnalyticsBuffer
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    PageView.metadata.create_all(engine, tables=[PageView.__table__, UserEvent.__table__])
+    return sessionmaker(bind=engine)
+
+
+def page_view(path="/"):
+    return {"session_id": "s1", "page_path": path, "referrer": None, "user_agent": "test"}
+
+
+def failing_factory():
+    raise ConnectionError("database down")
+
+
+class TestAnalyticsBuffer:
+    @pytest.mark.asyncio
+    async def test_flush_writes_all_tables_in_one_batch(self, session_factory):
+        buffer = AnalyticsBuffer(session_factory=session_factory)
+        for i in range(3):
+            assert buffer.add("page_views", page_view(f"/p{i}"))
+        buffer.add("user_events", {"session_id": None, "event_type": "click", "event_category": "cta", "event_data": {"x": 1}})
+        assert buffer.get_stats()["pending"] == 4
+
+        assert await buffer.flush() == 4
+        db = session_factory()
+        assert [p.page_path for p in db.query(PageView).order_by(PageView.id)] == ["/p0", "/p1", "/p2"]
+        assert db.query(UserEvent).one().event_data == {"x": 1}
+        assert db.query(PageView).first().created_at is not None
+        assert buffer.get_stats()["pending"] == 0
+
+    def test_rejects_unknown_tables(self):
+        with pytest.raises(ValueError):
+            AnalyticsBuffer(session_factory=failing_factory).add("users", {})
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_requeues_within_bound(self):
+        buffer = AnalyticsBuffer(session_factory=failing_factory, max_pending=3)
+        for i in range(3):
+            buffer.add("page_views", page_view(f"/p{i}"))
+        assert await buffer.flush() == 0
+        assert buffer.get_stats()["pending"] == 3
+        assert buffer.get_stats()["failed_flushes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_drop_policy(self, session_factory):
+        buffer = AnalyticsBuffer(session_factory=session_factory, max_pending=2, overflow="drop")
+        assert buffer.add("page_views", page_view("/a"))
+        assert buffer.add("page_views", page_view("/b"))
+        assert not buffer.add("page_views", page_view("/c"))
+        assert buffer.get_stats()["dropped"] == 1
+        assert await buffer.flush() == 2
+
+    @pytest.mark.asyncio
+    async def test_spill_policy_replays_on_next_flush(self, session_factory, tmp_path):
+        spill = tmp_path / "spill.ndjson"
+        buffer = AnalyticsBuffer(session_factory=session_factory, max_pending=1, overflow="spill", spill_path=str(spill))
+        buffer.add("page_views", page_view("/kept"))
+        assert buffer.add("page_views", page_view("/spilled"))
+        assert json.loads(spill.read_text())["row"]["page_path"] == "/spilled"
+
+        with open(spill, "a") as f:
+            f.write('{"table": "page_views", "row": {"page_pa')
+        assert await buffer.flush() == 2
+        assert not spill.exists()
+        paths = {p.page_path for p in session_factory().query(PageView)}
+        assert paths == {"/kept", "/spilled"}
+        assert buffer.get_stats()["replayed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_arrival_time_is_kept(self, session_factory):
+        buffer = AnalyticsBuffer(session_factory=session_factory)
+        buffer.add("page_views", page_view())
+        added = datetime.now(timezone.utc).replace(tzinfo=None)
+        await asyncio.sleep(0.05)
+        await buffer.flush()
+        assert session_factory().query(PageView).one().created_at.replace(tzinfo=None) <= added
+
+    @pytest.mark.asyncio
+    async def test_size_threshold_wakes_flusher(self, session_factory):
+        buffer = AnalyticsBuffer(session_factory=session_factory, flush_interval=60, flush_batch=5)
+        await buffer.start()
+        try:
+            for i in range(5):
+                buffer.add("page_views", page_view(f"/p{i}"))
+            for _ in range(50):
+                if buffer.flushed == 5:
+                    break
+                await asyncio.sleep(0.01)
+            assert buffer.flushed == 5
+        finally:
+            await buffer.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending(self, session_factory):
+        buffer = AnalyticsBuffer(session_factory=session_factory, flush_interval=60)
+        await buffer.start()
+        buffer.add("page_views", page_view())
+        await buffer.stop()
+        assert session_factory().query(PageView).count() == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_spills_when_database_is_down(self, tmp_path):
+        spill = tmp_path / "spill.ndjson"
+        buffer = AnalyticsBuffer(session_factory=failing_factory, overflow="spill", spill_path=str(spill))
+        buffer.add("page_views", page_view())
+        await buffer.stop()
+        assert len(spill.read_text().splitlines()) == 1
+        assert buffer.get_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stop_counts_unflushed_rows_as_dropped(self, capsys):
+        buffer = AnalyticsBuffer(session_factory=failing_factory)
+        for i in range(3):
+            buffer.add("page_views", page_view(f"/p{i}"))
+        await buffer.stop()
+        assert (buffer.get_stats()["pending"], buffer.get_stats()["dropped"]) == (0, 3)
+        assert "dropped 3 records" in capsys.readouterr().out
+
+    @pytest.mark.asyncio
+    async def test_rejected_row_is_isolated(self, session_factory, tmp_path):
+        dead = tmp_path / "rejected.ndjson"
+        buffer = AnalyticsBuffer(session_factory=session_factory, dead_letter_path=str(dead))
+        for i in range(7):
+            buffer.add("page_views", page_view(f"/p{i}"))
+        # NOT NULL violation: a row the database refuses however often it is retried.
+        buffer.add("page_views", dict(page_view(), page_path=None))
+        buffer.add("page_views", page_view("/p7"))
+
+        assert await buffer.flush() == 8
+        stats = buffer.get_stats()
+        assert (stats["pending"], stats["dead_lettered"], stats["failed_flushes"]) == (0, 1, 0)
+        assert json.loads(dead.read_text())["row"]["page_path"] is None
+        assert session_factory().query(PageView).count() == 8
+
+        buffer.add("page_views", page_view("/after"))
+        assert await buffer.flush() == 1
+
+    @pytest.mark.asyncio
+    async def test_isolation_is_capped_per_batch(self, session_factory, tmp_path, monkeypatch):
+        from python_app.services import analytics_buffer
+        monkeypatch.setattr(analytics_buffer, "MAX_ISOLATION_WRITES", 3)
+        buffer = AnalyticsBuffer(session_factory=session_factory, dead_letter_path=str(tmp_path / "rejected.ndjson"))
+        for i in range(8):
+            buffer.add("page_views", page_view(f"/p{i}") if i % 2 else dict(page_view(), page_path=None))
+
+        written = await buffer.flush()
+        assert 0 < buffer.get_stats()["pending"] < 8
+        for _ in range(10):
+            written += await buffer.flush()
+        assert written == 4
+        assert buffer.get_stats()["dead_lettered"] == 4
+        assert buffer.get_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_replay_isolates_rejected_rows(self, session_factory, tmp_path):
+        spill = tmp_path / "spill.ndjson"
+        buffer = AnalyticsBuffer(
+            session_factory=session_factory, overflow="spill", spill_path=str(spill),
+            dead_letter_path=str(tmp_path / "rejected.ndjson")
+        )
+        now = datetime.now(timezone.utc)
+        buffer._spill([
+            ("page_views", dict(page_view("/a"), created_at=now)),
+            ("page_views", dict(page_view(), page_path=None, created_at=now)),
+            ("page_views", dict(page_view("/b"), created_at=now)),
+        ])
+
+        assert await buffer.flush() == 2
+        assert not spill.exists()
+        assert buffer.get_stats()["replayed"] == 2
+        assert buffer.get_stats()["dead_lettered"] == 1
+
+    @pytest.mark.asyncio
+    async def test_replay_keeps_file_when_respill_fails(self, tmp_path, monkeypatch):
+        spill = tmp_path / "spill.ndjson"
+        buffer = AnalyticsBuffer(session_factory=failing_factory, overflow="spill", spill_path=str(spill))
+        buffer._spill([("page_views", dict(page_view("/a"), created_at=datetime.now(timezone.utc)))])
+
+        def no_disk(records):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(buffer, "_spill", no_disk)
+        await buffer._replay()
+        leftover = list(tmp_path.glob("spill.ndjson.replay-*"))
+        assert len(leftover) == 1
+        assert json.loads(leftover[0].read_text())["row"]["page_path"] == "/a"
+
+
+class TestAnalyticsRoutes:
+    def test_pageview_is_queued(self, session_factory, monkeypatch):
+        buffer = AnalyticsBuffer(session_factory=session_factory, max_pending=1)
+        monkeypatch.setattr(routes, "analytics_buffer", buffer)
+        client = TestClient(app)
+
+        response = client.post("/api/analytics/pageview", json={"page_path": "/<b>home</b>"})
+        assert response.status_code == 200
+        assert response.json() == {"success": True, "queued": True}
+        assert buffer.get_stats()["pending"] == 1
+
+        response = client.post("/api/analytics/event", json={"event_type": "click", "event_category": "cta"})
+        assert response.status_code == 503
+
+    def test_unstorable_values_are_rejected(self, monkeypatch):
+        buffer = AnalyticsBuffer(session_factory=failing_factory)
+        monkeypatch.setattr(routes, "analytics_buffer", buffer)
+        client = TestClient(app, headers={"x-forwarded-for": "203.0.113.23"})
+        budget = {
+            "travelers": 2, "cities": ["Tokyo"], "travel_style": "mid", "total_budget_sgd": 3000.0,
+            "per_person_sgd": 1500.0, "exchange_rate": 0.0089, "breakdown": {"food": 400.0},
+        }
+        bad = [
+            ("pageview", {"page_path": "/home\u0000"}),
+            ("event", {"event_type": "click", "event_category": "cta", "event_data": {"k": "v\u0000"}}),
+            ("budget", dict(budget, cities=["To\u0000kyo"])),
+            ("budget", dict(budget, total_budget_sgd=1e12)),
+            ("budget", dict(budget, exchange_rate=1e7)),
+        ]
+        for kind, body in bad:
+            response = client.post(f"/api/analytics/{kind}", json=body)
+            assert response.status_code == 422, (kind, body)
+        assert client.post("/api/analytics/budget", json=budget).status_code == 200
+        assert buffer.get_stats()["pending"] == 1
+
+    @pytest.mark.parametrize("field, largest, rounds_over", [
+        ("total_budget_sgd", 99999999.99, 99999999.995),
+        ("per_person_sgd", 99999999.994, 99999999.996),
+        ("exchange_rate", 999999.9999, 999999.99995),
+    ])
+    def test_numeric_column_bounds(self, field, largest, rounds_over):
+        budget = {
+            "travelers": 2, "cities": ["Tokyo"], "travel_style": "mid", "total_budget_sgd": 3000.0,
+            "per_person_sgd": 1500.0, "exchange_rate": 0.0089, "breakdown": {},
+        }
+        BudgetCalculationCreate(**dict(budget, **{field: largest}))
+        with pytest.raises(ValidationError):
+            BudgetCalculationCreate(**dict(budget, **{field: rounds_over}))
+
+    def test_unconfigured_database(self, monkeypatch):
+        monkeypatch.setattr(routes, "analytics_buffer", AnalyticsBuffer())
+        response = TestClient(app).post("/api/analytics/pageview", json={"page_path": "/"})
+        assert response.status_code == 503
+
+
+class TestAnalyticsBatch:
+    @pytest.fixture
+    def buffer(self, session_factory, monkeypatch):
+        buffer = AnalyticsBuffer(session_factory=session_factory, max_pending=100)
+        monkeypatch.setattr(routes, "analytics_buffer", buffer)
+        return buffer
+
+    def ndjson(self, *records):
+        return "\n".join(r if isinstance(r, str) else json.dumps(r) for r in records) + "\n"
+
+    def post(self, body):
+        return TestClient(app, headers={"x-forwarded-for": "203.0.113.24"}).post(
+            "/api/analytics/batch", content=body, headers={"Content-Type": "application/x-ndjson"}
+        )
+
+    @pytest.mark.asyncio
+    async def test_mixed_batch_in_one_transaction(self, buffer, session_factory):
+        body = self.ndjson(
+            {"type": "pageview", "page_path": "/"},
+            {"type": "event", "event_type": "click", "event_category": "cta", "event_data": {"id": 7}},
+            {"type": "pageview", "page_path": "/<i>budget</i>", "session_id": "s1"},
+        )
+        response = self.post(body)
+        assert response.status_code == 200
+        assert response.json() == {"success": True, "accepted": 3, "rejected": 0, "errors": []}
+
+        assert await buffer.flush() == 3
+        db = session_factory()
+        assert sorted(p.page_path for p in db.query(PageView)) == ["/", "/budget"]
+        assert db.query(UserEvent).one().event_data == {"id": 7}
+
+    def test_per_record_errors(self, buffer):
+        body = self.ndjson(
+            {"type": "pageview", "page_path": "/ok"},
+            "{not json",
+            "",
+            {"type": "signup"},
+            {"type": "event", "event_type": "click"},
+            [1, 2],
+            {"type": "budget", "travelers": 0, "cities": ["tokyo"], "travel_style": "mid",
+             "total_budget_sgd": 1, "per_person_sgd": 1, "exchange_rate": 110, "breakdown": {}},
+        )
+        data = self.post(body).json()
+        assert (data["success"], data["accepted"], data["rejected"]) == (False, 1, 5)
+        errors = {e["line"]: e["error"] for e in data["errors"]}
+        assert errors[2] == "Invalid JSON"
+        assert errors[4] == "Unknown record type: signup"
+        assert "event_category" in errors[5]
+        assert errors[6] == "Record must be a JSON object"
+        assert "travelers" in errors[7]
+        assert buffer.get_stats()["pending"] == 1
+
+    def test_unstorable_values_are_per_record_errors(self, buffer):
+        budget = {"type": "budget", "travelers": 2, "cities": ["tokyo"], "travel_style": "mid",
+                  "total_budget_sgd": 3000, "per_person_sgd": 1500, "exchange_rate": 0.0089, "breakdown": {}}
+        body = self.ndjson(
+            {"type": "pageview", "page_path": "/ok"},
+            {"type": "pageview", "page_path": "/a\u0000b"},
+            '{"type": "event", "event_type": "click", "event_category": "cta", "event_data": {"k": "\\ud800"}}',
+            dict(budget, total_budget_sgd=1e9),
+            '{"type": "budget", "travelers": 2, "cities": ["tokyo"], "travel_style": "mid", "total_budget_sgd": NaN, '
+            '"per_person_sgd": 1, "exchange_rate": 0.0089, "breakdown": {}}',
+            dict(budget, breakdown={"food": "x\u0000"}),
+            budget,
+        )
+        data = self.post(body).json()
+        assert (data["accepted"], data["rejected"]) == (2, 5)
+        errors = {e["line"]: e["error"] for e in data["errors"]}
+        assert "NUL" in errors[2] and "page_path" in errors[2]
+        assert "Unicode" in errors[3]
+        assert "total_budget_sgd" in errors[4]
+        assert "total_budget_sgd" in errors[5]
+        assert "breakdown" in errors[6]
+        assert buffer.get_stats()["pending"] == 2
+
+    def test_streamed_body_is_split_on_lines(self, buffer):
+        lines = self.ndjson(*[{"type": "pageview", "page_path": f"/p{i}"} for i in range(20)]).encode()
+
+        def chunks():
+            for start in range(0, len(lines), 7):
+                yield lines[start:start + 7]
+
+        response = TestClient(app).post("/api/analytics/batch", content=chunks())
+        assert response.json()["accepted"] == 20
+        assert [row["page_path"] for _, row in buffer._pending] == [f"/p{i}" for i in range(20)]
+
+    def test_batch_is_all_or_nothing_when_full(self, session_factory, monkeypatch):
+        buffer = AnalyticsBuffer(session_factory=session_factory, max_pending=2)
+        monkeypatch.setattr(routes, "analytics_buffer", buffer)
+        body = self.ndjson(*[{"type": "pageview", "page_path": f"/p{i}"} for i in range(3)])
+        assert self.post(body).status_code == 503
+        assert buffer.get_stats()["pending"] == 0
+        assert buffer.get_stats()["dropped"] == 3
+
+    def test_limits(self, buffer, monkeypatch):
+        monkeypatch.setattr(routes, "MAX_BATCH_RECORDS", 2)
+        body = self.ndjson(*[{"type": "pageview", "page_path": "/"}] * 3)
+        assert self.post(body).status_code == 413
+        monkeypatch.setattr(routes, "MAX_BATCH_BYTES", 10)
+        assert self.post(self.ndjson({"type": "pageview", "page_path": "/"})).status_code == 413
+        assert buffer.get_stats()["pending"] == 0
@@ -0,0 +1,224 @@
+import pytest
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import create_engine, create_mock_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+from python_app.db.models import AnalyticsDailyRollup, AnalyticsHourlyRollup, AnalyticsRollupState, PageView, UserEvent
+from python_app.services.analytics_rollup import (
+    AnalyticsRollup, DashboardTotals, ceil_hour, empty_totals, floor_day, floor_hour, BUDGETS, CITY, STYLE, TRAVELERS,
+)
+
+
+NOW = datetime(2026, 3, 10, 14, 25)
+
+
+class Clock:
+    def __init__(self, now=NOW):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class SqliteRollup(AnalyticsRollup):
+    # budget_calculations uses Postgres ARRAY columns; its rows are supplied directly here.
+    raw_models = (PageView, UserEvent)
+
+    def __init__(self, *args, budgets=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.budgets = list(budgets)
+
+    def _budget_totals(self, db, start, end):
+        # Mirrors the GROUP BY hour, travel_style / unnest(cities) queries.
+        hours = defaultdict(empty_totals)
+        for created_at, cities, style, total_budget, travelers in self.budgets:
+            if start <= created_at < end:
+                totals = hours[floor_hour(created_at)]
+                for key, value in (((BUDGETS, ""), total_budget), ((TRAVELERS, ""), travelers), ((STYLE, style), 0)):
+                    totals[key][0] += 1
+                    totals[key][1] += value
+                for city in cities:
+                    totals[(CITY, city)][0] += 1
+        return hours
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    PageView.metadata.create_all(engine, tables=[
+        PageView.__table__, UserEvent.__table__, AnalyticsHourlyRollup.__table__, AnalyticsDailyRollup.__table__,
+        AnalyticsRollupState.__table__,
+    ])
+    return sessionmaker(bind=engine)
+
+
+def add_views(factory, times):
+    db = factory()
+    db.add_all(PageView(page_path="/", created_at=t) for t in times)
+    db.commit()
+    db.close()
+
+
+def raw_dashboard(factory, rollup, start, end):
+    db = factory()
+    try:
+        return DashboardTotals.from_totals(rollup.raw_totals(db, start, end))
+    finally:
+        db.close()
+
+
+def dashboard(factory, rollup, start):
+    db = factory()
+    try:
+        return rollup.dashboard(db, start)
+    finally:
+        db.close()
+
+
+class TestDashboardTotals:
+    def test_averages_and_rankings(self):
+        totals = empty_totals()
+        totals[(BUDGETS, "")] = [3, Decimal("4000.51")]
+        totals[(TRAVELERS, "")] = [3, Decimal(7)]
+        totals[(CITY, "tokyo")] = [2, Decimal(0)]
+        totals[(CITY, "kyoto")] = [1, Decimal(0)]
+        totals[(STYLE, "mid")] = [3, Decimal(0)]
+
+        summary = DashboardTotals.from_totals(totals)
+        assert summary.budget_calculations == 3
+        assert summary.average_budget == pytest.approx(1333.5033, abs=1e-4)
+        assert summary.average_travelers == pytest.approx(7 / 3)
+        assert summary.popular_cities == [("tokyo", 2), ("kyoto", 1)]
+        assert summary.popular_travel_styles == [("mid", 3)]
+
+    def test_empty(self):
+        summary = DashboardTotals.from_totals(empty_totals())
+        assert summary.budget_calculations == 0
+        assert summary.average_budget == 0.0
+        assert summary.popular_cities == []
+
+
+class TestAnalyticsRollup:
+    def test_compacts_closed_hours_and_days(self, session_factory):
+        start = NOW - timedelta(days=3)
+        add_views(session_factory, [start + timedelta(minutes=37 * i) for i in range(200)])
+        rollup = SqliteRollup(session_factory=session_factory, clock=Clock())
+
+        assert rollup.compact()
+        db = session_factory()
+        newest = db.query(AnalyticsHourlyRollup.bucket_start).order_by(AnalyticsHourlyRollup.bucket_start.desc()).first()[0]
+        assert newest == NOW.replace(minute=0) - timedelta(hours=1)
+        days = [row[0] for row in db.query(AnalyticsDailyRollup.bucket_start).distinct().order_by(AnalyticsDailyRollup.bucket_start)]
+        assert days == [floor_day(start) + timedelta(days=i) for i in range(3)]
+        db.close()
+
+    def test_dashboard_matches_raw_counts(self, session_factory):
+        start = NOW - timedelta(days=4)
+        add_views(session_factory, [start + timedelta(minutes=23 * i) for i in range(260)])
+        budgets = [
+            (start + timedelta(hours=5 * i), ["tokyo"] if i % 2 else ["osaka", "kyoto"], "budget", Decimal(100 * i), 1 + i % 3)
+            for i in range(19)
+        ]
+        rollup = SqliteRollup(session_factory=session_factory, clock=Clock(), budgets=budgets)
+        assert rollup.compact()
+
+        # Fresh rows after compaction come from the raw tables.
+        add_views(session_factory, [NOW - timedelta(minutes=5)])
+        for window_start in (NOW - timedelta(days=2, minutes=13), NOW - timedelta(hours=30), NOW - timedelta(minutes=50)):
+            assert dashboard(session_factory, rollup, window_start) == raw_dashboard(session_factory, rollup, window_start, NOW)
+
+    def test_dashboard_without_rollups_reads_raw(self, session_factory):
+        add_views(session_factory, [NOW - timedelta(hours=h) for h in range(1, 6)])
+        rollup = SqliteRollup(session_factory=session_factory, clock=Clock())
+        assert dashboard(session_factory, rollup, NOW - timedelta(days=1)).page_views == 5
+
+    def test_recomputes_lag_window_for_late_rows(self, session_factory):
+        add_views(session_factory, [NOW - timedelta(hours=3)])
+        clock = Clock()
+        rollup = SqliteRollup(session_factory=session_factory, clock=clock, lag_hours=2)
+        assert rollup.compact()
+
+        # A row for an already compacted hour arrives late, within the lag window.
+        add_views(session_factory, [NOW - timedelta(minutes=90)])
+        clock.now = NOW + timedelta(hours=1)
+        assert rollup.compact()
+
+        db = session_factory()
+        counts = db.query(AnalyticsHourlyRollup.count).filter(AnalyticsHourlyRollup.metric == "page_views").all()
+        assert sum(c for (c,) in counts) == 2
+        db.close()
+        assert dashboard(session_factory, rollup, NOW - timedelta(days=1)).page_views == 2
+
+    def test_rows_older_than_the_lag_window_are_recomputed(self, session_factory):
+        add_views(session_factory, [NOW - timedelta(days=3, hours=h) for h in range(5)])
+        clock = Clock()
+        rollup = SqliteRollup(session_factory=session_factory, clock=clock, lag_hours=2)
+        assert rollup.compact()
+
+        # A spill replay (or a requeue after a long outage) writes rows stamped days ago.
+        late = NOW - timedelta(days=2, hours=6)
+        add_views(session_factory, [late, late + timedelta(minutes=10), NOW - timedelta(days=3, hours=1)])
+        clock.now = NOW + timedelta(hours=1)
+        assert rollup.compact()
+        assert rollup.get_stats()["late_hours_recomputed"] == 2
+
+        db = session_factory()
+        hourly = db.query(AnalyticsHourlyRollup.count).filter(
+            AnalyticsHourlyRollup.metric == "page_views", AnalyticsHourlyRollup.bucket_start == floor_hour(late)
+        ).scalar()
+        daily = db.query(AnalyticsDailyRollup.count).filter(
+            AnalyticsDailyRollup.metric == "page_views", AnalyticsDailyRollup.bucket_start == floor_day(late)
+        ).scalar()
+        db.close()
+        assert hourly == 2
+        assert daily == 2
+        window = NOW - timedelta(days=4, minutes=7)
+        assert dashboard(session_factory, rollup, window).page_views == 8
+        assert dashboard(session_factory, rollup, window) == raw_dashboard(session_factory, rollup, window, clock.now)
+
+        # Nothing new since: no hours are recomputed beyond the lag window.
+        assert rollup.compact()
+        assert rollup.get_stats()["late_hours_recomputed"] == 2
+        assert dashboard(session_factory, rollup, window).page_views == 8
+
+    def test_catches_up_in_chunks(self, session_factory):
+        add_views(session_factory, [NOW - timedelta(days=10), NOW - timedelta(days=1)])
+        rollup = SqliteRollup(session_factory=session_factory, clock=Clock())
+        assert not rollup.compact()
+        while not rollup.compact():
+            pass
+        assert dashboard(session_factory, rollup, NOW - timedelta(days=11)).page_views == 2
+
+    def test_noop_without_data(self, session_factory):
+        rollup = SqliteRollup(session_factory=session_factory, clock=Clock())
+        assert rollup.compact()
+        assert rollup.get_stats()["hours_compacted"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_run_is_counted(self):
+        def failing_factory():
+            raise ConnectionError("database down")
+
+        rollup = SqliteRollup(session_factory=failing_factory, clock=Clock())
+        await rollup.run_once()
+        assert rollup.get_stats()["failed_runs"] == 1
+        assert rollup.get_stats()["last_run"] == NOW.isoformat()
+
+    def test_postgres_budget_queries(self):
+        # SqliteRollup replaces _budget_totals, so the Postgres statements are checked compiled.
+        engine = create_mock_engine("postgresql://", lambda *args, **kwargs: None)
+        by_style, by_city = AnalyticsRollup()._budget_queries(Session(bind=engine), NOW - timedelta(days=1), NOW)
+        hour = "date_trunc('hour', budget_calculations.created_at)"
+        style_sql = str(by_style.compile(dialect=engine.dialect))
+        city_sql = str(by_city.compile(dialect=engine.dialect))
+        assert f"GROUP BY {hour}, budget_calculations.travel_style" in style_sql
+        assert "sum(budget_calculations.total_budget_sgd)" in style_sql
+        assert "FROM budget_calculations, unnest(budget_calculations.cities) AS city" in city_sql
+        assert f"GROUP BY {hour}, city" in city_sql
+
+
+def test_ceil_hour():
+    assert ceil_hour(NOW) == datetime(2026, 3, 10, 15)
+    assert ceil_hour(datetime(2026, 3, 10, 15)) == datetime(2026, 3, 10, 15)
@@ -0,0 +1,140 @@
+import pytest
+import httpx
+from fastapi.testclient import TestClient
+from python_app.api import routes
+from python_app.main import app
+from python_app.domain import answer_index
+from python_app.domain.answer_index import (
+    AnswerIndex, AnswerDocument, build_documents, get_answer_index, query_terms, tokenize
+)
+
+
+@pytest.fixture(scope="module")
+def index():
+    index = AnswerIndex(threshold=0.8)
+    index.sync(build_documents())
+    return index
+
+
+class TestTokenizer:
+    def test_plural_folding_and_stopwords(self):
+        assert tokenize("Temples & Shrines") == ["temple", "shrine"]
+        assert tokenize("Pass") == ["pass"]
+        assert query_terms("What are the must-see places in Kyoto?") == ["must", "see", "place", "kyoto"]
+        assert query_terms("What's the weather like?") == ["weather"]
+
+
+class TestAnswerIndex:
+    @pytest.mark.parametrize("question,doc_id", [
+        ("What are the must-see places in Kyoto?", "recs:kyoto:must_see"),
+        ("Any hidden gems in Osaka?", "recs:osaka:hidden_gems"),
+        ("Where to eat in Okinawa?", "recs:okinawa:food_spots"),
+        ("What's the weather like in Hokkaido in January?", "weather:hokkaido:1"),
+        ("How much does a hotel cost in Tokyo?", "pricing:tokyo"),
+        ("How can I save money on food?", "tips:food"),
+        ("What is the best time to visit Japan?", "season:overview"),
+        ("Tell me about the JR Pass", "tip:get a jr pass"),
+    ])
+    def test_confident_answers(self, index, question, doc_id):
+        match = index.answer(question)
+        assert match is not None
+        assert match.document.doc_id == doc_id
+
+    @pytest.mark.parametrize("question", [
+        "Do Singaporeans need a visa for Japan?",
+        "Is Tokyo safe at night?",
+        "Tokyo",
+        "What is onsen etiquette in Hokkaido?",
+        "Is the JR Pass worth it for a 5 day Osaka and Kyoto trip?",
+    ])
+    def test_uncertain_questions_are_forwarded(self, index, question):
+        assert index.answer(question) is None
+
+    def test_answers_come_from_domain_data(self, index):
+        assert "Fushimi Inari Shrine" in index.answer("Must see sights in Kyoto").document.answer
+        assert "S$180 mid-range" in index.answer("Tokyo hotel prices").document.answer
+
+    def test_threshold_above_one_disables(self):
+        index = AnswerIndex(threshold=1.5)
+        index.sync(build_documents())
+        assert index.answer("What are the must-see places in Kyoto?") is None
+
+    def test_only_documents_sharing_a_term_are_scored(self, index):
+        matches = index.search("Weather in Nara in July", limit=len(index))
+        assert matches
+        for match in matches:
+            assert set(query_terms("Weather in Nara in July")) & set(tokenize(match.document.text))
+        assert len(matches) < len(index)
+
+
+class TestIncrementalRebuild:
+    def test_sync_only_touches_changes(self):
+        index = AnswerIndex()
+        docs = build_documents()
+        assert index.sync(docs) == (len(docs), 0)
+        assert index.sync(docs) == (0, 0)
+
+        changed = AnswerDocument(docs[0].doc_id, docs[0].text + " bullet train", docs[0].answer)
+        assert index.sync([changed] + docs[1:-1]) == (1, 1)
+        assert len(index) == len(docs) - 1
+        assert index.search("bullet train", limit=1)[0].document.doc_id == docs[0].doc_id
+
+    def test_removed_terms_leave_no_postings(self):
+        index = AnswerIndex()
+        index.upsert(AnswerDocument("a", "ryokan onsen", "A"))
+        index.upsert(AnswerDocument("b", "capsule hotel", "B"))
+        index.remove("a")
+        assert index.search("ryokan onsen") == []
+        index.upsert(AnswerDocument("b", "capsule hotel ryokan", "B"))
+        assert index.search("ryokan")[0].document.doc_id == "b"
+
+    def test_refresh_picks_up_content_changes(self, monkeypatch):
+        monkeypatch.setattr(answer_index, "_index", None)
+        tips = answer_index.MONEY_SAVING_TIPS + [{
+            "category": "Transport", "title": "Ride Night Buses",
+            "description": "Overnight highway buses replace a hotel night", "savings": "S$60-100 per trip",
+        }]
+        get_answer_index()
+        monkeypatch.setattr(answer_index, "MONEY_SAVING_TIPS", tips)
+        updated, removed = answer_index.refresh_answer_index()
+        assert (updated, removed) == (2, 0)
+        assert get_answer_index().answer("overnight highway").document.doc_id == "tip:ride night buses"
+
+
+class TestLocalChatAnswers:
+    @pytest.fixture
+    def upstream_calls(self, monkeypatch, make_chat_service):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={"choices": [{"message": {"content": "From the model"}}]})
+
+        monkeypatch.setattr(routes, "chat_service", make_chat_service(handler))
+        return calls
+
+    def test_confident_match_skips_the_model(self, upstream_calls):
+        client = TestClient(app)
+        response = client.post("/api/chat", json={"message": "What are the must-see places in Kyoto?"})
+        assert response.status_code == 200
+        assert response.json()["source"] == "local"
+        assert "Fushimi Inari" in response.json()["message"]
+        assert upstream_calls == []
+
+    def test_other_questions_reach_the_model(self, upstream_calls):
+        client = TestClient(app)
+        response = client.post("/api/chat", json={"message": "Do Singaporeans need a visa?"})
+        assert response.json() == {"message": "From the model", "session_id": None, "source": "assistant"}
+
+        history = [{"role": "user", "content": "Planning Kyoto"}, {"role": "assistant", "content": "Great!"}]
+        client.post("/api/chat", json={"message": "What are the must-see places in Kyoto?", "history": history})
+        client.post("/api/chat", json={"message": "What are the must-see places in Kyoto?", "cache": False})
+        assert len(upstream_calls) == 3
+
+    def test_stream_answers_locally(self, upstream_calls):
+        client = TestClient(app)
+        response = client.post("/api/chat/stream", json={"message": "Any hidden gems in Osaka?"})
+        assert response.status_code == 200
+        assert "Nakazakicho" in response.text
+        assert "event: done" in response.text
+        assert upstream_calls == []
@@ -26,6 +26,14 @@ class TestAPIEndpoints:
         assert "timestamp" in data
         assert data["status"] in ["ready", "not_ready"]
 
+    def test_http_pool_stats(self):
+        response = client.get("/api/health/http")
+        assert response.status_code == 200
+        data = response.json()
+        assert "http2" in data
+        assert "chat" in data["services"]
+        assert "exchange_rate" in data["services"]
+
     def test_get_exchange_rate(self):
         response = client.get("/api/exchange-rate")
         assert response.status_code == 200
@@ -103,6 +111,120 @@ class TestAPIEndpoints:
         assert "total_jpy" in data
         assert "season" in data
 
+    def test_calculate_budget_with_uncertainty(self):
+        payload = {
+            "city": "Tokyo",
+            "num_days": 7,
+            "num_travelers": 2,
+            "travel_style": "mid",
+            "month": 4,
+            "include_uncertainty": True,
+            "uncertainty_draws": 2000,
+            "uncertainty_seed": 123
+        }
+        # The draw count is capped by measured cost; a warm-up call keeps a cold first run from
+        # pricing itself below the requested draws.
+        client.post("/api/budget", json=payload)
+        response = client.post("/api/budget", json=payload)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["uncertainty"]["draws"] == 2000
+        bands = data["uncertainty"]["bands"]
+        assert bands["total"]["p10"] <= bands["total"]["p50"] <= bands["total"]["p90"]
+        assert client.post("/api/budget", json=payload).json()["uncertainty"]["bands"] == bands
+
+    def test_calculate_budget_with_dates(self):
+        response = client.post("/api/budget", json={
+            "city": "Tokyo",
+            "num_days": 7,
+            "num_travelers": 2,
+            "travel_style": "mid",
+            "month": 4,
+            "departure_date": "2026-04-28",
+            "return_date": "2026-05-06"
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["season_label"] == "Cherry Blossom Season"
+        assert data["breakdown"]["total"] > 0
+
+    def test_calculate_budget_in_home_currency(self):
+        response = client.post("/api/budget", json={
+            "city": "Tokyo",
+            "num_days": 5,
+            "num_travelers": 1,
+            "month": 9,
+            "currency": "usd"
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["currency"] == "USD"
+        expected = data["breakdown"]["total"] * data["currency_rate"]
+        assert data["converted_breakdown"]["total"] == pytest.approx(expected, abs=0.01)
+
+    def test_calculate_budget_as_of(self, tmp_path, monkeypatch):
+        from datetime import datetime, timezone
+        from python_app.api import routes
+        from python_app.domain.rate_history import RateHistory
+        history = RateHistory(str(tmp_path / "history.bin"))
+        for day, jpy in [(1, 110.0), (10, 120.0)]:
+            history.append(datetime(2025, 6, day, tzinfo=timezone.utc).timestamp(), {"JPY": jpy})
+        monkeypatch.setattr(routes.exchange_service, "_history", history)
+
+        response = client.post("/api/budget", json={
+            "city": "Tokyo",
+            "num_days": 5,
+            "num_travelers": 1,
+            "month": 9,
+            "as_of": "2025-06-05"
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["exchange_rate"] == pytest.approx(1 / 110.0)
+        assert data["total_jpy"] == round(data["breakdown"]["total"] * 110.0)
+        assert data["rate_trend"]["samples"] == 1
+
+        response = client.post("/api/budget", json={
+            "city": "Tokyo", "num_days": 5, "num_travelers": 1, "month": 9, "as_of": "2025-06-05", "currency": "JPY"
+        })
+        data = response.json()
+        assert data["currency_rate"] == 110.0
+        assert data["converted_breakdown"]["total"] == data["total_jpy"]
+
+        response = client.post("/api/budget", json={
+            "city": "Tokyo", "num_days": 5, "num_travelers": 1, "month": 9, "as_of": "2025-06-05", "currency": "USD"
+        })
+        assert response.status_code == 400
+
+        response = client.get("/api/exchange-rate/history", params={"as_of": "2025-06-10"})
+        assert response.status_code == 200
+        assert response.json()["high"] == 120.0
+
+        response = client.post("/api/budget", json={
+            "city": "Tokyo", "num_days": 5, "num_travelers": 1, "month": 9, "as_of": "2024-01-01"
+        })
+        assert response.status_code == 400
+
+    def test_calculate_budget_unsupported_currency(self):
+        response = client.post("/api/budget", json={
+            "city": "Tokyo",
+            "num_days": 5,
+            "num_travelers": 1,
+            "month": 9,
+            "currency": "XYZ"
+        })
+        assert response.status_code == 400
+
+    def test_calculate_budget_requires_both_dates(self):
+        response = client.post("/api/budget", json={
+            "city": "Tokyo",
+            "num_days": 7,
+            "num_travelers": 2,
+            "month": 4,
+            "departure_date": "2026-04-28"
+        })
+        assert response.status_code == 400
+
     def test_calculate_budget_budget_style(self):
         response = client.post("/api/budget", json={
             "city": "Osaka",
@@ -149,6 +271,107 @@ class TestAPIEndpoints:
         })
         assert response.status_code == 422
 
+    def test_calculate_budget_batch_matches_single(self):
+        scenarios = [
+            {"city": "Tokyo", "num_days": 7, "num_travelers": 2, "travel_style": "mid",
+             "month": 4, "include_flights": True, "shopping_budget": 200},
+            {"city": "Kyoto", "num_days": 10, "num_travelers": 1, "travel_style": "luxury",
+             "month": 11, "include_flights": False, "shopping_budget": 50},
+        ]
+        response = client.post("/api/budget/batch", json={"scenarios": scenarios})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 2
+        for scenario, result in zip(scenarios, data["results"]):
+            single = client.post("/api/budget", json=scenario).json()
+            assert result["breakdown"] == single["breakdown"]
+            assert result["season"] == single["season"]
+
+    def test_calculate_budget_batch_invalid_scenario(self):
+        response = client.post("/api/budget/batch", json={"scenarios": [
+            {"city": "Tokyo", "num_days": 7, "num_travelers": 2, "month": 4},
+            {"city": "InvalidCity", "num_days": 7, "num_travelers": 2, "month": 4},
+        ]})
+        assert response.status_code == 400
+        assert "Scenario 1" in response.json()["detail"]
+
+    def test_calculate_budget_batch_rejects_single_only_options(self):
+        for option in ({"currency": "USD"}, {"include_uncertainty": True}, {"as_of": "2025-06-05"}):
+            response = client.post("/api/budget/batch", json={"scenarios": [
+                {"city": "Tokyo", "num_days": 7, "num_travelers": 2, "month": 4, **option},
+            ]})
+            assert response.status_code == 422
+
+    def test_budget_sweep(self):
+        response = client.post("/api/budget/sweep", json={
+            "city": "Tokyo",
+            "num_travelers": 2,
+            "travel_style": "mid",
+            "min_days": 3,
+            "max_days": 10,
+            "target_total": 5000
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["totals"]) == 12
+        assert all(len(row) == 8 for row in data["totals"])
+        assert all(w["total"] <= 5000 for w in data["cheapest_windows"])
+        assert len(data["climate"]) == 12
+        assert "compute_time_ms" in data
+
+    def test_budget_sweep_invalid_range(self):
+        response = client.post("/api/budget/sweep", json={
+            "city": "Tokyo", "num_travelers": 1, "min_days": 10, "max_days": 5
+        })
+        assert response.status_code == 400
+
+    def test_calculate_itinerary(self):
+        response = client.post("/api/budget/itinerary", json={
+            "legs": [
+                {"city": "Tokyo", "nights": 4},
+                {"city": "Kyoto", "nights": 3},
+                {"city": "Osaka", "nights": 2, "month": 5}
+            ],
+            "num_travelers": 2,
+            "travel_style": "mid",
+            "month": 4
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["legs"]) == 3
+        assert data["total_nights"] == 9
+        assert data["legs"][0]["transfer_cost"] == 0
+        assert data["legs"][2]["climate"]["temp_high"] == 25
+        assert data["intercity_transport"] > 0
+        assert data["breakdown"]["total"] > 0
+
+    def test_calculate_itinerary_invalid_city(self):
+        response = client.post("/api/budget/itinerary", json={
+            "legs": [{"city": "Tokyo", "nights": 2}, {"city": "Atlantis", "nights": 2}],
+            "num_travelers": 1,
+            "month": 4
+        })
+        assert response.status_code == 400
+
+    def test_optimize_trip(self):
+        response = client.post("/api/budget/optimize", json={
+            "max_total": 5000,
+            "num_travelers": 2,
+            "cities": ["Tokyo", "Osaka"],
+            "earliest_month": 11,
+            "latest_month": 2,
+            "min_days": 3,
+            "max_days": 21,
+            "limit": 5
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert 0 < len(data["candidates"]) <= 5
+        assert all(c["month"] in [11, 12, 1, 2] for c in data["candidates"])
+        assert all(c["total"] <= 5000 for c in data["candidates"])
+        assert data["candidates_evaluated"] > 0
+        assert "search_time_ms" in data
+
     def test_newsletter_subscribe(self):
         response = client.post("/api/newsletter", json={
             "email": "test@example.com"
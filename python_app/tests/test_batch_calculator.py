@@ -0,0 +1,68 @@
+import itertools
+import pytest
+from python_app.domain.cost_calculator import CostCalculator, CostBreakdown
+from python_app.domain.batch_calculator import BatchCostCalculator, round_array
+
+CITIES = ["Tokyo", "osaka", "kyoto", "hokkaido", "okinawa", "Fukuoka", "unknown_city"]
+STYLES = ["budget", "mid", "luxury", "unknown"]
+
+
+class TestBatchCostCalculator:
+    def setup_method(self):
+        self.exchange_rate = 0.0082
+        self.calculator = CostCalculator(self.exchange_rate)
+        self.batch_calculator = BatchCostCalculator(self.exchange_rate)
+
+    def _scenarios(self):
+        return list(itertools.product(
+            CITIES, STYLES, range(1, 13), [1, 3, 7, 14, 90], [1, 2, 5, 20], [True, False], [0.0, 200.0, 333.33]
+        ))
+
+    def test_matches_scalar_calculator(self):
+        scenarios = self._scenarios()
+        batch = self.batch_calculator.calculate_budgets(
+            cities=[s[0] for s in scenarios],
+            travel_styles=[s[1] for s in scenarios],
+            months=[s[2] for s in scenarios],
+            num_days=[s[3] for s in scenarios],
+            num_travelers=[s[4] for s in scenarios],
+            include_flights=[s[5] for s in scenarios],
+            shopping_budgets=[s[6] for s in scenarios],
+        )
+        breakdowns = batch.breakdowns()
+        assert len(breakdowns) == len(scenarios)
+        
+        for (city, style, month, days, travelers, flights, shopping), breakdown in zip(scenarios, breakdowns):
+            expected = self.calculator.calculate_budget(
+                city=city,
+                num_days=days,
+                num_travelers=travelers,
+                travel_style=style,
+                month=month,
+                include_flights=flights,
+                shopping_budget=shopping
+            )
+            assert breakdown == expected
+
+    def test_breakdowns_are_cost_breakdowns(self):
+        batch = self.batch_calculator.calculate_budgets(
+            cities=["tokyo"], num_days=[7], num_travelers=[2], travel_styles=["mid"],
+            months=[4], include_flights=[True], shopping_budgets=[200.0]
+        )
+        assert len(batch) == 1
+        assert isinstance(batch.breakdowns()[0], CostBreakdown)
+
+    def test_convert_to_jpy_matches_scalar(self):
+        totals = [0.0, 100.0, 1234.56, 9876.54, 0.5]
+        converted = self.batch_calculator.convert_to_jpy(totals).tolist()
+        assert converted == [self.calculator.convert_to_jpy(t) for t in totals]
+
+    def test_convert_to_jpy_zero_rate(self):
+        calculator = BatchCostCalculator(0)
+        assert calculator.convert_to_jpy([100.0]).tolist() == [0.0]
+
+    def test_round_array_matches_builtin_round(self):
+        values = [0.125, 0.375, 2.675, 1.005, 1234.565, 99999.995, 0.0, 7.0 / 3.0, 0.5, 1.5, 2.5]
+        values += [n * 0.005 for n in range(20000)]
+        assert round_array(values, 2).tolist() == [round(v, 2) for v in values]
+        assert round_array(values, 0).tolist() == [round(v, 0) for v in values]
@@ -0,0 +1,44 @@
+import pytest
+from python_app.domain.cost_calculator import CostCalculator
+from python_app.domain.budget_grid import BudgetGrid, get_budget_grid
+from python_app.domain.seasonality import get_season
+
+
+class TestBudgetGrid:
+    def setup_method(self):
+        self.exchange_rate = 0.0082
+        self.grid = BudgetGrid(self.exchange_rate)
+        self.calculator = CostCalculator(self.exchange_rate)
+
+    def test_lookup_matches_calculator(self):
+        expected = self.calculator.calculate_budget(
+            city="kyoto", num_days=10, num_travelers=2, travel_style="luxury", month=11
+        )
+        actual = self.grid.lookup(
+            city="kyoto", num_days=10, num_travelers=2, travel_style="luxury", month=11
+        )
+        assert actual == expected
+
+    def test_self_check_sample(self):
+        mismatches = self.grid.self_check(
+            cities=["Tokyo", "Osaka", "Kyoto", "Hokkaido", "Okinawa", "Fukuoka", "Nara"],
+            days=[1, 2, 7, 30, 89, 90],
+            travelers=[1, 3, 20],
+            shopping_budgets=[0.0, 200.0, 123.45],
+        )
+        assert mismatches == []
+
+    def test_season_matches_get_season(self):
+        for month in range(0, 14):
+            assert self.grid.season(month) == get_season(month)
+
+    def test_convert_to_jpy_matches_calculator(self):
+        assert self.grid.convert_to_jpy(1234.56) == self.calculator.convert_to_jpy(1234.56)
+        assert BudgetGrid(0).convert_to_jpy(100) == 0.0
+
+    def test_get_budget_grid_rebuilds_on_rate_change(self):
+        grid = get_budget_grid(0.0081)
+        assert get_budget_grid(0.0081) is grid
+        rebuilt = get_budget_grid(0.0090)
+        assert rebuilt is not grid
+        assert rebuilt.exchange_rate == 0.0090
@@ -0,0 +1,114 @@
+import json
+import pytest
+import httpx
+from python_app.services.chat_cache import ChatResponseCache, cache_key, normalize_message
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestChatResponseCache:
+    def test_normalize_message(self):
+        assert normalize_message("  Is the JR Pass   worth it?? ") == "is the jr pass worth it"
+        assert cache_key("JR Pass worth it?") == cache_key("jr pass worth it")
+
+    def test_history_changes_key(self):
+        history = [{"role": "user", "content": "I'm vegetarian"}]
+        assert cache_key("Where to eat?", history) != cache_key("Where to eat?")
+        assert cache_key("Where to eat?", history) == cache_key("where to eat", [{"role": "user", "content": "i'm vegetarian."}])
+
+    def test_lru_eviction(self):
+        cache = ChatResponseCache(max_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        assert cache.get("a") == "1"
+        cache.put("c", "3")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = ChatResponseCache(ttl_seconds=60, clock=clock)
+        cache.put("a", "1")
+        clock.now += 59
+        assert cache.get("a") == "1"
+        clock.now += 1
+        assert cache.get("a") is None
+        assert cache.get_stats()["expirations"] == 1
+        assert cache.get_stats()["entries"] == 0
+
+    def test_stats_track_hits_and_memory(self):
+        cache = ChatResponseCache()
+        cache.put("a", "x" * 1000)
+        cache.get("a")
+        cache.get("missing")
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+        assert stats["memory_bytes"] > 1000
+        cache.clear()
+        assert cache.get_stats()["memory_bytes"] == 0
+
+    def test_disabled_cache(self):
+        cache = ChatResponseCache(ttl_seconds=0)
+        cache.put("a", "1")
+        assert cache.get("a") is None
+        assert cache.get_stats()["enabled"] is False
+
+
+class TestChatServiceCaching:
+    @pytest.fixture
+    def service(self, make_chat_service):
+        self.calls = []
+
+        def handler(request):
+            body = json.loads(request.content)
+            self.calls.append(body)
+            if body.get("stream"):
+                return httpx.Response(200, content=(
+                    'data: {"choices": [{"delta": {"content": "Yes, "}}]}\n\n'
+                    'data: {"choices": [{"delta": {"content": "often."}}]}\n\n'
+                    "data: [DONE]\n\n"
+                ).encode())
+            return httpx.Response(200, json={"choices": [{"message": {"content": "Yes, often."}}]})
+
+        return make_chat_service(handler, cache=ChatResponseCache())
+
+    @pytest.mark.asyncio
+    async def test_repeated_question_hits_cache(self, service):
+        first = await service.send_message("JR Pass worth it?")
+        second = await service.send_message("jr pass worth it")
+        assert first == second == "Yes, often."
+        assert len(self.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_opt_out_bypasses_cache(self, service):
+        await service.send_message("JR Pass worth it?", use_cache=False)
+        await service.send_message("JR Pass worth it?", use_cache=False)
+        assert len(self.calls) == 2
+        assert service.cache.get_stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_fills_and_reads_cache(self, service):
+        tokens = [t async for t in service.stream_message("Best time for cherry blossoms?")]
+        assert tokens == ["Yes, ", "often."]
+        assert await service.send_message("best time for cherry blossoms") == "Yes, often."
+        replay = [t async for t in service.stream_message("Best time for cherry blossoms")]
+        assert replay == ["Yes, often."]
+        assert len(self.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_repeats_never_reach_upstream(self, service):
+        await service.send_message("Tax-free shopping?")
+        for _ in range(1000):
+            await service.send_message("Tax-free shopping?")
+        assert len(self.calls) == 1
+        stats = service.cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1000, 1)
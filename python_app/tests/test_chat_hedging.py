@@ -0,0 +1,174 @@
+import asyncio
+import json
+import pytest
+import httpx
+from python_app.services.chat import ChatService
+from python_app.services.chat_cache import ChatResponseCache
+from python_app.services.chat_scheduler import ChatScheduler
+from python_app.services.model_latency import ModelLatencyStats
+
+
+class ScriptedUpstream:
+    """Stand-in for the chat API: each model replies after the next scripted delay, or fails with a status."""
+
+    def __init__(self, script):
+        self.script = {model: list(steps) for model, steps in script.items()}
+        self.calls = []
+        self.cancelled = []
+
+    async def __call__(self, request):
+        model = json.loads(request.content)["model"]
+        self.calls.append(model)
+        steps = self.script[model]
+        step = steps.pop(0) if len(steps) > 1 else steps[0]
+        delay, status = step if isinstance(step, tuple) else (step, 200)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        if status != 200:
+            return httpx.Response(status)
+        return httpx.Response(200, json={"choices": [{"message": {"content": f"from {model}"}}]})
+
+
+@pytest.fixture
+def make_service(make_chat_service):
+    def make(upstream, hedge_delay=0.05, scheduler=None, latency=None):
+        return make_chat_service(
+            upstream,
+            cache=ChatResponseCache(max_entries=0),
+            scheduler=scheduler or ChatScheduler(max_concurrent=4, max_queue=4, queue_timeout=5),
+            models=["primary", "backup"],
+            hedge_delay=hedge_delay,
+            latency=latency or ModelLatencyStats(min_samples=3),
+        )
+    return make
+
+
+class TestHedgedRequests:
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self, make_service):
+        upstream = ScriptedUpstream({"primary": [0.01], "backup": [0.01]})
+        service = make_service(upstream)
+        assert await service.send_message("Hi") == "from primary"
+        assert upstream.calls == ["primary"]
+        assert service.hedged == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged_and_cancelled(self, make_service):
+        upstream = ScriptedUpstream({"primary": [1.0], "backup": [0.01]})
+        service = make_service(upstream)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        assert await service.send_message("Hi") == "from backup"
+        assert loop.time() - started < 0.5
+        await asyncio.sleep(0)
+        assert upstream.calls == ["primary", "backup"]
+        assert upstream.cancelled == ["primary"]
+        assert (service.hedged, service.hedge_wins) == (1, 1)
+        assert service.scheduler.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_abandoned_primary_is_recorded_as_slow(self, make_service):
+        upstream = ScriptedUpstream({"primary": [1.0], "backup": [0.01]})
+        service = make_service(upstream)
+        for i in range(3):
+            assert await service.send_message(f"Hi {i}") == "from backup"
+        primary = service.latency.get_stats()["primary"]
+        assert (primary["samples"], primary["failures"]) == (3, 0)
+        # Lower bounds at the hedge delay keep p95 from collapsing to the calls that beat it.
+        assert primary["p95_ms"] >= 50
+        assert service.hedge_delay_for("primary") == 0.05
+
+    @pytest.mark.asyncio
+    async def test_primary_wins_after_hedge(self, make_service):
+        upstream = ScriptedUpstream({"primary": [0.1], "backup": [1.0]})
+        service = make_service(upstream)
+        assert await service.send_message("Hi") == "from primary"
+        await asyncio.sleep(0)
+        assert upstream.cancelled == ["backup"]
+        assert (service.hedged, service.hedge_wins) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_hedge_survives_one_failure(self, make_service):
+        upstream = ScriptedUpstream({"primary": [(0.1, 502)], "backup": [0.2]})
+        service = make_service(upstream)
+        assert await service.send_message("Hi") == "from backup"
+
+    @pytest.mark.asyncio
+    async def test_early_failure_falls_back(self, make_service):
+        upstream = ScriptedUpstream({"primary": [(0.0, 503)], "backup": [0.01]})
+        service = make_service(upstream, hedge_delay=1.0)
+        assert await service.send_message("Hi") == "from backup"
+        assert service.fallbacks == 1
+        assert service.latency.success_rate("primary") == 0.0
+
+    @pytest.mark.asyncio
+    async def test_both_failing_raises(self, make_service):
+        upstream = ScriptedUpstream({"primary": [(0.1, 500)], "backup": [(0.1, 502)]})
+        service = make_service(upstream)
+        with pytest.raises(ValueError, match="Chat service error"):
+            await service.send_message("Hi")
+        assert service.scheduler.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_spare_capacity(self, make_service):
+        upstream = ScriptedUpstream({"primary": [0.15], "backup": [0.01]})
+        service = make_service(upstream, scheduler=ChatScheduler(max_concurrent=1, max_queue=4, queue_timeout=5))
+        assert await service.send_message("Hi") == "from primary"
+        assert upstream.calls == ["primary"]
+        assert service.hedged == 0
+
+    @pytest.mark.asyncio
+    async def test_hedging_disabled(self, make_service):
+        upstream = ScriptedUpstream({"primary": [0.1], "backup": [0.01]})
+        service = make_service(upstream, hedge_delay=0)
+        assert await service.send_message("Hi") == "from primary"
+        assert upstream.calls == ["primary"]
+
+
+class TestLatencyRouting:
+    def test_ranking_needs_evidence(self):
+        stats = ModelLatencyStats(min_samples=3)
+        assert stats.ranked(["primary", "backup"]) == ["primary", "backup"]
+        for _ in range(3):
+            stats.record("backup", 0.2)
+        assert stats.ranked(["primary", "backup"]) == ["backup", "primary"]
+        for _ in range(3):
+            stats.record("primary", 0.5)
+        assert stats.ranked(["primary", "backup"]) == ["backup", "primary"]
+
+    def test_failures_demote_a_model(self):
+        stats = ModelLatencyStats(min_samples=3)
+        for _ in range(3):
+            stats.record("primary", 0.2)
+            stats.record("backup", 0.3)
+        assert stats.ranked(["primary", "backup"])[0] == "primary"
+        for _ in range(6):
+            stats.record_failure("primary")
+        assert stats.ranked(["primary", "backup"])[0] == "backup"
+
+    @pytest.mark.asyncio
+    async def test_routing_follows_observed_latency(self, make_service):
+        latency = ModelLatencyStats(min_samples=3)
+        for _ in range(3):
+            latency.record("primary", 2.0)
+            latency.record("backup", 0.1)
+        upstream = ScriptedUpstream({"primary": [0.01], "backup": [0.01]})
+        service = make_service(upstream, hedge_delay=1.0, latency=latency)
+        assert await service.send_message("Hi") == "from backup"
+        assert upstream.calls == ["backup"]
+
+    def test_hedge_delay_tracks_p95(self):
+        latency = ModelLatencyStats(min_samples=3)
+        service = ChatService(models=["primary"], hedge_delay=3.0, latency=latency)
+        assert service.hedge_delay_for("primary") == 3.0
+        for seconds in (0.4, 0.5, 0.6):
+            latency.record("primary", seconds)
+        assert 0.5 < service.hedge_delay_for("primary") <= 0.6
+        for _ in range(3):
+            latency.record("primary", 10.0)
+        assert service.hedge_delay_for("primary") == 3.0
+        stats = service.get_upstream_stats()
+        assert stats["latency"]["primary"]["samples"] == 6
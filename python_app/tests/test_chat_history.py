@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+import pytest
+import httpx
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from python_app.api import routes
+from python_app.db.models import ChatMessage, ChatSession
+from python_app.main import app
+from python_app.services.chat_cache import ChatResponseCache
+from python_app.services.chat_history import ChatHistoryStore
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    ChatSession.metadata.create_all(engine, tables=[ChatSession.__table__, ChatMessage.__table__])
+    return sessionmaker(bind=engine)
+
+
+class TestChatHistoryStore:
+    @pytest.mark.asyncio
+    async def test_append_then_load_from_memory(self, session_factory):
+        store = ChatHistoryStore(session_factory=session_factory)
+        store.append("s1", "user", "Hi")
+        store.append("s1", "assistant", "Hello!")
+        assert await store.load("s1") == [
+            {"role": "user", "content": "Hi"},
+            {"role": "assistant", "content": "Hello!"},
+        ]
+        assert store.get_stats()["hits"] == 1
+        assert store.get_stats()["pending_writes"] == 2
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_one_batch(self, session_factory):
+        store = ChatHistoryStore(session_factory=session_factory)
+        for i in range(3):
+            store.append("s1", "user", f"q{i}")
+            store.append("s2", "user", f"p{i}")
+        assert await store.flush() == 6
+        db = session_factory()
+        assert db.query(ChatSession).count() == 2
+        assert db.query(ChatMessage).count() == 6
+        db.close()
+
+        store.append("s1", "assistant", "a")
+        assert await store.flush() == 1
+        db = session_factory()
+        assert db.query(ChatSession).count() == 2
+        db.close()
+
+    @pytest.mark.asyncio
+    async def test_cold_load_reads_database(self, session_factory):
+        writer = ChatHistoryStore(session_factory=session_factory)
+        for i in range(5):
+            writer.append("s1", "user", f"m{i}")
+        await writer.flush()
+
+        reader = ChatHistoryStore(session_factory=session_factory, max_messages=3)
+        assert [m["content"] for m in await reader.load("s1")] == ["m2", "m3", "m4"]
+        assert reader.get_stats()["misses"] == 1
+        assert await reader.load("unknown") == []
+
+    @pytest.mark.asyncio
+    async def test_evicted_session_keeps_pending_writes(self, session_factory):
+        store = ChatHistoryStore(session_factory=session_factory, max_sessions=1)
+        store.append("s1", "user", "first")
+        store.append("s2", "user", "other")
+        assert store.get_stats()["hot_sessions"] == 1
+        assert await store.load("s1") == [{"role": "user", "content": "first"}]
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_is_retried(self, session_factory):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("database down")
+            return session_factory()
+
+        store = ChatHistoryStore(session_factory=flaky)
+        store.append("s1", "user", "hi")
+        assert await store.flush() == 0
+        assert store.get_stats()["pending_writes"] == 1
+        assert await store.flush() == 1
+
+    @pytest.mark.asyncio
+    async def test_load_during_flush_sees_in_flight_rows(self, session_factory):
+        started, release = threading.Event(), threading.Event()
+
+        class SlowStore(ChatHistoryStore):
+            def _write(self, batch):
+                started.set()
+                release.wait(5)
+                super()._write(batch)
+
+        store = SlowStore(session_factory=session_factory, max_sessions=1)
+        store.append("s1", "user", "hi")
+        store.append("s2", "user", "evicts s1")
+        flush = asyncio.create_task(store.flush())
+        await asyncio.to_thread(started.wait, 5)
+
+        load = asyncio.create_task(store.load("s1"))
+        await asyncio.sleep(0.05)
+        release.set()
+        assert await load == [{"role": "user", "content": "hi"}]
+        assert await flush == 2
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending(self, session_factory):
+        store = ChatHistoryStore(session_factory=session_factory, flush_interval=60)
+        await store.start()
+        store.append("s1", "user", "bye")
+        await store.stop()
+        db = session_factory()
+        assert db.query(ChatMessage).count() == 1
+        db.close()
+
+    @pytest.mark.asyncio
+    async def test_without_database_is_memory_only(self):
+        store = ChatHistoryStore()
+        assert store.session_factory is None
+        store.append("s1", "user", "hi")
+        assert await store.load("s1") == [{"role": "user", "content": "hi"}]
+        assert store.get_stats()["pending_writes"] == 0
+
+
+class TestChatEndpointHistory:
+    def test_follow_up_uses_server_history(self, session_factory, monkeypatch, make_chat_service):
+        sent = []
+
+        def handler(request):
+            body = json.loads(request.content)
+            sent.append(body["messages"])
+            return httpx.Response(200, json={"choices": [{"message": {"content": f"<b>reply {len(sent)}</b>"}}]})
+
+        monkeypatch.setattr(routes, "chat_service", make_chat_service(handler, cache=ChatResponseCache()))
+        monkeypatch.setattr(routes, "chat_history", ChatHistoryStore(session_factory=session_factory))
+
+        client = TestClient(app, headers={"x-forwarded-for": "203.0.113.17"})
+        first = client.post("/api/chat", json={"message": "<i>Hi</i>", "session_id": "trip-1"})
+        second = client.post("/api/chat", json={"message": "And Kyoto?", "session_id": "trip-1"})
+        assert first.status_code == second.status_code == 200
+        assert [m["content"] for m in sent[1][1:]] == ["Hi", "reply 1", "And Kyoto?"]
@@ -0,0 +1,133 @@
+import asyncio
+import pytest
+import httpx
+from fastapi.testclient import TestClient
+from python_app.api import routes
+from python_app.main import app
+from python_app.services.chat_cache import ChatResponseCache
+from python_app.services.chat_scheduler import ChatScheduler, ChatBusyError
+
+
+class FakeUpstream:
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def __call__(self, request):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.active -= 1
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+
+@pytest.fixture
+def make_service(make_chat_service):
+    def make(upstream, scheduler):
+        return make_chat_service(upstream, cache=ChatResponseCache(max_entries=0), scheduler=scheduler)
+    return make
+
+
+class TestChatScheduler:
+    @pytest.mark.asyncio
+    async def test_concurrency_cap(self, make_service):
+        upstream = FakeUpstream(latency=0.05)
+        scheduler = ChatScheduler(max_concurrent=3, max_queue=20, queue_timeout=5)
+        service = make_service(upstream, scheduler)
+
+        replies = await asyncio.gather(*(service.send_message(f"q{i}") for i in range(12)))
+
+        assert replies == ["ok"] * 12
+        assert upstream.peak == 3
+        stats = scheduler.get_stats()
+        assert stats["admitted"] == 12
+        assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+        assert stats["max_wait_ms"] > 0
+        assert stats["avg_service_ms"] >= 40
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_fast(self, make_service):
+        upstream = FakeUpstream(latency=0.2)
+        scheduler = ChatScheduler(max_concurrent=1, max_queue=1, queue_timeout=5)
+        service = make_service(upstream, scheduler)
+
+        running = [asyncio.create_task(service.send_message(f"q{i}")) for i in range(2)]
+        await asyncio.sleep(0.01)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        with pytest.raises(ChatBusyError):
+            await service.send_message("overflow")
+        assert loop.time() - started < 0.05
+
+        assert await asyncio.gather(*running) == ["ok", "ok"]
+        assert scheduler.get_stats()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout(self):
+        scheduler = ChatScheduler(max_concurrent=1, max_queue=5, queue_timeout=0.05)
+        await scheduler.acquire()
+        with pytest.raises(ChatBusyError):
+            await scheduler.acquire()
+        assert scheduler.timed_out == 1
+        assert scheduler.queue_depth == 0
+        scheduler.release()
+        assert scheduler.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_deadline_aware_admission(self):
+        scheduler = ChatScheduler(max_concurrent=1, max_queue=10, queue_timeout=1.0)
+        async with scheduler.slot():
+            pass
+        scheduler._service_time = 0.5
+        await scheduler.acquire()
+
+        waiter = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 1
+        # Second in line would wait ~1s for a slot, which exceeds its 0.8s deadline.
+        with pytest.raises(ChatBusyError):
+            await scheduler.acquire(timeout=0.8)
+        assert scheduler.rejected == 1
+
+        scheduler.release()
+        await waiter
+        assert scheduler.in_flight == 1
+        scheduler.release()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_frees_its_place(self):
+        scheduler = ChatScheduler(max_concurrent=1, max_queue=5, queue_timeout=5)
+        await scheduler.acquire()
+        waiter = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert scheduler.queue_depth == 0
+        scheduler.release()
+        assert scheduler.in_flight == 0
+
+
+class TestChatSchedulerRoutes:
+    def test_busy_returns_503(self, monkeypatch, make_service):
+        scheduler = ChatScheduler(max_concurrent=1, max_queue=0, queue_timeout=1)
+        service = make_service(FakeUpstream(), scheduler)
+        monkeypatch.setattr(routes, "chat_service", service)
+        scheduler._in_flight = 1
+
+        client = TestClient(app)
+        response = client.post("/api/chat", json={"message": "Is the JR Pass worth it?", "cache": False})
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+
+        response = client.post("/api/chat/stream", json={"message": "Is the JR Pass worth it?", "cache": False})
+        assert response.status_code == 503
+
+        stats = client.get("/api/health/chat-scheduler").json()
+        assert stats["rejected"] == 2
+        assert stats["in_flight"] == 1
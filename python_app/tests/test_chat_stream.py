@@ -0,0 +1,116 @@
+import json
+import pytest
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from python_app.api import routes
+from python_app.main import app
+from python_app.middleware.security import RateLimitMiddleware
+
+
+def sse_body(tokens, done=True):
+    lines = [
+        "data: " + json.dumps({"choices": [{"delta": {"content": t}}]}) + "\n\n" for t in tokens
+    ]
+    lines.insert(0, ": OPENROUTER PROCESSING\n\n")
+    if done:
+        lines.append("data: [DONE]\n\n")
+    return "".join(lines).encode()
+
+
+def parse_events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        event, data = "message", None
+        for line in block.split("\n"):
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: "):
+                data = json.loads(line[6:])
+        events.append((event, data))
+    return events
+
+
+class TestChatServiceStreaming:
+    @pytest.mark.asyncio
+    async def test_stream_message_yields_tokens(self, make_chat_service):
+        requests = []
+
+        def handler(request):
+            requests.append(json.loads(request.content))
+            return httpx.Response(200, content=sse_body(["Kon", "nichiwa", "!"]),
+                                  headers={"content-type": "text/event-stream"})
+
+        service = make_chat_service(handler)
+        tokens = [t async for t in service.stream_message("Hello", history=[{"role": "user", "content": "Hi"}])]
+        assert tokens == ["Kon", "nichiwa", "!"]
+        assert requests[0]["stream"] is True
+        assert [m["role"] for m in requests[0]["messages"]] == ["system", "user", "user"]
+
+    @pytest.mark.asyncio
+    async def test_stream_message_upstream_error(self, make_chat_service):
+        service = make_chat_service(lambda request: httpx.Response(502))
+        with pytest.raises(ValueError, match="502"):
+            [t async for t in service.stream_message("Hello")]
+
+    @pytest.mark.asyncio
+    async def test_stream_message_requires_api_key(self, make_chat_service):
+        service = make_chat_service(lambda request: httpx.Response(200))
+        service.api_key = None
+        with pytest.raises(ValueError, match="not configured"):
+            [t async for t in service.stream_message("Hello")]
+
+
+class TestChatStreamEndpoint:
+    @pytest.fixture(autouse=True)
+    def chat_service(self, monkeypatch, make_chat_service):
+        self.requests = []
+
+        def handler(request):
+            self.requests.append(json.loads(request.content))
+            return httpx.Response(200, content=sse_body(["Try ", "Kyoto."]))
+
+        monkeypatch.setattr(routes, "chat_service", make_chat_service(handler))
+        self.client = TestClient(app, headers={"x-forwarded-for": "203.0.113.15"})
+
+    def test_streams_sse_events(self):
+        response = self.client.post("/api/chat/stream", json={
+            "message": "<b>Where</b> should I go?", "session_id": "abc-123"
+        })
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_events(response.text)
+        assert events[:2] == [("message", {"content": "Try "}), ("message", {"content": "Kyoto."})]
+        assert events[-1] == ("done", {"session_id": "abc-123"})
+        assert self.requests[0]["messages"][-1]["content"] == "Where should I go?"
+
+    def test_validates_like_chat(self):
+        response = self.client.post("/api/chat/stream", json={"message": "hi", "session_id": "bad id!"})
+        assert response.status_code == 400
+
+    def test_upstream_failure_before_first_token(self, monkeypatch, make_chat_service):
+        monkeypatch.setattr(routes, "chat_service", make_chat_service(lambda request: httpx.Response(503)))
+        response = self.client.post("/api/chat/stream", json={"message": "hi"})
+        assert response.status_code == 500
+
+    def test_upstream_failure_mid_stream(self, monkeypatch, make_chat_service):
+        body = sse_body(["Partial"], done=False) + b'data: {"error": {"message": "overloaded"}}\n\n'
+        monkeypatch.setattr(routes, "chat_service", make_chat_service(lambda request: httpx.Response(200, content=body)))
+        response = self.client.post("/api/chat/stream", json={"message": "hi"})
+        events = parse_events(response.text)
+        assert events[0] == ("message", {"content": "Partial"})
+        assert events[-1][0] == "error"
+        assert "overloaded" in events[-1][1]["error"]
+
+
+class TestChatStreamRateLimit:
+    def test_stream_path_counts_as_chat(self):
+        limited = FastAPI()
+        limited.add_middleware(RateLimitMiddleware, requests_per_minute=100, chat_requests_per_minute=2)
+
+        @limited.post("/api/chat/stream")
+        async def stream():
+            return {"ok": True}
+
+        client = TestClient(limited)
+        assert [client.post("/api/chat/stream").status_code for _ in range(3)] == [200, 200, 429]
@@ -0,0 +1,74 @@
+import pytest
+import numpy as np
+from datetime import date
+from python_app.domain.climate import ClimateStore, CITY_CLIMATE, get_climate_store
+from python_app.domain.seasonality import get_weather_info
+
+
+class TestClimateStore:
+    def setup_method(self):
+        self.store = get_climate_store()
+
+    def test_covers_all_cities(self):
+        assert self.store.values.shape == (len(CITY_CLIMATE), 12, 3)
+        assert all(len(d) == 12 for d in self.store.descriptions)
+
+    def test_values_are_read_only(self):
+        with pytest.raises(ValueError):
+            self.store.values[0, 0, 0] = 99
+
+    def test_info_matches_weather_info(self):
+        for city in CITY_CLIMATE:
+            for month in range(1, 13):
+                info = self.store.info(city, month)
+                weather = get_weather_info(city, month)
+                assert weather["temp_low"] == info.temp_low
+                assert weather["temp_high"] == info.temp_high
+                assert weather["rainfall"] == info.rainfall
+                assert weather["description"] == info.description
+
+    def test_unknown_city_and_month_fall_back(self):
+        assert self.store.info("atlantis", 5) == self.store.info("tokyo", 5)
+        assert self.store.info("kyoto", 13) == self.store.info("kyoto", 1)
+
+    def test_batch_query_matches_scalar(self):
+        cities = ["Tokyo", "Hokkaido", "Okinawa"]
+        months = [1, 7, 12]
+        values = self.store.query(cities, months)
+        assert values.shape == (3, 3)
+        for row, city, month in zip(values, cities, months):
+            info = self.store.info(city, month)
+            assert row.tolist() == [info.temp_low, info.temp_high, info.rainfall]
+
+    def test_batch_query_broadcasts(self):
+        values = self.store.query(["osaka", "nara"], np.arange(1, 13)[:, None])
+        assert values.shape == (12, 2, 3)
+        assert values[7, 1].tolist() == self.store.query("nara", 8).tolist()
+
+    def test_infos_batch(self):
+        infos = self.store.infos(["tokyo", "kyoto"], [4, 11])
+        assert infos[0] == self.store.info("tokyo", 4)
+        assert infos[1] == self.store.info("kyoto", 11)
+
+    def test_interpolate_at_midpoint_equals_month(self):
+        values = self.store.interpolate("tokyo", [105])
+        assert values[0].tolist() == self.store.query("tokyo", 4).tolist()
+
+    def test_interpolate_between_months(self):
+        low = self.store.interpolate("hokkaido", [90])[0, 0]
+        assert self.store.query("hokkaido", 3)[0] < low < self.store.query("hokkaido", 4)[0]
+
+    def test_interpolate_wraps_new_year(self):
+        values = self.store.interpolate(["tokyo", "tokyo"], [1, 365])
+        jan, dec = self.store.query("tokyo", 1), self.store.query("tokyo", 12)
+        for row in values:
+            assert min(jan[0], dec[0]) <= row[0] <= max(jan[0], dec[0])
+
+    def test_interpolate_dates(self):
+        values = self.store.interpolate_dates("okinawa", [date(2025, 7, 16), date(2024, 12, 31)])
+        assert values.shape == (2, 3)
+        assert values[0, 1] == pytest.approx(32.0, abs=0.1)
+
+    def test_custom_store_generates_descriptions(self):
+        store = ClimateStore({"sapporo": CITY_CLIMATE["hokkaido"]}, city_descriptions={})
+        assert store.info("sapporo", 1).description == "Freezing with snow"
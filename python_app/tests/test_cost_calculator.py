@@ -1,4 +1,5 @@
 import pytest
+from datetime import date
 from python_app.domain.cost_calculator import CostCalculator, CostBreakdown
 
 class TestCostCalculator:
@@ -121,3 +122,47 @@ class TestCostCalculator:
         )
         
         assert breakdown.total > 0
+
+    def test_calculate_budget_for_dates_outside_holidays_matches_month(self):
+        by_dates = self.calculator.calculate_budget_for_dates(
+            city="tokyo",
+            departure_date=date(2025, 9, 8),
+            return_date=date(2025, 9, 15),
+            num_travelers=2,
+            travel_style="mid"
+        )
+        by_month = self.calculator.calculate_budget(
+            city="tokyo",
+            num_days=7,
+            num_travelers=2,
+            travel_style="mid",
+            month=9
+        )
+        assert by_dates == by_month
+
+    def test_calculate_budget_for_dates_spanning_year_end(self):
+        breakdown = self.calculator.calculate_budget_for_dates(
+            city="kyoto",
+            departure_date=date(2025, 12, 26),
+            return_date=date(2026, 1, 5),
+            num_travelers=1,
+            travel_style="mid"
+        )
+        by_month = self.calculator.calculate_budget(
+            city="kyoto",
+            num_days=10,
+            num_travelers=1,
+            travel_style="mid",
+            month=12
+        )
+        assert breakdown.accommodation > by_month.accommodation
+
+    def test_calculate_budget_for_dates_rejects_reversed_range(self):
+        with pytest.raises(ValueError):
+            self.calculator.calculate_budget_for_dates(
+                city="tokyo",
+                departure_date=date(2025, 5, 5),
+                return_date=date(2025, 5, 1),
+                num_travelers=1,
+                travel_style="mid"
+            )
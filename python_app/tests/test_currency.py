@@ -0,0 +1,42 @@
+import pytest
+import numpy as np
+from python_app.domain.cost_calculator import CostCalculator
+from python_app.domain.currency import RateMatrix, FALLBACK_RATES, DEFAULT_CURRENCIES
+
+
+class TestRateMatrix:
+    def setup_method(self):
+        self.matrix = RateMatrix.from_base_rates(
+            {"SGD": 1.0, "JPY": 110.0, "USD": 0.75, "EUR": 0.7}, ["SGD", "JPY", "USD", "EUR"]
+        )
+
+    def test_matrix_is_consistent(self):
+        assert self.matrix.rate("SGD", "JPY") == 110.0
+        assert self.matrix.rate("JPY", "SGD") == pytest.approx(1 / 110.0)
+        assert self.matrix.rate("USD", "EUR") == pytest.approx(0.7 / 0.75)
+        assert np.allclose(np.diag(self.matrix.rates), 1.0)
+
+    def test_missing_currency_is_dropped(self):
+        matrix = RateMatrix.from_base_rates({"SGD": 1.0, "JPY": 110.0}, ["SGD", "JPY", "XYZ"])
+        assert matrix.currencies == ["SGD", "JPY"]
+        assert not matrix.supports("XYZ")
+
+    def test_convert_all(self):
+        converted = self.matrix.convert_all([10.0, 20.0])
+        assert converted.shape == (2, 4)
+        assert converted[1].tolist() == pytest.approx([20.0, 2200.0, 15.0, 14.0])
+
+    def test_convert_breakdown(self):
+        breakdown = CostCalculator().calculate_budget("tokyo", 7, 2, "mid", 4)
+        converted = self.matrix.convert_breakdown(breakdown, "usd")
+        assert converted.total == round(breakdown.total * 0.75, 2)
+        assert converted.accommodation == round(breakdown.accommodation * 0.75, 2)
+
+    def test_convert_breakdown_to_yen_has_no_decimals(self):
+        breakdown = CostCalculator().calculate_budget("osaka", 3, 1, "budget", 9)
+        converted = self.matrix.convert_breakdown(breakdown, "JPY")
+        assert all(float(v).is_integer() for v in vars(converted).values())
+
+    def test_fallback_covers_defaults(self):
+        matrix = RateMatrix.from_base_rates(FALLBACK_RATES, DEFAULT_CURRENCIES)
+        assert matrix.currencies == DEFAULT_CURRENCIES
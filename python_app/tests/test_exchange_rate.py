@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime
+import pytest
+import httpx
+from python_app.services.rate_cache import SharedRateCache
+from python_app.domain.rate_history import RateHistory
+
+
+class TestExchangeRateRefresh:
+    @pytest.fixture(autouse=True)
+    def shared_cache(self, tmp_path, make_rate_service):
+        self.shared = SharedRateCache(str(tmp_path / "rates.bin"))
+        self.history = RateHistory(str(tmp_path / "history.bin"))
+        self.make_rate_service = make_rate_service
+
+    def make_service(self, handler):
+        return self.make_rate_service(handler, shared_cache=self.shared, history=self.history)
+
+    def expire(self, service):
+        snapshot = self.shared.read()
+        age = service.CACHE_DURATION.total_seconds()
+        self.shared.write(snapshot.rates, snapshot.fetched_at - age)
+        service._cached_time -= service.CACHE_DURATION
+
+    @pytest.mark.asyncio
+    async def test_concurrent_cold_requests_share_one_fetch(self):
+        calls = []
+
+        async def handler(request):
+            calls.append(request.url)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"rates": {"JPY": 100.0}})
+
+        service = self.make_service(handler)
+        results = await asyncio.gather(*[service.get_exchange_rate() for _ in range(20)])
+        assert len(calls) == 1
+        assert all(r["rate"] == pytest.approx(0.01) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_stale_rate_served_while_refreshing(self):
+        rates = iter([100.0, 50.0])
+
+        async def handler(request):
+            return httpx.Response(200, json={"rates": {"JPY": next(rates)}})
+
+        service = self.make_service(handler)
+        await service.get_exchange_rate()
+        self.expire(service)
+
+        stale = await service.get_exchange_rate()
+        assert stale["rate"] == pytest.approx(0.01)
+        assert stale["stale"] is True
+
+        await service._refresh_task
+        fresh = await service.get_exchange_rate()
+        assert fresh["rate"] == pytest.approx(0.02)
+        assert fresh["stale"] is False
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_last_known_good(self):
+        calls = []
+
+        async def handler(request):
+            calls.append(request.url)
+            if len(calls) == 1:
+                return httpx.Response(200, json={"rates": {"JPY": 100.0}})
+            return httpx.Response(503)
+
+        service = self.make_service(handler)
+        await service.get_exchange_rate()
+        self.expire(service)
+
+        await service.get_exchange_rate()
+        await service._refresh_task
+        for _ in range(5):
+            result = await service.get_exchange_rate()
+            assert result["rate"] == pytest.approx(0.01)
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_cold_failure_falls_back_and_backs_off(self):
+        calls = []
+
+        async def handler(request):
+            calls.append(request.url)
+            raise httpx.ConnectError("unreachable")
+
+        service = self.make_service(handler)
+        for _ in range(3):
+            result = await service.get_exchange_rate()
+            assert result["rate"] == service.DEFAULT_RATE
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_fetches_are_recorded_in_history(self):
+        rates = iter([100.0, 50.0])
+
+        async def handler(request):
+            return httpx.Response(200, json={"rates": {"JPY": next(rates), "USD": 0.75}})
+
+        service = self.make_service(handler)
+        await service.get_exchange_rate()
+        self.expire(service)
+        await service.get_exchange_rate()
+        await service._refresh_task
+        assert len(self.history) == 2
+        assert self.history.rate_as_of("JPY", datetime.utcnow().date()) == 50.0
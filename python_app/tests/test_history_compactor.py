@@ -0,0 +1,91 @@
+import json
+import pytest
+import httpx
+from python_app.services.chat import JAPAN_TRAVEL_SYSTEM_PROMPT
+from python_app.services.chat_cache import ChatResponseCache
+from python_app.services.history_compactor import (
+    HistoryCompactor, estimate_tokens, message_tokens, summarize_turn, SUMMARY_HEADER
+)
+
+
+def conversation(turns, words=30):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"Turn {i} about Kyoto. " + "temple " * words}
+        for i in range(turns)
+    ]
+
+
+class TestTokenEstimate:
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("Hello, world!") == 4
+        assert estimate_tokens("a" * 40) == 10
+
+    def test_summarize_turn_keeps_first_sentence(self):
+        line = summarize_turn({"role": "assistant", "content": "Yes, it pays off. Here is why..."})
+        assert line == "- Assistant: Yes, it pays off."
+        long_line = summarize_turn({"role": "user", "content": "x" * 500})
+        assert len(long_line) < 200 and long_line.endswith("...")
+
+
+class TestHistoryCompactor:
+    def test_short_history_is_untouched(self):
+        compactor = HistoryCompactor(token_budget=3000)
+        history = conversation(4, words=5)
+        assert compactor.compact("system", history, "next?") == history
+
+    def test_long_history_fits_budget(self):
+        compactor = HistoryCompactor(token_budget=600, summary_tokens=80)
+        history = conversation(40)
+        compacted = compactor.compact("system prompt", history, "What next?")
+        assert compacted[0]["role"] == "system"
+        assert compacted[0]["content"].startswith(SUMMARY_HEADER)
+        assert compacted[-1] == history[-1]
+        used = sum(message_tokens(m) for m in compacted) + estimate_tokens("system prompt") + estimate_tokens("What next?") + 8
+        assert used <= 600
+        assert estimate_tokens(compacted[0]["content"]) <= 80
+
+    def test_compaction_is_deterministic(self):
+        history = conversation(30)
+        first = HistoryCompactor(token_budget=500, summary_tokens=60).compact("s", history, "q")
+        second = HistoryCompactor(token_budget=500, summary_tokens=60).compact("s", history, "q")
+        assert first == second
+
+    def test_rolling_summary_matches_uncached(self):
+        compactor = HistoryCompactor(token_budget=500, summary_tokens=60)
+        history = conversation(30)
+        for n in range(10, 31, 2):
+            compactor.compact("s", history[:n], "q")
+        cached = compactor.summarize(history[:25])
+        assert cached == HistoryCompactor(token_budget=500, summary_tokens=60).summarize(history[:25])
+        assert "Turn 24" in cached
+
+    def test_summary_cache_reuses_prefix(self):
+        compactor = HistoryCompactor(token_budget=500, summary_tokens=60)
+        history = conversation(20)
+        compactor.summarize(history[:15])
+        rolled = []
+        original = compactor._roll
+        compactor._roll = lambda lines, message: rolled.append(message) or original(lines, message)
+        compactor.summarize(history[:17])
+        assert rolled == history[15:17]
+
+
+class TestChatServiceCompaction:
+    @pytest.mark.asyncio
+    async def test_prompt_is_compacted(self, make_chat_service):
+        sent = []
+
+        def handler(request):
+            sent.append(json.loads(request.content)["messages"])
+            return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+        budget = estimate_tokens(JAPAN_TRAVEL_SYSTEM_PROMPT) + 400
+        service = make_chat_service(handler, cache=ChatResponseCache(), compactor=HistoryCompactor(budget, 80))
+
+        await service.send_message("Where next?", history=conversation(50))
+        messages = sent[0]
+        assert messages[0]["content"] == JAPAN_TRAVEL_SYSTEM_PROMPT
+        assert messages[1]["content"].startswith(SUMMARY_HEADER)
+        assert messages[-1] == {"role": "user", "content": "Where next?"}
+        assert len(messages) < 20
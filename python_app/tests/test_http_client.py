@@ -0,0 +1,73 @@
+import pytest
+import httpx
+from python_app.services.http_client import HttpClientPool, ServiceLimits
+from python_app.services.exchange_rate import ExchangeRateService
+from python_app.services.rate_cache import SharedRateCache
+from python_app.domain.rate_history import RateHistory
+
+
+def rates_transport(calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url)
+        return httpx.Response(200, json={"base": "SGD", "rates": {"JPY": 110.0, "USD": 0.75}})
+    return httpx.MockTransport(handler)
+
+
+class TestHttpClientPool:
+    def test_client_is_reused(self):
+        pool = HttpClientPool(http2=False)
+        assert pool.client("chat") is pool.client("chat")
+        assert pool.client("chat") is not pool.client("exchange_rate")
+
+    def test_per_service_limits(self):
+        pool = HttpClientPool(http2=False)
+        pool.register("maps", ServiceLimits(max_connections=3, timeout=2.5))
+        client = pool.client("maps")
+        assert client.timeout.read == 2.5
+        assert pool.get_stats()["services"]["maps"]["max_connections"] == 3
+
+    def test_register_after_open_raises(self):
+        pool = HttpClientPool(http2=False)
+        pool.client("chat")
+        with pytest.raises(ValueError):
+            pool.register("chat", ServiceLimits())
+
+    @pytest.mark.asyncio
+    async def test_stats_count_requests(self):
+        pool = HttpClientPool(http2=False)
+        pool.register("exchange_rate", transport=rates_transport([]))
+        client = pool.client("exchange_rate")
+        await client.get("https://example.test/a")
+        await client.get("https://example.test/b")
+        stats = pool.get_stats()["services"]["exchange_rate"]
+        assert stats["requests"] == 2
+        assert stats["responses"] == 2
+        assert stats["errors"] == 0
+
+    @pytest.mark.asyncio
+    async def test_start_and_close(self):
+        pool = HttpClientPool(http2=False)
+        await pool.start()
+        assert all(s["active"] for s in pool.get_stats()["services"].values())
+        client = pool.client("chat")
+        await pool.aclose()
+        assert client.is_closed
+        assert not any(s["active"] for s in pool.get_stats()["services"].values())
+        assert not pool.client("chat").is_closed
+
+    @pytest.mark.asyncio
+    async def test_exchange_service_uses_pool(self, tmp_path):
+        calls = []
+        pool = HttpClientPool(http2=False)
+        pool.register("exchange_rate", transport=rates_transport(calls))
+        service = ExchangeRateService(
+            http=pool,
+            shared_cache=SharedRateCache(str(tmp_path / "rates.bin")),
+            history=RateHistory(str(tmp_path / "history.bin"))
+        )
+        result = await service.get_exchange_rate()
+        assert result["rate"] == pytest.approx(1 / 110.0)
+        matrix = await service.get_rate_matrix()
+        assert matrix.rate("SGD", "USD") == 0.75
+        assert len(calls) == 1
+
@@ -0,0 +1,76 @@
+import pytest
+from python_app.domain.cost_calculator import CostCalculator
+from python_app.domain.itinerary import ItineraryCalculator, ItineraryLeg, intercity_fare
+
+
+class TestItinerary:
+    def setup_method(self):
+        self.calculator = CostCalculator()
+
+    def test_single_leg_matches_calculator(self):
+        itinerary = ItineraryCalculator(num_travelers=2, travel_style="mid", month=4)
+        itinerary.add_leg(ItineraryLeg(city="tokyo", nights=7))
+        result = itinerary.calculate()
+        expected = self.calculator.calculate_budget(
+            city="tokyo", num_days=7, num_travelers=2, travel_style="mid", month=4
+        )
+        assert result.breakdown == expected
+        assert result.intercity_transport == 0
+        assert result.total_nights == 7
+
+    def test_multi_leg_sums_legs_and_transfers(self):
+        itinerary = ItineraryCalculator(num_travelers=2, travel_style="mid", month=10)
+        itinerary.add_leg(ItineraryLeg(city="tokyo", nights=4))
+        itinerary.add_leg(ItineraryLeg(city="kyoto", nights=3))
+        itinerary.add_leg(ItineraryLeg(city="osaka", nights=2))
+        result = itinerary.calculate()
+
+        assert [leg.transfer_cost for leg in result.legs] == [
+            0.0, intercity_fare("tokyo", "kyoto") * 2, intercity_fare("kyoto", "osaka") * 2
+        ]
+        assert result.intercity_transport == round(sum(leg.transfer_cost for leg in result.legs), 2)
+        assert result.breakdown.accommodation == round(
+            sum(leg.breakdown.accommodation for leg in result.legs), 2
+        )
+        assert result.total_nights == 9
+        assert result.breakdown.flights > 0
+
+    def test_set_leg_recomputes_only_that_leg(self):
+        itinerary = ItineraryCalculator(num_travelers=1, travel_style="budget", month=6)
+        itinerary.add_leg(ItineraryLeg(city="tokyo", nights=3))
+        itinerary.add_leg(ItineraryLeg(city="osaka", nights=3))
+        itinerary.add_leg(ItineraryLeg(city="hiroshima", nights=2))
+
+        computed = []
+        original = itinerary._compute_leg
+        itinerary._compute_leg = lambda leg: computed.append(leg.city) or original(leg)
+        itinerary.set_leg(1, ItineraryLeg(city="kyoto", nights=4))
+
+        assert computed == ["kyoto"]
+        result = itinerary.calculate()
+        assert result.legs[1].transfer_cost == intercity_fare("tokyo", "kyoto", "budget")
+        assert result.legs[2].transfer_cost == intercity_fare("kyoto", "hiroshima", "budget")
+
+    def test_remove_leg_updates_transfer(self):
+        itinerary = ItineraryCalculator(num_travelers=1, travel_style="mid", month=3)
+        itinerary.add_leg(ItineraryLeg(city="tokyo", nights=3))
+        itinerary.add_leg(ItineraryLeg(city="nagoya", nights=1))
+        itinerary.add_leg(ItineraryLeg(city="kyoto", nights=3))
+        itinerary.remove_leg(1)
+        result = itinerary.calculate()
+        assert [leg.leg.city for leg in result.legs] == ["tokyo", "kyoto"]
+        assert result.legs[1].transfer_cost == intercity_fare("tokyo", "kyoto")
+
+    def test_leg_month_override(self):
+        itinerary = ItineraryCalculator(num_travelers=1, travel_style="mid", month=1)
+        itinerary.add_leg(ItineraryLeg(city="kyoto", nights=3, month=4))
+        assert itinerary.calculate().legs[0].month == 4
+
+    def test_intercity_fare_symmetric_and_same_city(self):
+        assert intercity_fare("Tokyo", "Osaka") == intercity_fare("osaka", "tokyo")
+        assert intercity_fare("Kyoto", "kyoto") == 0.0
+        assert intercity_fare("tokyo", "osaka", "budget") < intercity_fare("tokyo", "osaka", "luxury")
+
+    def test_empty_itinerary_raises(self):
+        with pytest.raises(ValueError):
+            ItineraryCalculator(num_travelers=1, travel_style="mid", month=1).calculate()
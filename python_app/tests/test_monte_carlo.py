@@ -0,0 +1,52 @@
+import time
+import pytest
+from python_app.domain.cost_calculator import CostCalculator
+from python_app.domain.monte_carlo import simulate_budget, CATEGORIES, PROBE_DRAWS
+
+
+class TestMonteCarlo:
+    def setup_method(self):
+        self.breakdown = CostCalculator().calculate_budget(
+            city="tokyo", num_days=7, num_travelers=2, travel_style="mid", month=4
+        )
+
+    def test_seeded_runs_are_deterministic(self):
+        # The draw count depends on measured cost, so the cap is lifted to pin it.
+        first = simulate_budget(self.breakdown, "tokyo", "mid", 4, draws=5000, seed=42, max_time_ms=10000)
+        second = simulate_budget(self.breakdown, "tokyo", "mid", 4, draws=5000, seed=42, max_time_ms=10000)
+        assert first.bands == second.bands
+        assert first.draws == 5000
+
+    def test_bands_are_ordered_and_bracket_point_estimate(self):
+        result = simulate_budget(self.breakdown, "tokyo", "mid", 4, draws=20000, seed=7)
+        assert set(result.bands) == set(CATEGORIES + ["total"])
+        for name, band in result.bands.items():
+            assert band.p10 <= band.p50 <= band.p90
+        total = result.bands["total"]
+        assert total.p10 < self.breakdown.total < total.p90
+
+    def test_zero_category_stays_zero(self):
+        breakdown = CostCalculator().calculate_budget(
+            city="osaka", num_days=3, num_travelers=1, travel_style="budget", month=1,
+            include_flights=False
+        )
+        result = simulate_budget(breakdown, "osaka", "budget", 1, draws=1000, seed=1)
+        assert result.bands["flights"].p90 == 0
+
+    def test_time_cap_limits_draws(self):
+        result = simulate_budget(self.breakdown, "tokyo", "mid", 4, draws=100000, seed=1, max_time_ms=0)
+        assert 0 < result.draws < 100000
+
+    def test_small_time_cap_returns_probe_draws(self):
+        result = simulate_budget(self.breakdown, "tokyo", "mid", 4, draws=100000, seed=1, max_time_ms=0)
+        assert result.draws == PROBE_DRAWS
+
+    @pytest.mark.parametrize("max_time_ms", [5, 50])
+    def test_time_cap_bounds_wall_clock(self, max_time_ms):
+        # The cap covers the percentile pass as well as sampling; slack absorbs scheduler noise.
+        simulate_budget(self.breakdown, "tokyo", "mid", 4, draws=1000, seed=1)
+        started = time.perf_counter()
+        result = simulate_budget(self.breakdown, "tokyo", "mid", 4, draws=100000, seed=1, max_time_ms=max_time_ms)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        assert elapsed_ms < max_time_ms * 1.5 + 5
+        assert result.compute_time_ms < max_time_ms * 1.5 + 5
@@ -0,0 +1,64 @@
+import dataclasses
+import pytest
+from python_app.domain.cost_calculator import CostCalculator, CITY_PRICING, FLIGHT_PRICES
+from python_app.domain.pricing_table import (
+    PricingTable, PricingTableStore, compile_pricing_table, get_pricing_table, style_id
+)
+from python_app.middleware.security import VALID_CITIES
+
+
+class TestPricingTable:
+    def test_compiled_table_round_trips(self, tmp_path):
+        path = str(tmp_path / "pricing.bin")
+        version = compile_pricing_table(path)
+        table = PricingTable(path)
+        assert table.version == version
+        assert table.cities == list(CITY_PRICING.keys())
+        for city, pricing in CITY_PRICING.items():
+            idx = table.city_id(city)
+            assert table.accommodation[idx].tolist() == [
+                pricing.accommodation_budget, pricing.accommodation_mid, pricing.accommodation_luxury
+            ]
+            assert table.transport[idx] == pricing.transport_daily
+            assert table.flights[idx, style_id("luxury")] == FLIGHT_PRICES[city]["luxury"]
+
+    def test_every_valid_city_has_pricing(self):
+        table = get_pricing_table()
+        for city in VALID_CITIES:
+            assert city.lower() in table.city_ids
+
+    def test_unknown_city_and_style_fall_back(self):
+        table = get_pricing_table()
+        assert table.city_id("Atlantis") == table.city_id("tokyo")
+        assert style_id("unknown") == style_id("mid")
+
+    def test_hot_reload_on_file_change(self, tmp_path):
+        path = str(tmp_path / "pricing.bin")
+        compile_pricing_table(path)
+        store = PricingTableStore(path, check_interval=0)
+        first = store.get()
+        assert store.get() is first
+
+        pricing = dict(CITY_PRICING)
+        pricing["tokyo"] = dataclasses.replace(CITY_PRICING["tokyo"], accommodation_mid=999)
+        compile_pricing_table(path, pricing, FLIGHT_PRICES)
+
+        reloaded = store.get()
+        assert reloaded is not first
+        assert reloaded.version != first.version
+        breakdown = CostCalculator(pricing_table=reloaded).calculate_budget(
+            city="tokyo", num_days=1, num_travelers=1, travel_style="mid", month=9
+        )
+        assert breakdown.accommodation == 999
+
+    def test_corrupt_reload_keeps_last_table(self, tmp_path):
+        path = tmp_path / "pricing.bin"
+        compile_pricing_table(str(path))
+        store = PricingTableStore(str(path), check_interval=0)
+        first = store.get()
+        path.write_bytes(b"garbage")
+        assert store.get() is first
+
+    def test_missing_file_is_compiled(self, tmp_path):
+        store = PricingTableStore(str(tmp_path / "nested" / "pricing.bin"))
+        assert store.get().cities == list(CITY_PRICING.keys())
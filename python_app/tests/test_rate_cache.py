@@ -0,0 +1,103 @@
+import asyncio
+import multiprocessing
+import os
+import time
+import pytest
+import httpx
+from python_app.services.rate_cache import SharedRateCache
+
+
+def _worker(make_rate_service, cache_path, calls_path, barrier, results):
+    async def handler(request):
+        with open(calls_path, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        await asyncio.sleep(0.3)
+        return httpx.Response(200, json={"rates": {"JPY": 100.0 + os.getpid() % 7, "USD": 0.75}})
+
+    service = make_rate_service(handler, cache_path)
+    barrier.wait()
+    result = asyncio.run(service.get_exchange_rate())
+    results.put(result["rate"])
+
+
+class TestSharedRateCache:
+    def test_round_trip(self, tmp_path):
+        cache = SharedRateCache(str(tmp_path / "rates.bin"))
+        assert cache.read() is None
+        cache.write({"JPY": 110.5, "USD": 0.74, "SGD": 1.0}, fetched_at=1700000000.0)
+        snapshot = SharedRateCache(cache.path).read()
+        assert snapshot.rates == {"JPY": 110.5, "USD": 0.74, "SGD": 1.0}
+        assert snapshot.fetched_at == 1700000000.0
+
+    def test_corrupt_file_is_ignored(self, tmp_path):
+        path = tmp_path / "rates.bin"
+        cache = SharedRateCache(str(path))
+        cache.write({"JPY": 110.0})
+        data = bytearray(path.read_bytes())
+        data[-1] ^= 0xFF
+        path.write_bytes(bytes(data))
+        assert SharedRateCache(str(path)).read() is None
+        assert cache.read().rates == {"JPY": 110.0}
+
+    def test_lock_elects_one_fetcher(self, tmp_path):
+        cache = SharedRateCache(str(tmp_path / "rates.bin"))
+        other = SharedRateCache(cache.path)
+        lock = cache.try_acquire()
+        assert lock is not None
+        assert other.try_acquire() is None
+        assert other.wait_for_fetcher(timeout=0.1) is False
+        cache.release(lock)
+        assert other.wait_for_fetcher(timeout=0.1) is True
+
+    @pytest.mark.asyncio
+    async def test_cold_start_is_warm_from_disk(self, tmp_path, make_rate_service):
+        path = str(tmp_path / "rates.bin")
+        SharedRateCache(path).write({"JPY": 100.0, "USD": 0.75})
+
+        async def handler(request):
+            raise AssertionError("should not fetch")
+
+        service = make_rate_service(handler, path)
+        result = await service.get_exchange_rate()
+        assert result["rate"] == pytest.approx(0.01)
+        assert result["stale"] is False
+        matrix = await service.get_rate_matrix()
+        assert matrix.rate("SGD", "USD") == 0.75
+
+    @pytest.mark.asyncio
+    async def test_workers_converge_on_newest_snapshot(self, tmp_path, make_rate_service):
+        path = str(tmp_path / "rates.bin")
+        rates = iter([100.0, 50.0])
+
+        async def handler(request):
+            return httpx.Response(200, json={"rates": {"JPY": next(rates)}})
+
+        first = make_rate_service(handler, path)
+        second = make_rate_service(handler, path)
+        await first.get_exchange_rate()
+        assert (await second.get_exchange_rate())["rate"] == pytest.approx(0.01)
+
+        time.sleep(0.01)
+        SharedRateCache(path).write({"JPY": 80.0})
+        assert (await first.get_exchange_rate())["rate"] == pytest.approx(1 / 80.0)
+        assert (await second.get_exchange_rate())["rate"] == pytest.approx(1 / 80.0)
+
+    def test_processes_share_one_fetch(self, tmp_path, make_rate_service):
+        cache_path = str(tmp_path / "rates.bin")
+        calls_path = str(tmp_path / "calls.log")
+        context = multiprocessing.get_context("fork")
+        barrier = context.Barrier(4)
+        results = context.Queue()
+        workers = [
+            context.Process(target=_worker, args=(make_rate_service, cache_path, calls_path, barrier, results))
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        rates = [results.get(timeout=20) for _ in workers]
+        for worker in workers:
+            worker.join(timeout=5)
+
+        with open(calls_path) as f:
+            assert len(f.read().splitlines()) == 1
+        assert len(set(rates)) == 1
@@ -0,0 +1,89 @@
+import os
+import pytest
+from datetime import date, datetime, timezone
+from python_app.domain.cost_calculator import CostCalculator
+from python_app.domain.rate_history import RateHistory
+
+
+def ts(year, month, day, hour=12):
+    return datetime(year, month, day, hour, tzinfo=timezone.utc).timestamp()
+
+
+class TestRateHistory:
+    @pytest.fixture(autouse=True)
+    def history(self, tmp_path):
+        self.path = str(tmp_path / "history.bin")
+        self.history = RateHistory(self.path, currencies=["JPY", "USD"])
+        for day, jpy in enumerate([110.0, 112.0, 108.0, 115.0, 111.0], start=1):
+            self.history.append(ts(2025, 3, day), {"JPY": jpy, "USD": 0.74})
+
+    def test_records_are_fixed_width(self):
+        assert len(self.history) == 5
+        assert (os.path.getsize(self.path) - self.history.data_offset) == 5 * self.history.record_dtype.itemsize
+
+    def test_rate_as_of_date(self):
+        assert self.history.rate_as_of("JPY", date(2025, 3, 3)) == 108.0
+        assert self.history.rate_as_of("jpy", date(2025, 3, 31)) == 111.0
+        assert self.history.rate_as_of("JPY", date(2025, 2, 28)) is None
+
+    def test_rate_as_of_moment(self):
+        assert self.history.rate_as_of("JPY", ts(2025, 3, 3, 11)) == 112.0
+        assert self.history.rate_as_of("JPY", datetime(2025, 3, 3, 13, tzinfo=timezone.utc)) == 108.0
+
+    def test_out_of_order_append_is_dropped(self):
+        assert self.history.append(ts(2025, 3, 2), {"JPY": 999.0}) is False
+        assert len(self.history) == 5
+
+    def test_missing_currency_walks_back(self):
+        self.history.append(ts(2025, 3, 6), {"JPY": 120.0})
+        assert self.history.rate_as_of("USD", date(2025, 3, 6)) == 0.74
+
+    def test_unknown_currency_raises(self):
+        with pytest.raises(ValueError):
+            self.history.rate_as_of("EUR", date(2025, 3, 6))
+
+    def test_trend_window(self):
+        trend = self.history.trend("JPY", date(2025, 3, 5), days=30)
+        assert trend.rate == 111.0
+        assert trend.low == 108.0
+        assert trend.high == 115.0
+        assert trend.mean == pytest.approx(111.2)
+        assert trend.samples == 5
+
+        short = self.history.trend("JPY", date(2025, 3, 5), days=2)
+        assert short.samples == 2
+        assert short.low == 111.0
+
+    def test_other_readers_see_appends(self):
+        reader = RateHistory(self.path)
+        assert reader.currencies == ["JPY", "USD"]
+        assert len(reader) == 5
+        self.history.append(ts(2025, 3, 7), {"JPY": 100.0})
+        assert reader.rate_as_of("JPY", date(2025, 3, 7)) == 100.0
+
+    def test_torn_record_is_discarded(self):
+        with open(self.path, "ab") as f:
+            f.write(b"\x01\x02\x03")
+        assert len(RateHistory(self.path)) == 5
+        self.history.append(ts(2025, 3, 8), {"JPY": 101.0})
+        reader = RateHistory(self.path)
+        assert len(reader) == 6
+        assert reader.rate_as_of("JPY", date(2025, 3, 8)) == 101.0
+
+    def test_as_of_over_many_records(self):
+        base = ts(2025, 3, 5)
+        for i in range(1, 2000):
+            self.history.append(base + i * 3600, {"JPY": 100.0 + i % 10})
+        assert self.history.rate_as_of("JPY", base + 1234 * 3600 + 1) == 104.0
+        assert self.history.rate_as_of("JPY", base + 1234 * 3600) == 103.0
+
+    def test_cost_calculator_as_of(self):
+        calculator = CostCalculator.as_of(date(2025, 3, 4), history=self.history)
+        assert calculator.exchange_rate == pytest.approx(1 / 115.0)
+        assert calculator.convert_to_jpy(100.0) == 11500.0
+        trend = self.history.trend("JPY", date(2025, 3, 4))
+        assert calculator.jpy_trend_band(100.0, trend) == (10800.0, 11125.0, 11500.0)
+
+    def test_cost_calculator_as_of_without_history(self):
+        with pytest.raises(ValueError):
+            CostCalculator.as_of(date(2024, 1, 1), history=self.history)
@@ -1,8 +1,12 @@
 import pytest
+from datetime import date, timedelta
 from python_app.domain.seasonality import (
     get_season,
     get_seasonal_multiplier,
-    get_weather_info
+    get_weather_info,
+    get_daily_multiplier,
+    get_date_range_multiplier,
+    get_holiday
 )
 
 class TestSeasonality:
@@ -50,3 +54,29 @@ class TestSeasonality:
         info = get_weather_info("unknown_city", 6)
         assert isinstance(info, dict)
         assert "temp_low" in info
+
+    def test_daily_multiplier_uses_month_outside_holidays(self):
+        assert get_daily_multiplier(date(2025, 2, 10)) == get_seasonal_multiplier(2)
+        assert get_daily_multiplier(date(2025, 9, 15)) == get_seasonal_multiplier(9)
+
+    def test_holiday_overlay_raises_multiplier(self):
+        for day in [date(2025, 5, 3), date(2025, 8, 14), date(2025, 12, 31), date(2026, 1, 2)]:
+            assert get_daily_multiplier(day) > get_seasonal_multiplier(day.month)
+            assert get_holiday(day) is not None
+        assert get_holiday(date(2025, 6, 10)) is None
+
+    def test_date_range_matches_daily_sum(self):
+        for start, nights in [(date(2025, 12, 20), 20), (date(2024, 2, 25), 10), (date(2031, 4, 25), 14),
+                              (date(1999, 7, 30), 90), (date(2099, 12, 1), 60)]:
+            end = start + timedelta(days=nights)
+            expected = sum(get_daily_multiplier(start + timedelta(days=i)) for i in range(nights))
+            assert get_date_range_multiplier(start, end) == pytest.approx(expected)
+
+    def test_date_range_empty_or_reversed(self):
+        assert get_date_range_multiplier(date(2025, 5, 1), date(2025, 5, 1)) == 0.0
+        assert get_date_range_multiplier(date(2025, 5, 2), date(2025, 5, 1)) == 0.0
+
+    def test_golden_week_costs_more_than_late_may(self):
+        golden_week = get_date_range_multiplier(date(2025, 4, 29), date(2025, 5, 6))
+        late_may = get_date_range_multiplier(date(2025, 5, 20), date(2025, 5, 27))
+        assert golden_week > late_may
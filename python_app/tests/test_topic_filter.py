@@ -0,0 +1,109 @@
+import pytest
+import httpx
+from fastapi.testclient import TestClient
+from python_app.api import routes
+from python_app.main import app
+from python_app.domain.topic_filter import MAX_TOKENS, TopicFilter, REFUSALS, features
+
+
+@pytest.fixture(scope="module")
+def topic_filter():
+    return TopicFilter(threshold=0.9)
+
+
+class TestTopicFilter:
+    def test_features_include_bigrams(self):
+        assert features("JR Pass, please") == ["jr", "pass", "please", "jr pass", "pass please"]
+
+    @pytest.mark.parametrize("message", [
+        "Is the JR Pass worth it?",
+        "What should I eat in Osaka?",
+        "Hello",
+        "Thanks!",
+        "what about the second one?",
+        "Can you write code for my Tokyo trip budget spreadsheet?",
+        "This is so expensive, damn",
+    ])
+    def test_allows_travel_and_neutral_messages(self, topic_filter, message):
+        assert topic_filter.classify(message).allowed
+
+    @pytest.mark.parametrize("message", [
+        "Write python code to sort a list",
+        "Help me with my calculus homework",
+        "Who won the election?",
+        "What is bitcoin?",
+    ])
+    def test_rejects_off_topic(self, topic_filter, message):
+        verdict = topic_filter.classify(message)
+        assert verdict.label == "off_topic"
+        assert not verdict.allowed
+
+    def test_rejects_abuse(self, topic_filter):
+        assert topic_filter.classify("shut up you useless bot").label == "abusive"
+        # One swear word in a travel question is venting, not abuse.
+        assert topic_filter.classify("This is fucking expensive in Tokyo").allowed
+
+    @pytest.mark.parametrize("message", ["fuck", "kill yourself", "you are a cunt"])
+    def test_one_strong_abuse_term_is_enough(self, topic_filter, message):
+        verdict = topic_filter.classify(message)
+        assert verdict.label == "abusive"
+        assert verdict.abusive >= 0.9
+
+    @pytest.mark.parametrize("message", [
+        "I need a prescription refilled",
+        "Can I bring my medication into Japan?",
+        "Where is the nearest pharmacy?",
+        "I have flu symptoms, where can I see a doctor?",
+    ])
+    def test_allows_health_questions(self, topic_filter, message):
+        assert topic_filter.classify(message).allowed
+
+    def test_threshold_is_pluggable(self):
+        assert TopicFilter(threshold=0.9).classify("What is bitcoin?").label == "off_topic"
+        assert TopicFilter(threshold=0.95).classify("What is bitcoin?").allowed
+        assert TopicFilter(threshold=1.01).classify("Write python code to sort a list").allowed
+
+    def test_weights_are_pluggable(self):
+        assert TopicFilter(weights={}, threshold=0.9).classify("Write python code").allowed
+
+    def test_stats(self):
+        topic_filter = TopicFilter(threshold=0.9)
+        topic_filter.check("Write python code to sort a list")
+        topic_filter.check("Is the JR Pass worth it?")
+        assert topic_filter.get_stats()["checked"] == 2
+        assert topic_filter.get_stats()["rejected"] == 1
+
+    def test_long_messages_are_classified_on_their_opening(self, topic_filter):
+        filler = "please " * MAX_TOKENS
+        assert len(features(filler + "bitcoin")) == len(features(filler))
+        assert topic_filter.classify(filler + "sushi tokyo ramen").label == topic_filter.classify(filler).label
+
+
+class TestChatPreFilter:
+    @pytest.fixture
+    def upstream_calls(self, monkeypatch, make_chat_service):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={"choices": [{"message": {"content": "From the model"}}]})
+
+        monkeypatch.setattr(routes, "chat_service", make_chat_service(handler))
+        return calls
+
+    def test_off_topic_never_reaches_upstream(self, upstream_calls):
+        client = TestClient(app)
+        response = client.post("/api/chat", json={"message": "Write python code to sort a list"})
+        assert response.status_code == 200
+        assert response.json()["source"] == "filter"
+        assert response.json()["message"] == REFUSALS["off_topic"]
+
+        response = client.post("/api/chat/stream", json={"message": "shut up you useless bot"})
+        assert REFUSALS["abusive"] in response.text
+        assert upstream_calls == []
+
+    def test_travel_questions_pass_through(self, upstream_calls):
+        client = TestClient(app)
+        response = client.post("/api/chat", json={"message": "Is the JR Pass worth it for a 5 day Osaka trip?"})
+        assert response.json()["source"] == "assistant"
+        assert len(upstream_calls) == 1
@@ -0,0 +1,50 @@
+import pytest
+from python_app.domain.cost_calculator import CostCalculator
+from python_app.domain.travel_windows import sweep_budget
+
+
+class TestTravelWindows:
+    def setup_method(self):
+        self.calculator = CostCalculator()
+
+    def test_sweep_matrix_matches_calculator(self):
+        sweep = sweep_budget(
+            city="Osaka", travel_style="budget", num_travelers=3,
+            min_days=1, max_days=90, shopping_budget=150.0
+        )
+        assert sweep.months == list(range(1, 13))
+        assert sweep.days == list(range(1, 91))
+        for m, month in enumerate(sweep.months):
+            for d, num_days in enumerate(sweep.days):
+                expected = self.calculator.calculate_budget(
+                    city="Osaka", num_days=num_days, num_travelers=3,
+                    travel_style="budget", month=month, shopping_budget=150.0
+                )
+                assert sweep.totals[m][d] == expected.total
+
+    def test_cheapest_windows_respect_target(self):
+        sweep = sweep_budget(
+            city="Tokyo", travel_style="mid", num_travelers=1,
+            min_days=3, max_days=14, target_total=3000.0, limit=5
+        )
+        assert 0 < len(sweep.cheapest_windows) <= 5
+        per_day = [w.cost_per_day for w in sweep.cheapest_windows]
+        assert per_day == sorted(per_day)
+        for window in sweep.cheapest_windows:
+            assert window.total <= 3000.0
+            assert 3 <= window.num_days <= 14
+
+    def test_no_windows_under_tiny_target(self):
+        sweep = sweep_budget(city="Tokyo", travel_style="luxury", num_travelers=2, target_total=10.0)
+        assert sweep.cheapest_windows == []
+
+    def test_sweep_without_flights(self):
+        sweep = sweep_budget(
+            city="Kyoto", travel_style="mid", num_travelers=2,
+            min_days=5, max_days=5, include_flights=False
+        )
+        expected = self.calculator.calculate_budget(
+            city="Kyoto", num_days=5, num_travelers=2, travel_style="mid",
+            month=2, include_flights=False
+        )
+        assert sweep.totals[1] == [expected.total]
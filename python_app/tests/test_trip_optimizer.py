@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from python_app.domain.cost_calculator import CostCalculator
+from python_app.domain.trip_optimizer import optimize_trip, month_window
+
+
+class TestTripOptimizer:
+    def setup_method(self):
+        self.calculator = CostCalculator()
+
+    def _brute_force(self, max_total, cities, months, styles, min_days, max_days):
+        best = {}
+        for city in cities:
+            for month in months:
+                for style in styles:
+                    for days in range(min_days, max_days + 1):
+                        total = self.calculator.calculate_budget(
+                            city=city, num_days=days, num_travelers=2, travel_style=style, month=month
+                        ).total
+                        if total <= max_total:
+                            best[(city, month, style)] = (days, total)
+        return best
+
+    def test_matches_brute_force(self):
+        cities, months, styles = ["tokyo", "osaka", "okinawa"], [2, 4, 11], ["budget", "mid", "luxury"]
+        result = optimize_trip(
+            max_total=4000, num_travelers=2, cities=cities, months=months,
+            travel_styles=styles, min_days=3, max_days=20, limit=100
+        )
+        expected = self._brute_force(4000, cities, months, styles, 3, 20)
+        found = {(c.city, c.month, c.travel_style): (c.num_days, c.total) for c in result.candidates}
+        assert found == expected
+
+    def test_prunes_unaffordable_styles(self):
+        result = optimize_trip(
+            max_total=1500, num_travelers=2, cities=["tokyo"], months=[4],
+            travel_styles=["luxury", "mid", "budget"], min_days=5, max_days=30
+        )
+        assert result.candidates == []
+        assert result.candidates_evaluated == 1
+
+    def test_ranking_and_stats(self):
+        result = optimize_trip(
+            max_total=6000, num_travelers=1, cities=["tokyo", "kyoto"], months=[1, 2],
+            min_days=1, max_days=60, limit=3
+        )
+        assert len(result.candidates) == 3
+        days = [c.num_days for c in result.candidates]
+        assert days == sorted(days, reverse=True)
+        assert all(c.total <= 6000 for c in result.candidates)
+        assert result.candidates_evaluated < 2 * 2 * 3 * 60
+        assert result.search_time_ms >= 0
+
+    def test_month_window_wraps(self):
+        assert month_window(3, 5) == [3, 4, 5]
+        assert month_window(11, 2) == [11, 12, 1, 2]
+
+
+class TestTripOptimizerService:
+    @pytest.mark.asyncio
+    async def test_timed_out_job_keeps_its_slot_until_done(self, monkeypatch):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from python_app.services import trip_optimizer
+        from python_app.services.trip_optimizer import (
+            OptimizerBusyError, OptimizerTimeoutError, TripOptimizerService,
+        )
+
+        release = threading.Event()
+        monkeypatch.setattr(trip_optimizer, "optimize_trip", lambda **kwargs: release.wait(5))
+        service = TripOptimizerService(max_workers=1, max_pending=1, timeout=0.05)
+        service._executor = ThreadPoolExecutor(max_workers=1)
+
+        with pytest.raises(OptimizerTimeoutError):
+            await service.optimize()
+        # The worker is still running the abandoned job, so the bound still counts it.
+        assert service.get_stats()["pending"] == 1
+        with pytest.raises(OptimizerBusyError):
+            await service.optimize()
+
+        release.set()
+        service._executor.shutdown(wait=True)
+        await asyncio.sleep(0)
+        assert service.get_stats()["pending"] == 0
+        assert service.get_stats()["timed_out"] == 1
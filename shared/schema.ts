@@ -1,5 +1,5 @@
 import { z } from "zod";
-import { pgTable, serial, text, timestamp, integer, decimal, jsonb } from "drizzle-orm/pg-core";
+import { pgTable, serial, text, timestamp, integer, bigint, decimal, jsonb, index, primaryKey } from "drizzle-orm/pg-core";
 import { createInsertSchema } from "drizzle-zod";
 
 export const chatSessions = pgTable("chat_sessions", {
@@ -36,7 +36,7 @@ export const budgetCalculations = pgTable("budget_calculations", {
   exchangeRate: decimal("exchange_rate", { precision: 10, scale: 4 }).notNull(),
   breakdown: jsonb("breakdown").notNull(),
   createdAt: timestamp("created_at").defaultNow().notNull(),
-});
+}, (table) => [index("budget_calculations_created_at_idx").on(table.createdAt)]);
 
 export const pageViews = pgTable("page_views", {
   id: serial("id").primaryKey(),
@@ -45,7 +45,7 @@ export const pageViews = pgTable("page_views", {
   referrer: text("referrer"),
   userAgent: text("user_agent"),
   createdAt: timestamp("created_at").defaultNow().notNull(),
-});
+}, (table) => [index("page_views_created_at_idx").on(table.createdAt)]);
 
 export const userEvents = pgTable("user_events", {
   id: serial("id").primaryKey(),
@@ -54,6 +54,29 @@ export const userEvents = pgTable("user_events", {
   eventCategory: text("event_category").notNull(),
   eventData: jsonb("event_data"),
   createdAt: timestamp("created_at").defaultNow().notNull(),
+}, (table) => [index("user_events_created_at_idx").on(table.createdAt)]);
+
+// Pre-aggregated analytics buckets, maintained by the Python backend's rollup compaction job.
+const rollupColumns = {
+  bucketStart: timestamp("bucket_start").notNull(),
+  metric: text("metric").notNull(),
+  dimension: text("dimension").notNull().default(""),
+  count: bigint("count", { mode: "number" }).notNull().default(0),
+  valueSum: decimal("value_sum", { precision: 18, scale: 2 }).notNull().default("0"),
+};
+
+export const analyticsHourlyRollups = pgTable("analytics_hourly_rollups", rollupColumns, (table) => [
+  primaryKey({ columns: [table.bucketStart, table.metric, table.dimension] }),
+]);
+
+export const analyticsDailyRollups = pgTable("analytics_daily_rollups", rollupColumns, (table) => [
+  primaryKey({ columns: [table.bucketStart, table.metric, table.dimension] }),
+]);
+
+// Highest raw row id each analytics table had at the last rollup compaction.
+export const analyticsRollupState = pgTable("analytics_rollup_state", {
+  source: text("source").primaryKey(),
+  lastId: bigint("last_id", { mode: "number" }).notNull().default(0),
 });
 
 export const insertChatSessionSchema = createInsertSchema(chatSessions).omit({ id: true, createdAt: true, updatedAt: true });